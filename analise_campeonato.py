@@ -0,0 +1,837 @@
+# Análise - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+from collections import Counter, deque
+from dataclasses import dataclass
+
+from projecao_campeonato import ZONAS
+from simulador_campeonato_brasileiro import Equipe, Jogo
+
+# Situação de uma equipe em relação a um objetivo (título, Libertadores ou rebaixamento).
+GARANTIDO = 'garantido'
+POSSIVEL = 'possível'
+ELIMINADO = 'eliminado'
+
+# Pontos de cada equipe nos três resultados possíveis de um jogo: vitória do mandante,
+# empate e vitória do visitante.
+PONTUACOES = ((3, 0), (1, 1), (0, 3))
+
+# Pontos que cada equipe deixa de somar, em relação a uma vitória, nos mesmos três resultados.
+PERDAS = ((0, 3), (2, 2), (3, 0))
+
+
+@dataclass(slots=True)
+class SituacaoEquipe:
+    '''
+    Representa a situação matemática de uma equipe, considerando todos os resultados
+    possíveis dos jogos restantes.
+
+    Atributos:
+        nome (str): Nome da equipe;
+        titulo (str): GARANTIDO, POSSIVEL ou ELIMINADO, para o título;
+        libertadores (str): GARANTIDO, POSSIVEL ou ELIMINADO, para uma vaga na Libertadores;
+        rebaixamento (str): GARANTIDO, POSSIVEL ou ELIMINADO, para o rebaixamento;
+        pontos_titulo (int | None): Pontos que a equipe ainda precisa somar para garantir o título, ou None se não depender só dela;
+        pontos_libertadores (int | None): Pontos que a equipe ainda precisa somar para garantir a Libertadores, ou None se não depender só dela;
+        pontos_permanencia (int | None): Pontos que a equipe ainda precisa somar para escapar do rebaixamento, ou None se não depender só dela.
+    '''
+    nome: str
+    titulo: str
+    libertadores: str
+    rebaixamento: str
+    pontos_titulo: int | None
+    pontos_libertadores: int | None
+    pontos_permanencia: int | None
+
+
+class Rede:
+    '''
+    Rede de fluxo com capacidades inteiras, cujo fluxo máximo é calculado pelo algoritmo
+    de Dinic. As arestas são guardadas aos pares, a direta em um índice par e a reversa
+    no índice seguinte, de forma que a reversa da aresta *a* é a ^ 1.
+
+    Exemplos:
+    >>> rede = Rede(4)
+    >>> rede.aresta(0, 1, 3)
+    >>> rede.aresta(0, 2, 2)
+    >>> rede.aresta(1, 3, 2)
+    >>> rede.aresta(2, 3, 3)
+    >>> rede.fluxo_maximo(0, 3)
+    4
+    '''
+    destinos: list[int]
+    capacidades: list[int]
+    saidas: list[list[int]]
+
+    def __init__(self, vertices: int) -> None:
+        '''
+        Inicializa uma rede sem arestas com *vertices* vértices, numerados a partir de 0.
+        '''
+        self.destinos = []
+        self.capacidades = []
+        self.saidas = [[] for _ in range(vertices)]
+
+    def aresta(self, origem: int, destino: int, capacidade: int, reversa: int = 0):
+        '''
+        Adiciona uma aresta de *origem* para *destino* com a *capacidade* informada. Com
+        *reversa*, a aresta de volta também tem capacidade, como em uma ligação sem sentido.
+        '''
+        a = len(self.destinos)
+        self.saidas[origem].append(a)
+        self.saidas[destino].append(a + 1)
+        self.destinos += (destino, origem)
+        self.capacidades += (capacidade, reversa)
+
+    def fluxo_maximo(self, origem: int, destino: int) -> int:
+        '''
+        Devolve o valor do fluxo máximo de *origem* para *destino*. As capacidades da rede
+        passam a ser as residuais.
+
+        Cada fase procura, sem recursão, caminhos que sempre avançam um nível, guardando em
+        *proximas* a primeira aresta ainda não esgotada de cada vértice.
+        '''
+        destinos, capacidades, saidas = self.destinos, self.capacidades, self.saidas
+        total = 0
+        while True:
+            niveis = self.__niveis(origem)
+            if niveis[destino] < 0:
+                return total
+            proximas = [0] * len(saidas)
+            caminho: list[int] = []
+            u = origem
+            while True:
+                if u == destino:
+                    fluxo = min(capacidades[a] for a in caminho)
+                    for a in caminho:
+                        capacidades[a] -= fluxo
+                        capacidades[a ^ 1] += fluxo
+                    total += fluxo
+                    caminho.clear()
+                    u = origem
+                    continue
+                arestas = saidas[u]
+                while proximas[u] < len(arestas):
+                    a = arestas[proximas[u]]
+                    if capacidades[a] > 0 and niveis[destinos[a]] == niveis[u] + 1:
+                        break
+                    proximas[u] += 1
+                if proximas[u] < len(arestas):
+                    caminho.append(arestas[proximas[u]])
+                    u = destinos[caminho[-1]]
+                elif u == origem:
+                    break
+                else:
+                    # Sem saída neste nível: o vértice sai da fase e a busca recua uma aresta.
+                    niveis[u] = -1
+                    u = destinos[caminho.pop() ^ 1]
+                    proximas[u] += 1
+
+    def alcancaveis(self, origem: int) -> set[int]:
+        '''
+        Devolve os vértices alcançáveis a partir de *origem* por arestas com capacidade
+        residual. Depois de *fluxo_maximo*, é o lado da origem de um corte mínimo.
+        '''
+        return {v for v, nivel in enumerate(self.__niveis(origem)) if nivel >= 0}
+
+    def __niveis(self, origem: int) -> list[int]:
+        '''
+        Devolve a distância, em arestas com capacidade residual, de *origem* a cada vértice,
+        ou -1 para os vértices inalcançáveis.
+        '''
+        niveis = [-1] * len(self.saidas)
+        niveis[origem] = 0
+        fila = deque([origem])
+        while fila:
+            u = fila.popleft()
+            for a in self.saidas[u]:
+                v = self.destinos[a]
+                if self.capacidades[a] > 0 and niveis[v] < 0:
+                    niveis[v] = niveis[u] + 1
+                    fila.append(v)
+        return niveis
+
+
+def excesso_relaxado(folgas: list[int | None], jogos: list[tuple[int, int]], minimo: int = 2,
+                     opcionais: set[int] | frozenset[int] = frozenset(), excecoes: int = 0) -> int:
+    '''
+    Devolve quantos pontos não cabem nas *folgas* das equipes, considerando que cada um
+    dos *jogos* distribui exatamente *minimo* pontos, divididos livremente entre as duas
+    equipes. Equipes com folga None aceitam qualquer número de pontos, e até *excecoes*
+    equipes de *opcionais* podem passar da folga.
+
+    Com *minimo* igual ao menor total distribuído por um resultado real (2 para a
+    pontuação 3-1-0, já que um empate distribui 1-1 e uma vitória, 3-0), um excesso
+    positivo prova que nenhum resultado real cabe nas folgas. O excesso é calculado por
+    *grupo_excedente*.
+
+    Exemplos:
+    >>> excesso_relaxado([1, 1, 1], [(0, 1), (1, 2), (0, 2)])
+    3
+    >>> excesso_relaxado([1, 1, 1], [(0, 1), (1, 2), (0, 2)], opcionais={2}, excecoes=1)
+    0
+    >>> excesso_relaxado([2, 2, None], [(0, 1), (1, 2), (0, 2)])
+    0
+    >>> excesso_relaxado([3, 3, 3], [(0, 1), (1, 2), (0, 2)], 3)
+    0
+    '''
+    pares = Counter((min(u, v), max(u, v)) for u, v in jogos
+                    if folgas[u] is not None and folgas[v] is not None)
+    return grupo_excedente(folgas, pares, minimo, opcionais, excecoes)[0]
+
+
+def grupo_excedente(folgas: list[int | None], pares: Counter[tuple[int, int]], minimo: int,
+                    opcionais: set[int] | frozenset[int] = frozenset(),
+                    excecoes: int = 0) -> tuple[int, set[int]]:
+    '''
+    Devolve o excesso de *excesso_relaxado* para os jogos contados em *pares*, todos entre
+    equipes com folga, e um grupo de equipes onde ele aparece, vazio se não há excesso.
+
+    O excesso é o maior valor, entre os grupos de equipes, de *minimo* vezes os jogos
+    dentro do grupo menos a folga do grupo, o que é um corte mínimo em uma rede só com as
+    equipes: cada uma recebe da origem, ou manda ao destino, a diferença entre *minimo*
+    vezes os seus jogos e o dobro da sua folga, e cada par de equipes é ligado nos dois
+    sentidos com *minimo* por jogo, de forma que o corte conta tudo em dobro. As exceções
+    absorvem juntas, por um vértice próprio, no máximo o que as equipes de *opcionais*
+    com as maiores sobras absorveriam além da folga.
+
+    Exemplos:
+    >>> grupo_excedente([1, 1, 1, 5], Counter({(0, 1): 1, (1, 2): 1, (0, 2): 1, (0, 3): 1}), 2)
+    (3, {0, 1, 2})
+    '''
+    if not pares:
+        return 0, set()
+    n = len(folgas)
+    origem, destino, excecao = n, n + 1, n + 2
+    rede = Rede(n + 3)
+    jogos_equipe: Counter[int] = Counter()
+    for (u, v), quantidade in pares.items():
+        jogos_equipe[u] += quantidade
+        jogos_equipe[v] += quantidade
+        rede.aresta(u, v, minimo * quantidade, minimo * quantidade)
+    positivos = 0
+    sobras = []
+    for u, quantidade in jogos_equipe.items():
+        folga = max(folgas[u] or 0, 0)     # As equipes dos pares sempre têm folga.
+        saldo = minimo * quantidade - 2 * folga
+        if saldo > 0:
+            rede.aresta(origem, u, saldo)
+            positivos += saldo
+        elif saldo < 0:
+            rede.aresta(u, destino, -saldo)
+        if u in opcionais and minimo * quantidade > folga:
+            sobras.append((u, minimo * quantidade - folga))
+    if excecoes > 0 and sobras:
+        for u, sobra in sobras:
+            rede.aresta(u, excecao, 2 * sobra)
+        rede.aresta(excecao, destino, 2 * sum(sorted((sobra for _, sobra in sobras), reverse=True)[:excecoes]))
+    excesso = (positivos - rede.fluxo_maximo(origem, destino)) // 2
+    return excesso, set() if excesso == 0 else {u for u in rede.alcancaveis(origem) if u < n}
+
+
+def cabe_com_excecoes(folgas: list[int | None], jogos: list[tuple[int, int]], excecoes: int) -> bool:
+    '''
+    Devolve se existe algum resultado para os *jogos* em que no máximo *excecoes* equipes
+    somem mais pontos do que a sua folga. Equipes com folga None já estouraram a folga e
+    aceitam qualquer número de pontos.
+
+    A busca é exata, em profundidade, com três podas: uma equipe sem folga ou com folga
+    para vencer todos os jogos restantes sempre vence, já que isso deixa o adversário sem
+    pontos; o excesso do fluxo relaxado de *excesso_relaxado*, calculado no início e,
+    depois da primeira falha, em cada estado, descarta ramos que precisariam de mais
+    exceções do que as disponíveis; e os estados que já falharam não são repetidos.
+
+    Exemplos:
+    >>> cabe_com_excecoes([1, 1, 1], [(0, 1), (1, 2), (0, 2)], 0)
+    False
+    >>> cabe_com_excecoes([1, 1, 1], [(0, 1), (1, 2), (0, 2)], 1)
+    True
+    '''
+    folgas = list(folgas)
+    restantes: Counter[int] = Counter()
+    for u, v in jogos:
+        restantes[u] += 1
+        restantes[v] += 1
+    jogos = sorted(jogos, key=lambda jogo: min(folgas[jogo[0]] or 0, folgas[jogo[1]] or 0))
+    falhas: set[tuple] = set()
+
+    def livre(u: int) -> bool:
+        folga = folgas[u]
+        return folga is None or folga >= 3 * restantes[u]
+
+    def sobra(folga: int | None, pontos: int) -> float:
+        return float('inf') if folga is None else folga - pontos
+
+    def busca(k: int, excecoes: int) -> bool:
+        if k == len(jogos):
+            return True
+        estado = (k, tuple(folgas), excecoes)
+        if estado in falhas:
+            return False
+        # Enquanto nenhum ramo falhou, a busca segue direto, sem calcular o fluxo a cada jogo.
+        excesso = excesso_relaxado(folgas, jogos[k:]) if k == 0 or falhas else 0
+        if excesso > 0:
+            capacidades = sorted((2 * restantes[u] for u in range(len(folgas)) if folgas[u] is not None),
+                                 reverse=True)
+            if sum(capacidades[:excecoes]) < excesso:
+                falhas.add(estado)
+                return False
+
+        u, v = jogos[k]
+        livre_u, livre_v = livre(u), livre(v)
+        restantes[u] -= 1
+        restantes[v] -= 1
+        if livre_u or livre_v:
+            vencedor = u if livre_u else v
+            anterior = folgas[vencedor]
+            if anterior is not None:
+                folgas[vencedor] = anterior - 3
+            encontrado = busca(k + 1, excecoes)
+            folgas[vencedor] = anterior
+        else:
+            fu, fv = folgas[u], folgas[v]
+            opcoes = sorted(PONTUACOES, key=lambda p: ((sobra(fu, p[0]) < 0) + (sobra(fv, p[1]) < 0),
+                                                       -min(sobra(fu, p[0]), sobra(fv, p[1]))))
+            encontrado = False
+            for pu, pv in opcoes:
+                sobra_u, sobra_v = sobra(fu, pu), sobra(fv, pv)
+                estouros = (sobra_u < 0) + (sobra_v < 0)
+                if estouros <= excecoes:
+                    folgas[u] = None if fu is None or sobra_u < 0 else fu - pu
+                    folgas[v] = None if fv is None or sobra_v < 0 else fv - pv
+                    encontrado = busca(k + 1, excecoes - estouros)
+                    folgas[u], folgas[v] = fu, fv
+                    if encontrado:
+                        break
+        restantes[u] += 1
+        restantes[v] += 1
+        if not encontrado:
+            falhas.add(estado)
+        return encontrado
+
+    return busca(0, excecoes)
+
+
+def possivel_somar(pontos: int, jogos: int) -> bool:
+    '''
+    Devolve se é possível somar exatamente *pontos* em *jogos* jogos. Com vitórias e
+    empates, todos os valores de 0 a 3 * *jogos* são possíveis, menos 3 * *jogos* - 1.
+
+    Exemplos:
+    >>> [pontos for pontos in range(8) if possivel_somar(pontos, 2)]
+    [0, 1, 2, 3, 4, 6]
+    '''
+    return 0 <= pontos <= 3 * jogos and (jogos == 0 or pontos != 3 * jogos - 1)
+
+
+def meios_jogos(perda: int) -> int:
+    '''
+    Devolve quantos meios jogos uma equipe cobre perdendo no máximo *perda* pontos. Uma
+    derrota cobre um jogo inteiro, 2 meios, por 3 pontos, e um empate cobre 1 meio por 2,
+    então o máximo é 2 por derrota completa, mais 1 empate se sobrarem 2 pontos.
+
+    Exemplos:
+    >>> [meios_jogos(perda) for perda in range(7)]
+    [0, 0, 1, 2, 2, 3, 4]
+    '''
+    return 2 * (perda // 3) + (perda % 3 == 2)
+
+
+def cabem_jogo_a_jogo(folgas: list[int | None], jogos: list[tuple[int, int]], exata: int) -> bool:
+    '''
+    Responde a mesma pergunta de *cabem_perdas* com uma busca em profundidade jogo a jogo.
+
+    As equipes são ordenadas para que cada uma comece a jogar junto das que já jogaram com
+    ela, e os jogos seguem essa ordem, de forma que poucas equipes fiquem com jogos pela
+    metade. O estado depois de cada jogo é então só a folga dessas equipes, limitada a 3
+    por jogo restante, já que uma folga maior nunca falta, e os estados que já falharam
+    não são repetidos. Depois da primeira falha, cada estado também passa por
+    *excesso_relaxado*, contado em *meios_jogos*.
+
+    Exemplos:
+    >>> cabem_jogo_a_jogo([3, 3, 3, 3], [(0, 1), (1, 2), (0, 2), (0, 3)], 3)
+    True
+    >>> cabem_jogo_a_jogo([2, 2, 2, 0], [(0, 1), (1, 2), (0, 2)], 3)
+    False
+    '''
+    if any(folga < 0 for folga in folgas if folga is not None):
+        return False
+    # Um jogo sem equipe com folga, ou de uma equipe sem folga contra outra que não a exata,
+    # não limita ninguém.
+    jogos = [(u, v) for u, v in jogos if folgas[u] is not None and folgas[v] is not None or exata in (u, v)]
+    vizinhas: dict[int, Counter[int]] = {u: Counter() for u in range(len(folgas))}
+    for u, v in jogos:
+        vizinhas[u][v] += 1
+        vizinhas[v][u] += 1
+    ordem: list[int] = []
+    pendentes = {u for u, folga in enumerate(folgas) if folga is not None and vizinhas[u]}
+    while pendentes:
+        u = max(pendentes, key=lambda u: (sum(vizinhas[u][v] for v in ordem), -sum(vizinhas[u].values())))
+        ordem.append(u)
+        pendentes.remove(u)
+    posicao = {u: i for i, u in enumerate(ordem)}
+    jogos.sort(key=lambda jogo: (max(posicao.get(u, -1) for u in jogo), min(posicao.get(u, len(ordem)) for u in jogo)))
+    ultimo: dict[int, int] = {}
+    for k, (u, v) in enumerate(jogos):
+        ultimo[u] = ultimo[v] = k
+    jogando: list[list[int]] = [[] for _ in range(len(jogos) + 1)]
+    for u, k in ultimo.items():
+        if folgas[u] is not None:
+            for i in range(k + 1):
+                jogando[i].append(u)
+
+    sobras = list(folgas)
+    restantes: Counter[int] = Counter()
+    for u, v in jogos:
+        restantes[u] += 1
+        restantes[v] += 1
+    falhas: set[tuple] = set()
+
+    def limitada(u: int) -> int | None:
+        sobra = sobras[u]
+        return sobra if sobra is None or u == exata else min(sobra, 3 * restantes[u])
+
+    def busca(k: int) -> bool:
+        # A perda da exata, contada em pontos não somados, precisa continuar possível.
+        sobra_exata = sobras[exata]
+        if sobra_exata is not None and not possivel_somar(3 * restantes[exata] - sobra_exata, restantes[exata]):
+            return False
+        if k == len(jogos):
+            return True
+        estado = (k, tuple(limitada(u) for u in jogando[k]))
+        if estado in falhas:
+            return False
+        if falhas or k == 0:
+            meios = [None if sobra is None else meios_jogos(sobra) for sobra in sobras]
+            if excesso_relaxado(meios, jogos[k:]) > 0:
+                falhas.add(estado)
+                return False
+        u, v = jogos[k]
+        sobra_u, sobra_v = sobras[u], sobras[v]
+        restantes[u] -= 1
+        restantes[v] -= 1
+        encontrado = False
+        # As vitórias antes do empate, que custa mais caro no total.
+        for perda_u, perda_v in (PERDAS[0], PERDAS[2], PERDAS[1]):
+            nova_u = None if sobra_u is None else sobra_u - perda_u
+            nova_v = None if sobra_v is None else sobra_v - perda_v
+            if (nova_u is None or nova_u >= 0) and (nova_v is None or nova_v >= 0):
+                sobras[u], sobras[v] = nova_u, nova_v
+                if busca(k + 1):
+                    encontrado = True
+                    break
+        sobras[u], sobras[v] = sobra_u, sobra_v
+        restantes[u] += 1
+        restantes[v] += 1
+        if not encontrado:
+            falhas.add(estado)
+        return encontrado
+
+    return busca(0)
+
+
+def cabem_perdas(folgas: list[int | None], jogos: list[tuple[int, int]], exata: int, limite: int = 100) -> bool:
+    '''
+    Devolve se existe algum resultado para os *jogos*, contados em PERDAS, em que a equipe
+    *exata* perde exatamente a sua folga e todas as demais equipes com folga perdem no
+    máximo a sua. Equipes com folga None aceitam qualquer perda: elas perdem para as
+    equipes com folga, e os jogos delas contra a *exata* podem ter qualquer resultado.
+
+    Um empate custa 4 pontos de perda, 2 para cada equipe, contra 3 de uma vitória, então
+    a busca só ramifica nos empates. Fixados os empates, cada equipe pode perder no máximo
+    (folga - 2 * empates) // 3 jogos, e distribuir as derrotas é um emparelhamento
+    resolvido exatamente por fluxo máximo, com a *exata* perdendo um número exato de jogos.
+    Se o fluxo não cobre todos os jogos, o corte mínimo aponta um grupo de equipes com mais
+    jogos entre si do que derrotas disponíveis, e só um empate dentro do grupo pode
+    resolver: a busca ramifica apenas nesses empates, e cada ramo proíbe os empates dos
+    ramos anteriores, para não repetir conjuntos. Os ramos em que nem os meios jogos de
+    *meios_jogos* cobrem os jogos são descartados por *excesso_relaxado*.
+
+    Quando as folgas são apertadas e quase todo conjunto de empates falha, a busca pode
+    crescer muito; passados *limite* estados, a resposta fica com *cabem_jogo_a_jogo*, que
+    nesses casos repete muitos estados e se sai melhor.
+
+    Exemplos:
+    >>> cabem_perdas([3, 3, 3, 3], [(0, 1), (1, 2), (0, 2), (0, 3)], 3)
+    True
+    >>> cabem_perdas([2, 2, 2, 0], [(0, 1), (1, 2), (0, 2)], 3)
+    False
+    >>> cabem_perdas([2, 2, 6, 0], [(0, 1), (1, 2), (0, 2)], 3)
+    True
+    '''
+    n = len(folgas)
+    if any(folga < 0 for folga in folgas if folga is not None):
+        return False
+    disputados = [(min(u, v), max(u, v)) for u, v in jogos if folgas[u] is not None and folgas[v] is not None]
+    # Nos jogos contra equipes sem folga, a exata pode perder 0, 2 ou 3 pontos cada.
+    flexiveis = sum(1 for u, v in jogos if exata in (u, v) and (folgas[u] is None or folgas[v] is None))
+
+    def derrotas_exata(sobra: int, jogos_exata: int) -> list[int]:
+        # Números de derrotas da exata nos jogos disputados que completam a sua perda.
+        return [derrotas for derrotas in range(min(sobra // 3, jogos_exata), -1, -1)
+                if sobra - 3 * derrotas == 0 or flexiveis > 0 and 2 <= sobra - 3 * derrotas <= 3 * flexiveis]
+
+    def cobre(decididos: Counter[tuple[int, int]], capacidades: dict[int, int], derrotas: int) -> set[int] | None:
+        # Devolve None se as derrotas cobrem os jogos decididos, ou um grupo com mais jogos
+        # entre si do que derrotas. A exata, limitada a *derrotas*, pode sempre completá-las
+        # tomando para si jogos dela que outra equipe perdia, já que nunca passam dos seus jogos.
+        limites: list[int | None] = [derrotas if u == exata else capacidades.get(u, 0) for u in range(n)]
+        excesso, grupo = grupo_excedente(limites, decididos, 1)
+        return None if excesso == 0 else grupo
+
+    estados = 0
+
+    def busca(empates: set[int], proibidos: set[int]) -> bool | None:
+        # Devolve None se a busca passou do limite de estados.
+        nonlocal estados
+        estados += 1
+        if estados > limite:
+            return None
+        sobras = {u: folga for u, folga in enumerate(folgas) if folga is not None}
+        for i in empates:
+            for u in disputados[i]:
+                sobras[u] -= 2
+        if any(sobra < 0 for sobra in sobras.values()):
+            return False
+        decididos = Counter(par for i, par in enumerate(disputados) if i not in empates)
+        jogos_exata = sum(quantidade for par, quantidade in decididos.items() if exata in par)
+        if sobras[exata] > 3 * (jogos_exata + flexiveis):
+            return False
+        envolvidas = {u for par in decididos for u in par}
+        if sum(sobras[u] for u in envolvidas) < 3 * sum(decididos.values()):
+            return False
+        meios = [None if folga is None else meios_jogos(sobras[u]) for u, folga in enumerate(folgas)]
+        if excesso_relaxado(meios, list(decididos.elements())) > 0:
+            return False
+
+        capacidades = {u: sobra // 3 for u, sobra in sobras.items()}
+        possiveis = derrotas_exata(sobras[exata], jogos_exata)
+        for derrotas in possiveis:
+            if cobre(decididos, capacidades, derrotas) is None:
+                return True
+        capacidades[exata] = min(sobras[exata] // 3, jogos_exata)
+
+        empataveis = [i for i in range(len(disputados)) if i not in empates and i not in proibidos
+                      and min(sobras[u] for u in disputados[i]) >= 2]
+        if not possiveis:
+            # Nenhum número de derrotas completa a perda da exata: só um empate dela muda isso.
+            empataveis = [i for i in empataveis if exata in disputados[i]]
+        else:
+            grupo = cobre(decididos, capacidades, capacidades[exata])
+            if grupo is not None:
+                # Cada empate dentro do grupo reduz em no máximo 1 a falta de derrotas e
+                # consome 1 ponto da folga do grupo, que não pode ficar negativa.
+                total = sum(quantidade for (u, v), quantidade in decididos.items() if u in grupo and v in grupo)
+                falta = total - sum(capacidades[u] for u in grupo)
+                if falta > sum(sobras[u] for u in grupo) - 3 * total:
+                    return False
+                empataveis = [i for i in empataveis if disputados[i][0] in grupo and disputados[i][1] in grupo]
+        # Primeiro os empates da exata, depois os que aproveitam sobras que não completam
+        # uma derrota.
+        empataveis.sort(key=lambda i: (exata not in disputados[i], sum(sobras[u] % 3 != 2 for u in disputados[i])))
+        proibidos = set(proibidos)
+        for i in empataveis:
+            encontrado = busca(empates | {i}, proibidos)
+            if encontrado is not False:
+                return encontrado
+            proibidos.add(i)
+        return False
+
+    encontrado = busca(set(), set())
+    return cabem_jogo_a_jogo(folgas, jogos, exata) if encontrado is None else encontrado
+
+
+def alcancam(folgas: list[int | None], jogos: list[tuple[int, int]], quantidade: int, exata: int) -> bool:
+    '''
+    Devolve se existe algum resultado para os *jogos*, contados em PERDAS, em que a equipe
+    *exata* perde exatamente a sua folga e pelo menos *quantidade* das demais equipes com
+    folga perdem no máximo a sua. Equipes com folga None nunca contam.
+
+    Antes da busca, dois testes resolvem a maior parte dos casos com uma chamada cada: as
+    *quantidade* candidatas de maior folga, testadas juntas por *cabem_perdas*, e o
+    excesso de *excesso_relaxado*, contado em *meios_jogos*, com todas as candidatas como
+    opcionais e as que podem ser descartadas como exceções.
+
+    Se um conjunto de equipes consegue ficar dentro das folgas, qualquer parte dele também
+    consegue, já que as equipes deixadas de fora passam a perder os seus jogos. Então a
+    busca monta o conjunto equipe a equipe, das de maior folga para as de menor, testando
+    cada conjunto parcial com *cabem_perdas*, e desiste de um ramo quando nem as melhores
+    candidatas restantes completam o conjunto: contados em *meios_jogos*, os jogos entre
+    as escolhidas, e os que cada candidata teria com elas e com as outras candidatas, não
+    cabem nas folgas. Quando sobram poucas candidatas a descartar, como no rebaixamento,
+    essa conta é refeita por *excesso_relaxado*, como no teste inicial.
+
+    Exemplos:
+    >>> alcancam([3, 3, 3, 3], [(0, 1), (1, 2), (0, 2), (0, 3)], 3, 3)
+    True
+    >>> alcancam([2, 2, 2, 3], [(0, 1), (1, 2), (0, 2), (0, 3)], 3, 3)
+    False
+    '''
+    limites = {u: folga for u, folga in enumerate(folgas) if folga is not None}
+    candidatas = sorted((u for u in limites if u != exata), key=lambda u: -limites[u])
+    if len(candidatas) < quantidade:
+        return False
+    entre = [[0] * len(folgas) for _ in folgas]     # Jogos entre cada par de equipes.
+    for u, v in jogos:
+        entre[u][v] += 1
+        entre[v][u] += 1
+    meios = {u: meios_jogos(folga) for u, folga in limites.items()}
+
+    def cabem(escolhidas: set[int]) -> bool:
+        parciais = [folga if u in escolhidas or u == exata else None for u, folga in enumerate(folgas)]
+        # Só contam os jogos da exata e os jogos entre as escolhidas: nos demais, a equipe
+        # sem folga perde, sem tirar pontos de ninguém.
+        grupo = escolhidas | {exata}
+        relevantes = [(u, v) for u, v in jogos if u in grupo and v in grupo or exata in (u, v)]
+        return cabem_perdas(parciais, relevantes, exata)
+
+    def descartaveis(grupo: set[int], restantes: list[int], faltam: int) -> bool:
+        # Devolve se as folgas, em meios jogos, comportam o grupo e faltam das restantes.
+        meios_parciais = [meios[u] if u in grupo or u in restantes else None for u in range(len(folgas))]
+        return excesso_relaxado(meios_parciais, jogos, 2, set(restantes), len(restantes) - faltam) == 0
+
+    def completa(escolhidas: set[int], inicio: int) -> bool:
+        faltam = quantidade - len(escolhidas)
+        if faltam == 0:
+            return True
+        restantes = candidatas[inicio:]
+        if len(restantes) < faltam:
+            return False
+        grupo = escolhidas | {exata}
+        saldo = sum(meios[u] for u in grupo) - sum(entre[u][v] for u in grupo for v in grupo)
+        # Uma candidata escolhida joga com o grupo e com pelo menos as faltam - 1 candidatas
+        # com quem tem menos jogos; cada jogo entre duas delas custa 1 meio a cada uma.
+        ganhos = sorted((meios[u] - 2 * sum(entre[u][v] for v in grupo)
+                         - sum(sorted(entre[u][v] for v in restantes if v != u)[:faltam - 1])
+                         for u in restantes), reverse=True)
+        if saldo + sum(ganhos[:faltam]) < 0:
+            return False
+        if len(restantes) - faltam < faltam and not descartaveis(grupo, restantes, faltam):
+            return False
+        for i in range(inicio, len(candidatas) - faltam + 1):
+            proximas = escolhidas | {candidatas[i]}
+            if (len(proximas) > 1 and faltam > 2 or cabem(proximas)) and completa(proximas, i + 1):
+                return True
+        return False
+
+    if cabem(set(candidatas[:quantidade])):
+        return True
+    if not descartaveis({exata}, candidatas, quantidade):
+        return False
+    return cabem(set()) and completa(set(), 0)
+
+
+def pode_terminar_entre(pontos: list[int], jogos: list[tuple[int, int]], equipe: int, k: int) -> bool:
+    '''
+    Devolve se a *equipe* ainda pode terminar entre as *k* primeiras, isto é, se existe
+    algum resultado para os *jogos* restantes em que menos de *k* equipes terminem com
+    mais pontos do que ela. Empates em pontos são considerados favoráveis à *equipe*.
+
+    Vencer é sempre o melhor para a *equipe*, já que soma pontos e não dá pontos ao
+    adversário, então ela vence todos os seus jogos e as demais equipes têm como folga
+    a diferença para a pontuação final dela.
+
+    Exemplos:
+    >>> pode_terminar_entre([9, 7, 7, 7], [(1, 2), (2, 3), (1, 3)], 0, 1)
+    True
+    >>> pode_terminar_entre([9, 8, 8, 8], [(1, 2), (2, 3), (1, 3)], 0, 1)
+    False
+    >>> pode_terminar_entre([9, 8, 8, 8], [(1, 2), (2, 3), (1, 3)], 0, 2)
+    True
+    '''
+    if k <= 0:
+        return False
+    alvo = pontos[equipe] + 3 * sum(1 for jogo in jogos if equipe in jogo)
+    folgas: list[int | None] = [None if pontos[u] > alvo else alvo - pontos[u] for u in range(len(pontos))]
+    excecoes = k - 1 - sum(1 for u in range(len(pontos)) if u != equipe and folgas[u] is None)
+    if excecoes < 0:
+        return False
+    outros = [jogo for jogo in jogos if equipe not in jogo]
+    return cabe_com_excecoes(folgas, outros, excecoes)
+
+
+def pode_terminar_fora(pontos: list[int], jogos: list[tuple[int, int]], equipe: int, k: int,
+                       ganho_minimo: int = 0) -> bool:
+    '''
+    Devolve se a *equipe* ainda pode terminar fora das *k* primeiras mesmo somando pelo
+    menos *ganho_minimo* pontos nos seus jogos restantes, isto é, se existe algum
+    resultado para os *jogos* em que ela some esses pontos e pelo menos *k* equipes
+    terminem com tantos pontos quanto ela ou mais. Empates em pontos são considerados
+    desfavoráveis à *equipe*.
+
+    Basta testar a *equipe* somando exatamente *ganho_minimo* ou *ganho_minimo* + 1 pontos:
+    em qualquer resultado em que ela some mais, trocar uma vitória por empate, ou um
+    empate por derrota, tira pontos dela e dá ao adversário, o que não atrapalha as
+    demais equipes, até que o ganho caia para um desses dois valores.
+
+    Com o ganho fixado, a pergunta é contada em pontos perdidos, conforme PERDAS: cada
+    equipe pode perder no máximo a diferença entre a sua pontuação máxima e a da *equipe*,
+    pelo menos *k* equipes precisam ficar dentro desse limite, e a *equipe* perde
+    exatamente os pontos que não soma, o que é respondido por *alcancam*.
+
+    Exemplos:
+    >>> pode_terminar_fora([12, 7, 7, 7], [(0, 1), (1, 2), (2, 3), (1, 3)], 0, 1, 1)
+    True
+    >>> pode_terminar_fora([12, 7, 7, 7], [(0, 1), (1, 2), (2, 3), (1, 3)], 0, 1, 3)
+    False
+    '''
+    if k >= len(pontos):
+        return False
+    restantes: Counter[int] = Counter()
+    for u, v in jogos:
+        restantes[u] += 1
+        restantes[v] += 1
+    for ganho in (ganho_minimo, ganho_minimo + 1):
+        if not possivel_somar(ganho, restantes[equipe]):
+            continue
+        alvo = pontos[equipe] + ganho
+        folgas: list[int | None] = [None if pontos[u] + 3 * restantes[u] < alvo else pontos[u] + 3 * restantes[u] - alvo
+                                    for u in range(len(pontos))]
+        folgas[equipe] = 3 * restantes[equipe] - ganho
+        if alcancam(folgas, jogos, k, equipe):
+            return True
+    return False
+
+
+def pontos_necessarios(pontos: list[int], jogos: list[tuple[int, int]], equipe: int, k: int,
+                       minimo: int = 0) -> int | None:
+    '''
+    Devolve o número mágico da *equipe* para terminar entre as *k* primeiras: o menor
+    número de pontos que, somados nos seus jogos restantes, garantem a posição quaisquer
+    que sejam os demais resultados. Devolve None se nem vencendo todos os jogos a posição
+    estiver garantida, ou seja, se ela depender de outros resultados.
+
+    Quanto mais pontos a equipe soma, menos resultados permitem que ela fique fora das *k*
+    primeiras, então a busca é binária entre *minimo*, que precisa ser no máximo o número
+    mágico, e o menor ganho que deixa menos de *k* equipes capazes de alcançá-la, que
+    sempre basta. Como com r jogos é impossível somar exatamente 3r - 1 pontos, esse
+    valor é arredondado para 3r.
+
+    Exemplos:
+    >>> pontos_necessarios([12, 7, 7, 7], [(0, 1), (1, 2), (2, 3), (1, 3)], 0, 1)
+    3
+    >>> pontos_necessarios([12, 7, 7, 7], [(0, 1), (1, 2), (2, 3), (1, 3)], 3, 1) is None
+    True
+    '''
+    restantes: Counter[int] = Counter()
+    for u, v in jogos:
+        restantes[u] += 1
+        restantes[v] += 1
+    maximo = 3 * restantes[equipe]
+    finais = sorted((pontos[u] + 3 * restantes[u] for u in range(len(pontos)) if u != equipe), reverse=True)
+    suficiente = 0 if len(finais) < k else max(finais[k - 1] - pontos[equipe] + 1, 0)
+    if suficiente > maximo:
+        if pode_terminar_fora(pontos, jogos, equipe, k, maximo):
+            return None
+        suficiente = maximo
+    inicio, fim = min(minimo, suficiente), suficiente
+    while inicio < fim:
+        meio = (inicio + fim) // 2
+        if pode_terminar_fora(pontos, jogos, equipe, k, meio):
+            inicio = meio + 1
+        else:
+            fim = meio
+    return maximo if inicio == maximo - 1 else inicio
+
+
+def situacao(pontos: list[int], jogos: list[tuple[int, int]], equipe: int, k: int) -> str:
+    '''
+    Devolve GARANTIDO se a *equipe* termina entre as *k* primeiras em qualquer resultado
+    dos *jogos*, ELIMINADO se não termina em nenhum, e POSSIVEL nos demais casos.
+    '''
+    if not pode_terminar_fora(pontos, jogos, equipe, k):
+        return GARANTIDO
+    if not pode_terminar_entre(pontos, jogos, equipe, k):
+        return ELIMINADO
+    return POSSIVEL
+
+
+def jogos_restantes(equipes: list[Equipe], rodadas: list[list[Jogo]]) -> tuple[list[int], list[tuple[int, int]]]:
+    '''
+    Devolve os pontos atuais de *equipes* e os jogos sem resultado de *rodadas*, com cada
+    equipe representada pela sua posição em *equipes*.
+    '''
+    posicoes = {equipe.nome: i for i, equipe in enumerate(equipes)}
+    jogos = [(posicoes[jogo.mandante.nome], posicoes[jogo.visitante.nome])
+             for rodada in rodadas for jogo in rodada
+             if jogo.gols_mandante is None or jogo.gols_visitante is None]
+    return [equipe.pontos for equipe in equipes], jogos
+
+
+def analisa_campeonato(equipes: list[Equipe], rodadas: list[list[Jogo]]) -> list[SituacaoEquipe]:
+    '''
+    Calcula, para cada uma das *equipes*, a situação matemática no título, na Libertadores
+    e no rebaixamento, considerando os jogos sem resultado de *rodadas*, e os pontos que
+    ela ainda precisa somar para garantir cada objetivo.
+
+    Com pontuação 3-1-0, decidir se uma equipe está eliminada é um problema NP-completo,
+    ao contrário do caso com apenas vitórias e derrotas, que é um fluxo máximo. Por isso,
+    o fluxo máximo é usado como poda de buscas exatas: a situação de uma equipe sai em
+    milissegundos para 20 equipes, e os pontos necessários, que exigem uma busca binária
+    e provas de que nenhum resultado serve, levam de centenas de milissegundos a cerca de
+    dois segundos para a tabela inteira nas disputas mais apertadas.
+
+    Os pontos necessários de uma zona maior nunca passam dos de uma zona menor, então a
+    permanência é calculada primeiro e serve de ponto de partida para a Libertadores, que
+    serve para o título. Os critérios de desempate além dos pontos não são considerados:
+    um empate em pontos conta a favor da equipe para POSSIVEL e contra ela para GARANTIDO.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas, recalcula_estatisticas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> for rodada in rodadas[:5]:
+    ...     for jogo in rodada:
+    ...         jogo.gols_mandante, jogo.gols_visitante = (1, 0) if jogo.mandante is equipes[0] else (0, 0)
+    >>> recalcula_estatisticas(equipes, rodadas)
+    >>> [(s.nome, s.titulo, s.pontos_titulo) for s in analisa_campeonato(equipes, rodadas)]
+    [('Corinthians', 'garantido', 0), ('Palmeiras', 'eliminado', None), ('Santos', 'eliminado', None), ('São Paulo', 'eliminado', None)]
+    '''
+    pontos, jogos = jogos_restantes(equipes, rodadas)
+    n = len(equipes)
+    titulo = ZONAS['titulo'][1]
+    libertadores = min(ZONAS['libertadores'][1], n)
+    permanencia = max(n - (ZONAS['rebaixamento'][1] - ZONAS['rebaixamento'][0] + 1), 0)
+
+    def necessarios(i: int, k: int, estado: str, minimo: int | None) -> int | None:
+        # Uma posição garantida não precisa de pontos, e uma perdida não depende só da equipe,
+        # assim como uma zona menor quando a maior também não depende.
+        if estado == GARANTIDO:
+            return 0
+        if estado == ELIMINADO or minimo is None:
+            return None
+        return pontos_necessarios(pontos, jogos, i, k, minimo)
+
+    analise = []
+    for i, equipe in enumerate(equipes):
+        fica = situacao(pontos, jogos, i, permanencia)
+        classificado = situacao(pontos, jogos, i, libertadores)
+        campeao = situacao(pontos, jogos, i, titulo)
+        rebaixamento = GARANTIDO if fica == ELIMINADO else ELIMINADO if fica == GARANTIDO else POSSIVEL
+        pontos_permanencia = necessarios(i, permanencia, fica, 0)
+        pontos_libertadores = necessarios(i, libertadores, classificado, pontos_permanencia)
+        pontos_titulo = necessarios(i, titulo, campeao, pontos_libertadores)
+        analise.append(SituacaoEquipe(
+            equipe.nome,
+            campeao,
+            classificado,
+            rebaixamento,
+            pontos_titulo,
+            pontos_libertadores,
+            pontos_permanencia,
+        ))
+    return analise
+
+
+def exibe_analise(analise: list[SituacaoEquipe]):
+    '''
+    Exibe a situação de cada equipe de *analise* e os pontos que ela ainda precisa somar
+    para garantir cada objetivo, com '-' quando isso não depende só dela.
+    '''
+    def pontos(valor: int | None) -> str:
+        return '-' if valor is None else str(valor)
+
+    print()
+    print(f'{'EQUIPE':<20} {'TÍTULO':^11} {'LIBERTADORES':^13} {'REBAIXAMENTO':^13} {'PTS TÍT':^8} {'PTS LIB':^8} {'PTS PERM':^8}')
+    for s in analise:
+        print(f'{s.nome:<20} {s.titulo:^11} {s.libertadores:^13} {s.rebaixamento:^13} '
+              f'{pontos(s.pontos_titulo):^8} {pontos(s.pontos_libertadores):^8} {pontos(s.pontos_permanencia):^8}')
@@ -0,0 +1,388 @@
+# API - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+import sys
+import time
+from collections.abc import Iterable
+
+import persistencia_campeonato as persistencia
+from desempate import CRITERIOS_BRASILEIRAO, ConfrontosDiretos, MotorDesempate
+from historico_classificacao import HistoricoClassificacao
+from simulador_campeonato_brasileiro import (Classificacao, Equipe, IndiceJogos, Jogo, LogResultados,
+                                             RegistroEquipes, gera_rodadas)
+
+# Um roteiro tem um comando por linha, com os campos separados por SEPARADOR. Linhas em
+# branco e linhas iniciadas por '#' são ignoradas.
+SEPARADOR = ';'
+
+
+class Campeonato:
+    '''
+    Campeonato de pontos corridos controlado por chamadas de função, sem nenhuma leitura
+    do teclado: o mesmo fluxo do menu principal (registrar equipes, gerar as rodadas,
+    registrar resultados e consultar a tabela), para uso como biblioteca.
+
+    Os resultados passam por um LogResultados, de forma que podem ser desfeitos, e a
+    tabela é mantida por uma Classificacao e, rodada a rodada, por um
+    HistoricoClassificacao, montado só na primeira consulta de uma rodada. A tabela
+    atual é desempatada por um MotorDesempate com os *criterios* informados, por padrão
+    os do Brasileirão, incluindo o confronto direto. O campeonato pode ser gravado por
+    *salva* e lido de volta por *carrega*. Erros levantam ValueError, com as mesmas
+    mensagens do menu.
+
+    Exemplos:
+    >>> campeonato = Campeonato(['Corinthians', 'Palmeiras', 'Santos'])
+    >>> campeonato.registra_equipe('São Paulo')
+    3
+    >>> campeonato.inicia()
+    >>> campeonato.registra_resultado(1, 'Corinthians', 'São Paulo', 2, 1)
+    >>> campeonato.registra_resultado(1, 'Corinthians', 'São Paulo', 0, 0)
+    Traceback (most recent call last):
+    ...
+    ValueError: Resultado já registrado!
+    >>> [(equipe.nome, equipe.pontos) for equipe in campeonato.tabela()][:2]
+    [('Corinthians', 3), ('Palmeiras', 0)]
+    >>> campeonato.altera_resultado(1, 'Corinthians', 'São Paulo', 0, 1)
+    >>> campeonato.tabela()[0].nome
+    'São Paulo'
+    >>> campeonato.desfaz()
+    True
+    >>> campeonato.tabela()[0].nome
+    'Corinthians'
+    >>> campeonato.historico is None
+    True
+    >>> campeonato.tabela(rodada=0)[0].pontos
+    0
+    >>> import os, tempfile
+    >>> caminho = os.path.join(tempfile.mkdtemp(), 'campeonato.bin')
+    >>> campeonato.salva(caminho)
+    >>> copia = Campeonato.carrega(caminho)
+    >>> [(equipe.nome, equipe.pontos) for equipe in copia.tabela()][:2]
+    [('Corinthians', 3), ('Palmeiras', 0)]
+    >>> copia.altera_resultado(1, 'Corinthians', 'São Paulo', 1, 1)
+    >>> copia.tabela()[0].pontos, campeonato.tabela()[0].pontos
+    (1, 3)
+    >>> campeonato.registra_resultado(1, 'Palmeiras', 'Santos', 2, 1)
+    >>> campeonato.registra_resultado(2, 'Santos', 'Corinthians', 1, 0)
+    >>> [equipe.nome for equipe in campeonato.tabela()][:3]
+    ['Palmeiras', 'Santos', 'Corinthians']
+    >>> Campeonato(criterios=('pontos', 'cartoes'))
+    Traceback (most recent call last):
+    ...
+    ValueError: Critério desconhecido: cartoes
+    '''
+    registro: RegistroEquipes
+    equipes: list[Equipe]
+    rodadas: list[list[Jogo]]
+    indice: IndiceJogos | None
+    classificacao: Classificacao | None
+    historico: HistoricoClassificacao | None
+    desempate: MotorDesempate | None
+    log: LogResultados
+
+    def __init__(self, nomes: list[str] | None = None,
+                 criterios: tuple[str, ...] | None = CRITERIOS_BRASILEIRAO) -> None:
+        '''
+        Cria um campeonato, opcionalmente já com as equipes de *nomes*, desempatado pelos
+        *criterios* de MotorDesempate ou, com None, só pela ordem da Classificacao.
+        Levanta ValueError se algum critério não existir.
+        '''
+        self.registro = RegistroEquipes(nomes)
+        self.equipes = []
+        self.rodadas = []
+        self.indice = None
+        self.classificacao = None
+        self.historico = None
+        self.desempate = None if criterios is None else MotorDesempate(criterios, ConfrontosDiretos())
+        self.log = LogResultados()
+
+    def registra_equipe(self, nome: str) -> int:
+        '''
+        Registra a equipe *nome* e devolve o seu identificador.
+        Levanta ValueError se o campeonato já tiver começado ou se a equipe já existir.
+        '''
+        if self.indice is not None:
+            raise ValueError('O campeonato já começou!')
+        return self.registro.registra(nome)
+
+    def renomeia_equipe(self, nome: str, novo_nome: str):
+        '''
+        Troca o nome da equipe *nome* por *novo_nome*.
+        Levanta ValueError se o campeonato já tiver começado ou se algum nome for inválido.
+        '''
+        if self.indice is not None:
+            raise ValueError('O campeonato já começou!')
+        self.registro.renomeia(nome, novo_nome)
+
+    def inicia(self, ida_e_volta: bool = True):
+        '''
+        Cria as equipes e gera as rodadas do campeonato, em turno único ou em ida e volta.
+        Levanta ValueError se o campeonato já tiver começado ou tiver menos de 2 equipes.
+        '''
+        if self.indice is not None:
+            raise ValueError('O campeonato já começou!')
+        if len(self.registro) < 2:
+            raise ValueError('São necessárias ao menos 2 equipes para o campeonato começar!')
+        self.__monta(gera_rodadas(self.registro.inicia_equipes(), ida_e_volta))
+
+    def salva(self, caminho: str):
+        '''
+        Grava em *caminho* o snapshot das equipes, das rodadas e dos placares do
+        campeonato, como *persistencia_campeonato.salva*. O log não é gravado. Levanta
+        ValueError se o campeonato não tiver começado ou se algum placar não puder ser gravado.
+        '''
+        if self.indice is None:
+            raise ValueError('O campeonato ainda não começou!')
+        persistencia.salva(caminho, self.registro, self.rodadas)
+
+    @classmethod
+    def carrega(cls, caminho: str, criterios: tuple[str, ...] | None = CRITERIOS_BRASILEIRAO) -> 'Campeonato':
+        '''
+        Devolve o campeonato gravado em *caminho* por *salva*, já começado, com os
+        placares registrados e desempatado pelos *criterios*. O log começa vazio, de forma
+        que as trocas de placar anteriores à gravação não podem ser desfeitas.
+        '''
+        campeonato = cls(criterios=criterios)
+        campeonato.registro, rodadas = persistencia.carrega(caminho)
+        campeonato.__monta(rodadas)
+        return campeonato
+
+    def jogo(self, rodada: int, mandante: str, visitante: str) -> Jogo:
+        '''
+        Devolve o jogo entre *mandante* e *visitante*, nessa ordem, na *rodada*º.
+        Levanta ValueError se o campeonato não tiver começado ou se o jogo não existir.
+        '''
+        if self.indice is None:
+            raise ValueError('O campeonato ainda não começou!')
+        if mandante not in self.indice.referencias:
+            raise ValueError(f'A equipe "{mandante}" não está no campeonato!')
+        jogo = self.indice.jogo_na_rodada(mandante, rodada)
+        if jogo is None or jogo.mandante.nome != mandante or jogo.visitante.nome != visitante:
+            raise ValueError(f'O jogo {mandante} X {visitante} não está na {rodada}ª rodada!')
+        return jogo
+
+    def registra_resultado(self, rodada: int, mandante: str, visitante: str, gols_mandante: int,
+                           gols_visitante: int):
+        '''
+        Registra o placar *gols_mandante* X *gols_visitante* do jogo entre *mandante* e
+        *visitante* na *rodada*º. Como *resultado*, não altera jogos já registrados.
+        '''
+        jogo = self.jogo(rodada, mandante, visitante)
+        if jogo.gols_mandante is not None or jogo.gols_visitante is not None:
+            raise ValueError('Resultado já registrado!')
+        self.__registra(jogo, rodada, gols_mandante, gols_visitante)
+
+    def altera_resultado(self, rodada: int, mandante: str, visitante: str, gols_mandante: int | None,
+                         gols_visitante: int | None):
+        '''
+        Altera o placar já registrado do jogo entre *mandante* e *visitante* na *rodada*º
+        ou, com (None, None), o apaga. Como *altera_resultado*, exige um resultado registrado.
+        '''
+        jogo = self.jogo(rodada, mandante, visitante)
+        if jogo.gols_mandante is None or jogo.gols_visitante is None:
+            raise ValueError('Nenhum resultado registrado!')
+        self.__registra(jogo, rodada, gols_mandante, gols_visitante)
+
+    def desfaz(self) -> bool:
+        '''
+        Desfaz a última troca de placar e devolve se havia alguma para desfazer.
+        '''
+        return self.log.desfaz() is not None
+
+    def refaz(self) -> bool:
+        '''
+        Refaz a última troca de placar desfeita e devolve se havia alguma para refazer.
+        '''
+        return self.log.refaz() is not None
+
+    def tabela(self, rodada: int | None = None) -> list[Equipe]:
+        '''
+        Devolve as equipes na ordem atual de classificação, com os critérios de desempate
+        do campeonato, ou, se *rodada* for informada, cópias delas na ordem do
+        HistoricoClassificacao e com as estatísticas do final da *rodada*º. Devolve uma
+        lista vazia se o campeonato ainda não tiver começado.
+        '''
+        if self.classificacao is None:
+            return []
+        if rodada is not None:
+            if self.historico is None:
+                self.historico = HistoricoClassificacao(self.equipes, self.rodadas)
+                self.log.ouvintes.append(self.historico.atualiza_jogo)
+            return self.historico.tabela(rodada)
+        if self.desempate is None:
+            return self.classificacao.ordem()
+        return self.desempate.ordena(self.classificacao.ordem())
+
+    def __monta(self, rodadas: list[list[Jogo]]):
+        '''
+        Passa a usar as equipes do registro e *rodadas*, com os placares já registrados
+        nelas, e monta os índices e as tabelas que acompanham o log.
+        '''
+        self.equipes = self.registro.equipes
+        self.rodadas = rodadas
+        self.indice = IndiceJogos(self.rodadas)
+        self.classificacao = Classificacao(self.equipes)
+        self.historico = None
+        self.log.ouvintes.append(self.classificacao.atualiza_jogo)
+        if self.desempate is not None:
+            self.desempate.confrontos = ConfrontosDiretos(self.rodadas)
+            self.log.ouvintes.append(self.desempate.confrontos.atualiza_jogo)
+
+    def __registra(self, jogo: Jogo, rodada: int, gols_mandante: int | None, gols_visitante: int | None):
+        '''
+        Valida o placar e o registra em *jogo* por meio do log.
+        '''
+        if (gols_mandante is None) != (gols_visitante is None):
+            raise ValueError('Resultado inválido! Digite valores válidos!')
+        if gols_mandante is not None and gols_visitante is not None and (gols_mandante < 0 or gols_visitante < 0):
+            raise ValueError('Resultado inválido! Digite valores válidos!')
+        self.log.registra(jogo, rodada, gols_mandante, gols_visitante)
+
+
+def linhas_tabela(campeonato: Campeonato, rodada: int | None = None) -> list[str]:
+    '''
+    Devolve a tabela de *campeonato*, a atual ou a do final da *rodada*º, como linhas
+    de texto separadas por SEPARADOR: colocação, nome, pontos, jogos, vitórias,
+    empates, derrotas, gols marcados, gols sofridos e saldo de gols.
+
+    Exemplos:
+    >>> campeonato = Campeonato(['A', 'B'])
+    >>> campeonato.inicia()
+    >>> campeonato.registra_resultado(1, 'A', 'B', 0, 2)
+    >>> linhas_tabela(campeonato)
+    ['1;B;3;1;1;0;0;2;0;2', '2;A;0;1;0;0;1;0;2;-2']
+    '''
+    return [SEPARADOR.join(str(valor) for valor in (
+                n, equipe.nome, equipe.pontos, equipe.jogos, equipe.vitorias, equipe.empates, equipe.derrotas,
+                equipe.gols_marcados, equipe.gols_sofridos, equipe.saldo_gols))
+            for n, equipe in enumerate(campeonato.tabela(rodada), 1)]
+
+
+def executa_comando(campeonato: Campeonato, campos: list[str]) -> list[str]:
+    '''
+    Executa em *campeonato* o comando de roteiro formado por *campos* e devolve as
+    linhas que ele produz. Os comandos são:
+
+        equipe;NOME                                      registra uma equipe;
+        inicia[;turno]                                   gera as rodadas, em ida e volta ou em turno único;
+        resultado;RODADA;MANDANTE;VISITANTE;GOLS;GOLS    registra um resultado;
+        altera;RODADA;MANDANTE;VISITANTE;GOLS;GOLS       altera um resultado;
+        apaga;RODADA;MANDANTE;VISITANTE                  apaga um resultado;
+        desfaz, refaz                                    desfazem ou refazem a última troca de placar;
+        tabela[;RODADA]                                  produz as linhas de *linhas_tabela*.
+
+    Levanta ValueError para comandos desconhecidos ou campos inválidos.
+
+    Exemplos:
+    >>> campeonato = Campeonato()
+    >>> executa_comando(campeonato, ['equipe', 'A'])
+    []
+    >>> executa_comando(campeonato, ['placar'])
+    Traceback (most recent call last):
+    ...
+    ValueError: Comando desconhecido: placar
+    '''
+    comando, argumentos = campos[0], campos[1:]
+    try:
+        if comando == 'equipe' and len(argumentos) == 1:
+            campeonato.registra_equipe(argumentos[0])
+        elif comando == 'inicia' and argumentos in ([], ['turno']):
+            campeonato.inicia(ida_e_volta=not argumentos)
+        elif comando == 'resultado' and len(argumentos) == 5:
+            campeonato.registra_resultado(int(argumentos[0]), argumentos[1], argumentos[2],
+                                          int(argumentos[3]), int(argumentos[4]))
+        elif comando == 'altera' and len(argumentos) == 5:
+            campeonato.altera_resultado(int(argumentos[0]), argumentos[1], argumentos[2],
+                                        int(argumentos[3]), int(argumentos[4]))
+        elif comando == 'apaga' and len(argumentos) == 3:
+            campeonato.altera_resultado(int(argumentos[0]), argumentos[1], argumentos[2], None, None)
+        elif comando == 'desfaz' and not argumentos:
+            campeonato.desfaz()
+        elif comando == 'refaz' and not argumentos:
+            campeonato.refaz()
+        elif comando == 'tabela' and not argumentos:
+            return linhas_tabela(campeonato)
+        elif comando == 'tabela' and len(argumentos) == 1:
+            return linhas_tabela(campeonato, int(argumentos[0]))
+        elif comando in ('equipe', 'inicia', 'resultado', 'altera', 'apaga', 'desfaz', 'refaz', 'tabela'):
+            raise ValueError(f'Número de campos inválido para {comando}!')
+        else:
+            raise ValueError(f'Comando desconhecido: {comando}')
+    except ValueError as e:
+        if 'invalid literal' in str(e):
+            raise ValueError('Valor numérico inválido!')
+        raise
+    return []
+
+
+def executa_roteiro(campeonato: Campeonato, linhas: Iterable[str]) -> list[str]:
+    '''
+    Executa em *campeonato*, em ordem, os comandos de *linhas* (veja *executa_comando*)
+    e devolve todas as linhas produzidas. Levanta ValueError indicando a linha do
+    primeiro comando inválido; os comandos anteriores a ela continuam aplicados.
+
+    Exemplos:
+    >>> roteiro = [
+    ...     '# Turno único com três equipes',
+    ...     'equipe;Corinthians', 'equipe;Palmeiras', 'equipe;Santos',
+    ...     'inicia;turno',
+    ...     'resultado;1;Palmeiras;Santos;1;1',
+    ...     '',
+    ...     'tabela',
+    ... ]
+    >>> for linha in executa_roteiro(Campeonato(), roteiro):
+    ...     print(linha)
+    1;Palmeiras;1;1;0;1;0;1;1;0
+    2;Santos;1;1;0;1;0;1;1;0
+    3;Corinthians;0;0;0;0;0;0;0;0
+    >>> executa_roteiro(Campeonato(), ['equipe;A', 'resultado;1;A;B;1;0'])
+    Traceback (most recent call last):
+    ...
+    ValueError: Linha 2: O campeonato ainda não começou!
+    '''
+    saida: list[str] = []
+    for numero, linha in enumerate(linhas, 1):
+        linha = linha.strip()
+        if linha and not linha.startswith('#'):
+            try:
+                saida.extend(executa_comando(campeonato, [campo.strip() for campo in linha.split(SEPARADOR)]))
+            except ValueError as e:
+                raise ValueError(f'Linha {numero}: {e}')
+    return saida
+
+
+def main(argumentos: list[str] | None = None) -> int:
+    '''
+    Executa os roteiros informados na linha de comando, em um único campeonato, e
+    escreve as linhas produzidas na saída padrão. Com '-', o roteiro é lido da entrada
+    padrão. Devolve o código de saída: 0 em caso de sucesso e 1 em caso de erro.
+    '''
+    # Importado aqui para que importar o módulo como biblioteca continue barato.
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Executa roteiros do Simulador de Campeonato Brasileiro.')
+    parser.add_argument('roteiros', nargs='+', help="arquivos de roteiro, ou '-' para a entrada padrão")
+    parser.add_argument('--tempo', action='store_true', help='informa o tempo de execução na saída de erros')
+    opcoes = parser.parse_args(argumentos)
+
+    campeonato = Campeonato()
+    inicio = time.perf_counter()
+    for caminho in opcoes.roteiros:
+        try:
+            if caminho == '-':
+                saida = executa_roteiro(campeonato, sys.stdin)
+            else:
+                with open(caminho, encoding='utf-8') as arquivo:
+                    saida = executa_roteiro(campeonato, arquivo)
+        except (ValueError, OSError) as e:
+            print(f'Erro em {caminho}: {e}', file=sys.stderr)
+            return 1
+        for linha in saida:
+            print(linha)
+    if opcoes.tempo:
+        print(f'Tempo: {time.perf_counter() - inicio:.6f} s', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,342 @@
+# Arquivo Colunar - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+#
+# Requer NumPy.
+
+import json
+import os
+
+import numpy as np
+
+from modelos_partida import ModeloPartida
+from simulador_campeonato_brasileiro import Equipe, Jogo, converte_equipe
+from tabela_vetorizada import TabelaVetorizada, aplica_jogos, cria_tabela, indices_jogos, posicoes
+
+# Um arquivo colunar é um diretório com um arquivo binário por coluna, em little-endian,
+# e com METADADOS, que guarda as ligas, os nomes das equipes de cada liga e o número de
+# linhas válidas. Cada linha é o estado de uma equipe, em uma temporada de uma liga, ao
+# final de uma rodada. As colunas só crescem por acréscimo no final dos arquivos.
+METADADOS = 'metadados.json'
+VERSAO = 1
+COLUNAS = {
+    'liga': '<u2',
+    'temporada': '<u4',
+    'rodada': '<u2',
+    'equipe': '<u2',
+    'posicao': '<u2',
+    'pontos': '<i2',
+    'jogos': '<i2',
+    'vitorias': '<i2',
+    'empates': '<i2',
+    'derrotas': '<i2',
+    'gols_marcados': '<i2',
+    'gols_sofridos': '<i2',
+}
+
+# Número de linhas lidas de cada vez nas agregações, o que limita a memória usada.
+BLOCO_LINHAS = 1 << 22
+
+
+def le_metadados(caminho: str) -> dict:
+    '''
+    Lê os metadados do arquivo colunar do diretório *caminho*, ou devolve metadados
+    vazios se o arquivo ainda não existir.
+    '''
+    try:
+        with open(os.path.join(caminho, METADADOS), encoding='utf-8') as arquivo:
+            metadados = json.load(arquivo)
+    except FileNotFoundError:
+        return {'versao': VERSAO, 'linhas': 0, 'ligas': []}
+    if metadados.get('versao') != VERSAO:
+        raise ValueError('Versão de arquivo colunar não suportada!')
+    return metadados
+
+
+class EscritorArquivo:
+    '''
+    Acrescenta linhas a um arquivo colunar, criando-o se necessário. As linhas de cada
+    chamada são gravadas de uma vez, coluna por coluna; os metadados só são gravados em
+    *fecha*, de forma que um leitor nunca vê linhas incompletas.
+
+    Exemplos:
+    >>> import tempfile
+    >>> from simulador_campeonato_brasileiro import converte_equipe
+    >>> caminho = tempfile.mkdtemp()
+    >>> equipes = converte_equipe(['A', 'B'])
+    >>> equipes[1].pontos = 3
+    >>> with EscritorArquivo(caminho) as escritor:
+    ...     liga = escritor.registra_liga('Série A', ['A', 'B'])
+    ...     escritor.adiciona_equipes(liga, 2024, 1, [equipes[1], equipes[0]])
+    >>> arquivo = ArquivoColunar(caminho)
+    >>> len(arquivo), arquivo.coluna('pontos').tolist(), arquivo.coluna('posicao').tolist()
+    (2, [3, 0], [1, 2])
+    >>> equipes[1].pontos = 40000
+    >>> with EscritorArquivo(caminho) as escritor:
+    ...     escritor.adiciona_equipes(0, 2024, 2, equipes)
+    Traceback (most recent call last):
+    ...
+    ValueError: Valor fora dos limites da coluna pontos (-32768 a 32767)!
+    '''
+    caminho: str
+    metadados: dict
+    arquivos: dict
+
+    def __init__(self, caminho: str) -> None:
+        '''
+        Abre para acréscimo o arquivo colunar do diretório *caminho*.
+        '''
+        os.makedirs(caminho, exist_ok=True)
+        self.caminho = caminho
+        self.metadados = le_metadados(caminho)
+        self.arquivos = {}
+        for nome in COLUNAS:
+            arquivo = open(os.path.join(caminho, f'{nome}.bin'), 'ab')
+            # Descarta linhas gravadas por um escritor que não chegou a gravar os metadados.
+            arquivo.truncate(self.metadados['linhas'] * np.dtype(COLUNAS[nome]).itemsize)
+            self.arquivos[nome] = arquivo
+
+    def __enter__(self) -> 'EscritorArquivo':
+        return self
+
+    def __exit__(self, *erro) -> None:
+        self.fecha()
+
+    def registra_liga(self, nome: str, equipes: list[str]) -> int:
+        '''
+        Registra a liga *nome*, com as *equipes* na ordem dos seus identificadores, e
+        devolve o seu identificador. Se a liga já existir com as mesmas equipes, devolve
+        o identificador existente; com outras equipes, levanta ValueError.
+        '''
+        for i, liga in enumerate(self.metadados['ligas']):
+            if liga['nome'] == nome:
+                if liga['equipes'] != list(equipes):
+                    raise ValueError('Liga já registrada com outras equipes!')
+                return i
+        self.metadados['ligas'].append({'nome': nome, 'equipes': list(equipes), 'temporadas': 0})
+        return len(self.metadados['ligas']) - 1
+
+    def reserva_temporadas(self, liga: int, quantidade: int) -> int:
+        '''
+        Reserva *quantidade* números de temporada consecutivos, ainda não usados pelas
+        temporadas simuladas da *liga*, e devolve o primeiro.
+        '''
+        primeira = self.metadados['ligas'][liga]['temporadas']
+        self.metadados['ligas'][liga]['temporadas'] = primeira + quantidade
+        return primeira
+
+    def adiciona_equipes(self, liga: int, temporada: int, rodada: int, ordem: list[Equipe]):
+        '''
+        Acrescenta o estado de *ordem*, as equipes da *liga* em ordem de classificação, ao
+        final da *rodada*º da *temporada*.
+        '''
+        identificadores = {nome: i for i, nome in enumerate(self.metadados['ligas'][liga]['equipes'])}
+        self.__grava({
+            'liga': np.full(len(ordem), liga),
+            'temporada': np.full(len(ordem), temporada),
+            'rodada': np.full(len(ordem), rodada),
+            'equipe': np.array([identificadores[equipe.nome] for equipe in ordem]),
+            'posicao': np.arange(1, len(ordem) + 1),
+            'pontos': np.array([equipe.pontos for equipe in ordem]),
+            'jogos': np.array([equipe.jogos for equipe in ordem]),
+            'vitorias': np.array([equipe.vitorias for equipe in ordem]),
+            'empates': np.array([equipe.empates for equipe in ordem]),
+            'derrotas': np.array([equipe.derrotas for equipe in ordem]),
+            'gols_marcados': np.array([equipe.gols_marcados for equipe in ordem]),
+            'gols_sofridos': np.array([equipe.gols_sofridos for equipe in ordem]),
+        })
+
+    def adiciona_tabela(self, liga: int, primeira_temporada: int, rodada: int, tabela: TabelaVetorizada):
+        '''
+        Acrescenta todas as temporadas de *tabela*, ao final da *rodada*º, como as
+        temporadas *primeira_temporada*, *primeira_temporada* + 1 e assim por diante.
+        As colunas de *tabela* devem estar na ordem das equipes da *liga*.
+        '''
+        temporadas, n = tabela.pontos.shape
+        self.__grava({
+            'liga': np.full(temporadas * n, liga),
+            'temporada': np.repeat(np.arange(primeira_temporada, primeira_temporada + temporadas), n),
+            'rodada': np.full(temporadas * n, rodada),
+            'equipe': np.tile(np.arange(n), temporadas),
+            'posicao': posicoes(tabela).ravel(),
+            'pontos': tabela.pontos.ravel(),
+            'jogos': tabela.jogos.ravel(),
+            'vitorias': tabela.vitorias.ravel(),
+            'empates': tabela.empates.ravel(),
+            'derrotas': tabela.derrotas.ravel(),
+            'gols_marcados': tabela.gols_marcados.ravel(),
+            'gols_sofridos': tabela.gols_sofridos.ravel(),
+        })
+
+    def fecha(self):
+        '''
+        Fecha as colunas e grava os metadados, tornando as novas linhas visíveis.
+        '''
+        for arquivo in self.arquivos.values():
+            arquivo.close()
+        temporario = os.path.join(self.caminho, METADADOS + '.tmp')
+        with open(temporario, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.metadados, arquivo, ensure_ascii=False)
+        os.replace(temporario, os.path.join(self.caminho, METADADOS))
+
+    def __grava(self, colunas: dict[str, np.ndarray]):
+        '''
+        Acrescenta ao final de cada coluna os valores de *colunas*. Levanta ValueError,
+        sem gravar nenhuma coluna, se algum valor não couber no tipo da sua coluna.
+        '''
+        for nome, valores in colunas.items():
+            limites = np.iinfo(COLUNAS[nome])
+            if len(valores) and (valores.min() < limites.min or valores.max() > limites.max):
+                raise ValueError(f'Valor fora dos limites da coluna {nome} ({limites.min} a {limites.max})!')
+        for nome, valores in colunas.items():
+            self.arquivos[nome].write(np.ascontiguousarray(valores, dtype=COLUNAS[nome]).tobytes())
+        self.metadados['linhas'] += len(colunas['liga'])
+
+
+def grava_simulacao(escritor: EscritorArquivo, liga: int, equipes: list[Equipe], rodadas: list[list[Jogo]],
+                    modelo: ModeloPartida, temporadas: int, semente: int | None = None) -> int:
+    '''
+    Simula *temporadas* vezes o campeonato de *equipes* e *rodadas* e grava, na *liga*
+    de *escritor*, a tabela de cada temporada ao final de cada rodada. Os jogos com
+    placar registrado mantêm o placar; os demais são sorteados por *modelo*, rodada a
+    rodada, para todas as temporadas de uma vez. Devolve o número da primeira temporada
+    gravada.
+
+    Exemplos:
+    >>> import tempfile
+    >>> from modelos_partida import ajusta_poisson
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> caminho = tempfile.mkdtemp()
+    >>> equipes = converte_equipe(['A', 'B', 'C', 'D'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> with EscritorArquivo(caminho) as escritor:
+    ...     liga = escritor.registra_liga('Teste', ['A', 'B', 'C', 'D'])
+    ...     grava_simulacao(escritor, liga, equipes, rodadas, ajusta_poisson(equipes, rodadas), 100, semente=1)
+    0
+    >>> arquivo = ArquivoColunar(caminho)
+    >>> len(arquivo), arquivo.ultima_rodada(0)
+    (2400, 6)
+    '''
+    nomes = [equipe.nome for equipe in equipes]
+    tabela = cria_tabela(converte_equipe(nomes, 0), temporadas)
+    primeira = escritor.reserva_temporadas(liga, temporadas)
+    gerador = np.random.default_rng(semente)
+    for i, rodada in enumerate(rodadas):
+        registrados = [jogo for jogo in rodada if jogo.gols_mandante is not None]
+        if registrados:
+            mandantes, visitantes = indices_jogos(registrados, nomes)
+            aplica_jogos(tabela, mandantes, visitantes, np.array([jogo.gols_mandante for jogo in registrados]),
+                         np.array([jogo.gols_visitante for jogo in registrados]))
+        restantes = [jogo for jogo in rodada if jogo.gols_mandante is None]
+        if restantes:
+            mandantes, visitantes = indices_jogos(restantes, nomes)
+            aplica_jogos(tabela, mandantes, visitantes, *modelo.sorteia(mandantes, visitantes, temporadas, gerador))
+        escritor.adiciona_tabela(liga, primeira, i + 1, tabela)
+    return primeira
+
+
+class ArquivoColunar:
+    '''
+    Leitura de um arquivo colunar. Cada coluna é mapeada em memória apenas quando é
+    usada, como um arranjo NumPy somente de leitura; as consultas são feitas sobre as
+    colunas, em blocos de BLOCO_LINHAS linhas, sem criar nenhum objeto por linha.
+
+    Exemplos:
+    >>> import tempfile
+    >>> from simulador_campeonato_brasileiro import converte_equipe
+    >>> caminho = tempfile.mkdtemp()
+    >>> equipes = converte_equipe(['A', 'B', 'C'])
+    >>> with EscritorArquivo(caminho) as escritor:
+    ...     liga = escritor.registra_liga('Série A', ['A', 'B', 'C'])
+    ...     for temporada, pontos in enumerate([(9, 4, 1), (7, 6, 2)]):
+    ...         for equipe, p in zip(equipes, pontos):
+    ...             equipe.pontos = p
+    ...         escritor.adiciona_equipes(liga, temporada, 6, equipes)
+    >>> arquivo = ArquivoColunar(caminho)
+    >>> arquivo.media_por_posicao('pontos', arquivo.liga('Série A'))
+    array([8. , 5. , 1.5])
+    >>> int(arquivo.mascara(liga=0, posicao=2, temporada=1).sum())
+    1
+    '''
+    caminho: str
+    metadados: dict
+    colunas: dict[str, np.ndarray]
+
+    def __init__(self, caminho: str) -> None:
+        '''
+        Abre o arquivo colunar do diretório *caminho*.
+        '''
+        self.caminho = caminho
+        self.metadados = le_metadados(caminho)
+        self.colunas = {}
+
+    def __len__(self) -> int:
+        return self.metadados['linhas']
+
+    def liga(self, nome: str) -> int:
+        '''
+        Devolve o identificador da liga *nome*. Levanta ValueError se ela não existir.
+        '''
+        for i, liga in enumerate(self.metadados['ligas']):
+            if liga['nome'] == nome:
+                return i
+        raise ValueError('Liga não encontrada!')
+
+    def equipes(self, liga: int) -> list[str]:
+        '''
+        Devolve os nomes das equipes da *liga*, na ordem dos seus identificadores.
+        '''
+        return self.metadados['ligas'][liga]['equipes']
+
+    def coluna(self, nome: str) -> np.ndarray:
+        '''
+        Devolve a coluna *nome*, mapeada em memória.
+        '''
+        if nome not in self.colunas:
+            if len(self) == 0:
+                self.colunas[nome] = np.empty(0, dtype=COLUNAS[nome])
+            else:
+                self.colunas[nome] = np.memmap(os.path.join(self.caminho, f'{nome}.bin'), dtype=COLUNAS[nome],
+                                               mode='r', shape=(len(self),))
+        return self.colunas[nome]
+
+    def mascara(self, inicio: int = 0, fim: int | None = None, **filtros: int) -> np.ndarray:
+        '''
+        Devolve a máscara das linhas de *inicio* a *fim* em que cada coluna de *filtros*
+        tem o valor informado, como em mascara(liga=0, rodada=38, posicao=4).
+        '''
+        fim = len(self) if fim is None else min(fim, len(self))
+        selecionadas = np.ones(fim - inicio, dtype=bool)
+        for nome, valor in filtros.items():
+            selecionadas &= self.coluna(nome)[inicio:fim] == valor
+        return selecionadas
+
+    def ultima_rodada(self, liga: int) -> int:
+        '''
+        Devolve a maior rodada gravada da *liga*, ou 0 se ela não tiver linhas.
+        '''
+        ultima = 0
+        for inicio in range(0, len(self), BLOCO_LINHAS):
+            fim = min(inicio + BLOCO_LINHAS, len(self))
+            rodadas = self.coluna('rodada')[inicio:fim][self.mascara(inicio, fim, liga=liga)]
+            if len(rodadas):
+                ultima = max(ultima, int(rodadas.max()))
+        return ultima
+
+    def media_por_posicao(self, nome: str, liga: int, rodada: int | None = None) -> np.ndarray:
+        '''
+        Devolve a média da coluna *nome* para cada colocação da *liga* ao final da
+        *rodada*º, por padrão a última, em todas as temporadas gravadas. A posição *p*
+        do resultado corresponde à (p + 1)ª colocação.
+        '''
+        rodada = self.ultima_rodada(liga) if rodada is None else rodada
+        n = len(self.equipes(liga))
+        somas = np.zeros(n + 1)
+        contagens = np.zeros(n + 1)
+        for inicio in range(0, len(self), BLOCO_LINHAS):
+            fim = min(inicio + BLOCO_LINHAS, len(self))
+            selecionadas = self.mascara(inicio, fim, liga=liga, rodada=rodada)
+            colocacoes = self.coluna('posicao')[inicio:fim][selecionadas]
+            somas += np.bincount(colocacoes, self.coluna(nome)[inicio:fim][selecionadas], n + 1)
+            contagens += np.bincount(colocacoes, minlength=n + 1)
+        with np.errstate(invalid='ignore'):
+            return somas[1:] / contagens[1:]
@@ -0,0 +1,69 @@
+# Benchmarks - Simulador Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from typing import Any
+
+import simulador_campeonato_brasileiro as simulador
+
+NOMES = [f'Equipe {i:02}' for i in range(20)]
+
+
+def cria_temporada(classe_equipe: type = simulador.Equipe,
+                   classe_jogo: type = simulador.Jogo) -> tuple[list[Any], list[list[Any]]]:
+    '''
+    Cria o estado completo de uma temporada: as 20 equipes e as 38 rodadas, com objetos
+    de *classe_equipe* e *classe_jogo*, que recebem os mesmos campos de Equipe e Jogo.
+    '''
+    modelos = simulador.converte_equipe(NOMES)
+    equipes = {equipe.nome: classe_equipe(*(getattr(equipe, campo.name) for campo in fields(equipe)))
+               for equipe in modelos}
+    rodadas = [[classe_jogo(equipes[jogo.mandante.nome], None, equipes[jogo.visitante.nome], None) for jogo in rodada]
+               for rodada in simulador.gera_rodadas(modelos)]
+    return list(equipes.values()), rodadas
+
+
+def bytes_por_temporada(temporadas: int, classe_equipe: type = simulador.Equipe,
+                        classe_jogo: type = simulador.Jogo) -> float:
+    '''
+    Devolve a memória média, em bytes, ocupada por uma temporada com objetos de
+    *classe_equipe* e *classe_jogo*, medida com tracemalloc enquanto *temporadas*
+    temporadas são mantidas vivas ao mesmo tempo.
+    '''
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    estados = [cria_temporada(classe_equipe, classe_jogo) for _ in range(temporadas)]
+    total = tracemalloc.get_traced_memory()[0] - inicio
+    tracemalloc.stop()
+    del estados
+    return total / temporadas
+
+
+def sem_slots(classe: type) -> type:
+    '''
+    Devolve uma cópia de *classe* como dataclass comum, com __dict__ por instância,
+    como os modelos do simulador eram antes de usarem slots.
+    '''
+    return make_dataclass(classe.__name__, [(campo.name, campo.type) for campo in fields(classe)])
+
+
+def compara_memoria(temporadas: int = 1000):
+    '''
+    Exibe a memória por temporada com os modelos sem slots e com slots.
+    '''
+    antes = bytes_por_temporada(temporadas, sem_slots(simulador.Equipe), sem_slots(simulador.Jogo))
+    depois = bytes_por_temporada(temporadas)
+
+    print(f'\nMemória por temporada ({temporadas} temporadas simultâneas):')
+    print(f'{'Sem slots':<12} {antes:>10.0f} bytes')
+    print(f'{'Com slots':<12} {depois:>10.0f} bytes')
+    print(f'{'Redução':<12} {1 - depois / antes:>10.1%}')
+
+
+def main():
+    compara_memoria()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,364 @@
+# Calendário com Restrições - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+
+from simulador_campeonato_brasileiro import Equipe, Jogo, converte_equipe, gera_rodadas
+
+# Conflitos permitidos na busca dos mandos de um emparelhamento antes de tentar outro.
+LIMITE_CONFLITOS = 500
+# Emparelhamentos tentados antes de desistir.
+LIMITE_TENTATIVAS = 200
+
+
+@dataclass
+class Restricoes:
+    '''
+    Restrições de um calendário de pontos corridos:
+
+    *estadios_compartilhados*: pares de equipes que dividem um estádio e não podem jogar
+    em casa na mesma rodada;
+    *maximo_fora_seguidos*: maior número de jogos fora de casa em rodadas seguidas, ou
+    None para não limitar. Uma rodada de folga interrompe a sequência;
+    *classicos*: pares de equipes que não podem se enfrentar na 1ª rodada.
+    '''
+    estadios_compartilhados: list[tuple[str, str]] = field(default_factory=list)
+    maximo_fora_seguidos: int | None = 2
+    classicos: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class CalendarioRestrito:
+    '''
+    Resultado de *gera_rodadas_restritas*: as *rodadas*, no formato de *gera_rodadas*,
+    o número de *tentativas* de emparelhamento e, em *ativas*, quantas vezes cada
+    restrição forçou um mando ou causou um conflito durante a busca. As restrições que
+    não aparecem em *ativas* nunca limitaram a busca.
+    '''
+    rodadas: list[list[Jogo]]
+    tentativas: int
+    ativas: dict[str, int]
+
+
+def emparelhamentos(n: int) -> list[list[tuple[int, int]]]:
+    '''
+    Devolve os pares de posições que se enfrentam em cada rodada de um turno entre *n*
+    posições, pelo mesmo método circular de *itera_rodadas*. Com *n* ímpar, a posição
+    emparelhada com a vaga de folga não aparece na rodada.
+
+    Exemplos:
+    >>> emparelhamentos(4)
+    [[(0, 3), (1, 2)], [(0, 2), (3, 1)], [(0, 1), (2, 3)]]
+    '''
+    ordem: list[int | None] = list(range(n))
+    if n % 2 == 1:
+        ordem.append(None)
+    rodadas = []
+    for _ in range(len(ordem) - 1):
+        rodada = []
+        for j in range(len(ordem) // 2):
+            a, b = ordem[j], ordem[len(ordem) - 1 - j]
+            if a is not None and b is not None:
+                rodada.append((a, b))
+        rodadas.append(rodada)
+        ordem.insert(1, ordem.pop())
+    return rodadas
+
+
+def resolve_mandos(variaveis: int, clausulas: list[tuple[tuple[int, ...], str]], limite: int,
+                   gerador: random.Random, ativas: dict[str, int]) -> list[bool] | None:
+    '''
+    Procura valores para *variaveis* variáveis booleanas, numeradas a partir de 1, que
+    satisfaçam todas as *clausulas*. Cada cláusula é uma disjunção de literais (v para a
+    variável v verdadeira, -v para falsa) com o nome da restrição que a criou.
+
+    A busca é um retrocesso com propagação unitária: a cada decisão, toda cláusula com
+    um único literal livre e os demais falsos força esse literal, e uma cláusula com
+    todos os literais falsos desfaz a última decisão ainda não invertida. Cada
+    propagação e cada conflito são contados em *ativas*, pelo nome da restrição.
+    Devolve None se a busca passar de *limite* conflitos ou provar que não há solução.
+
+    Exemplos:
+    >>> clausulas = [((1, 2), 'a'), ((-1, -2), 'b'), ((-2,), 'c')]
+    >>> ativas = {}
+    >>> resolve_mandos(2, clausulas, 10, random.Random(0), ativas), ativas
+    ([True, False], {'c': 1, 'a': 1})
+    >>> resolve_mandos(1, [((1,), 'a'), ((-1,), 'b')], 10, random.Random(0), {}) is None
+    True
+    '''
+    ocorrencias: dict[int, list[int]] = {}
+    for i, (literais, _) in enumerate(clausulas):
+        for literal in literais:
+            ocorrencias.setdefault(literal, []).append(i)
+    valor: list[bool | None] = [None] * (variaveis + 1)
+    trilha: list[int] = []
+    decisoes: list[tuple[int, int, bool]] = []   # (tamanho da trilha, literal decidido, já invertido)
+
+    def atribui(literal: int):
+        valor[abs(literal)] = literal > 0
+        trilha.append(literal)
+
+    def desfaz_ate(tamanho: int):
+        while len(trilha) > tamanho:
+            valor[abs(trilha.pop())] = None
+
+    def propaga(inicio: int) -> int | None:
+        while inicio < len(trilha):
+            falso = -trilha[inicio]
+            inicio += 1
+            for i in ocorrencias.get(falso, ()):
+                livre = None
+                livres = 0
+                for literal in clausulas[i][0]:
+                    atual = valor[abs(literal)]
+                    if atual is None:
+                        livres += 1
+                        livre = literal
+                    elif atual == (literal > 0):
+                        break
+                else:
+                    if livres == 0:
+                        return i
+                    if livres == 1 and livre is not None:
+                        ativas[clausulas[i][1]] = ativas.get(clausulas[i][1], 0) + 1
+                        atribui(livre)
+        return None
+
+    conflito = None
+    for i, (literais, nome) in enumerate(clausulas):
+        if len(literais) == 1 and valor[abs(literais[0])] is None:
+            ativas[nome] = ativas.get(nome, 0) + 1
+            atribui(literais[0])
+        elif len(literais) == 1 and valor[abs(literais[0])] != (literais[0] > 0):
+            conflito = i
+    if conflito is None:
+        conflito = propaga(0)
+
+    conflitos = 0
+    while True:
+        if conflito is not None:
+            conflitos += 1
+            nome = clausulas[conflito][1]
+            ativas[nome] = ativas.get(nome, 0) + 1
+            while decisoes and decisoes[-1][2]:
+                desfaz_ate(decisoes.pop()[0])
+            if not decisoes or conflitos > limite:
+                return None
+            tamanho, literal, _ = decisoes.pop()
+            desfaz_ate(tamanho)
+            decisoes.append((tamanho, -literal, True))
+            atribui(-literal)
+            conflito = propaga(tamanho)
+            continue
+        livre = next((v for v in range(1, variaveis + 1) if valor[v] is None), None)
+        if livre is None:
+            return [bool(valor[v]) for v in range(1, variaveis + 1)]
+        literal = livre if gerador.random() < 0.5 else -livre
+        decisoes.append((len(trilha), literal, False))
+        atribui(literal)
+        conflito = propaga(len(trilha) - 1)
+
+
+def gera_rodadas_restritas(lista: list[Equipe], restricoes: Restricoes, ida_e_volta: bool = True,
+                           semente: int | None = None) -> CalendarioRestrito:
+    '''
+    Gera as rodadas de um campeonato de pontos corridos para *lista* respeitando
+    *restricoes*, no mesmo formato de *gera_rodadas*. Em ida e volta, o 2º turno repete
+    o 1º com os mandos invertidos, como em *gera_rodadas*.
+
+    Cada tentativa parte dos emparelhamentos do método circular, com as equipes em uma
+    ordem sorteada e as rodadas giradas para que a 1ª não tenha clássicos; a primeira
+    tentativa usa a ordem de *lista*. Os mandos são então procurados por
+    *resolve_mandos*, com uma cláusula por rodada para cada estádio compartilhado e uma
+    para cada sequência de jogos fora que passaria do máximo. Levanta ValueError se uma
+    equipe das restrições não estiver em *lista* ou se nenhuma tentativa der certo; nesse
+    caso, a mensagem traz as contagens de *ativas* de todas as tentativas.
+
+    Exemplos:
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo', 'Grêmio', 'Internacional'])
+    >>> restricoes = Restricoes([('Grêmio', 'Internacional')], 2, [('Corinthians', 'Palmeiras')])
+    >>> calendario = gera_rodadas_restritas(equipes, restricoes, semente=1)
+    >>> len(calendario.rodadas), violacoes(calendario.rodadas, restricoes)
+    (10, [])
+    >>> violacoes(gera_rodadas(equipes), restricoes)[:2]
+    ['Grêmio e Internacional jogam em casa na 3ª rodada', 'Grêmio e Internacional jogam em casa na 6ª rodada']
+    >>> gera_rodadas_restritas(equipes, Restricoes(classicos=[('Santos', 'Vasco')]))
+    Traceback (most recent call last):
+    ...
+    ValueError: A equipe "Vasco" não está no campeonato!
+    >>> gera_rodadas_restritas(equipes[:2], Restricoes(maximo_fora_seguidos=0), semente=1)
+    Traceback (most recent call last):
+    ...
+    ValueError: Não foi possível gerar um calendário com essas restrições! Restrições ativas: jogos fora seguidos de Corinthians (200), jogos fora seguidos de Palmeiras (200)
+    '''
+    indices = {equipe.nome: i for i, equipe in enumerate(lista)}
+    for a, b in restricoes.estadios_compartilhados + restricoes.classicos:
+        for nome in (a, b):
+            if nome not in indices:
+                raise ValueError(f'A equipe "{nome}" não está no campeonato!')
+    classicos = {frozenset((indices[a], indices[b])) for a, b in restricoes.classicos}
+    gerador = random.Random(semente)
+    ativas: dict[str, int] = {}
+    ordem = list(range(len(lista)))
+
+    for tentativa in range(1, LIMITE_TENTATIVAS + 1):
+        turno = [[(ordem[a], ordem[b]) for a, b in rodada] for rodada in emparelhamentos(len(lista))]
+        sem_classicos = [r for r, rodada in enumerate(turno) if not any(frozenset(par) in classicos for par in rodada)]
+        if sem_classicos:
+            if sem_classicos[0] != 0:
+                ativas['classicos na 1ª rodada'] = ativas.get('classicos na 1ª rodada', 0) + 1
+            inicio = sem_classicos[0] if tentativa == 1 else gerador.choice(sem_classicos)
+            turno = turno[inicio:] + turno[:inicio]
+            clausulas = clausulas_mandos(lista, turno, restricoes, ida_e_volta)
+            mandos = resolve_mandos(sum(len(rodada) for rodada in turno), clausulas, LIMITE_CONFLITOS, gerador,
+                                    ativas)
+            if mandos is not None:
+                return CalendarioRestrito(monta_rodadas(lista, turno, mandos, ida_e_volta), tentativa,
+                                          dict(sorted(ativas.items(), key=lambda item: -item[1])))
+        gerador.shuffle(ordem)
+    contagens = ', '.join(f'{nome} ({vezes})' for nome, vezes in sorted(ativas.items(), key=lambda item: -item[1]))
+    raise ValueError(f'Não foi possível gerar um calendário com essas restrições! Restrições ativas: {contagens}')
+
+
+def clausulas_mandos(lista: list[Equipe], turno: list[list[tuple[int, int]]], restricoes: Restricoes,
+                     ida_e_volta: bool) -> list[tuple[tuple[int, ...], str]]:
+    '''
+    Devolve as cláusulas de *resolve_mandos* para os jogos de *turno*, numerados em
+    ordem de rodada a partir de 1: a variável de um jogo (a, b) é verdadeira quando *a*
+    é o mandante no 1º turno.
+    '''
+    indices = {equipe.nome: i for i, equipe in enumerate(lista)}
+    rodadas_turno = len(turno)
+    jogo_da_equipe: list[dict[int, int]] = [{} for _ in lista]   # rodada -> literal de "joga em casa"
+    variavel = 0
+    for r, rodada in enumerate(turno):
+        for a, b in rodada:
+            variavel += 1
+            jogo_da_equipe[a][r] = variavel
+            jogo_da_equipe[b][r] = -variavel
+
+    def em_casa(equipe: int, rodada: int) -> int | None:
+        literal = jogo_da_equipe[equipe].get(rodada % rodadas_turno)
+        if literal is None or rodada < rodadas_turno:
+            return literal
+        return -literal
+
+    total = rodadas_turno * 2 if ida_e_volta else rodadas_turno
+    clausulas: list[tuple[tuple[int, ...], str]] = []
+    for nome_a, nome_b in restricoes.estadios_compartilhados:
+        nome = f'estádio de {nome_a} e {nome_b}'
+        for numero in range(total):
+            casa_a, casa_b = em_casa(indices[nome_a], numero), em_casa(indices[nome_b], numero)
+            if casa_a is not None and casa_b is not None and casa_a != -casa_b:
+                clausulas.append(((-casa_a, -casa_b), nome))
+    if restricoes.maximo_fora_seguidos is not None:
+        janela = restricoes.maximo_fora_seguidos + 1
+        for equipe in lista:
+            nome = f'jogos fora seguidos de {equipe.nome}'
+            for inicio in range(total - janela + 1):
+                literais = [em_casa(indices[equipe.nome], numero) for numero in range(inicio, inicio + janela)]
+                presentes = [literal for literal in literais if literal is not None]
+                if len(presentes) == janela:
+                    clausulas.append((tuple(presentes), nome))
+    return clausulas
+
+
+def monta_rodadas(lista: list[Equipe], turno: list[list[tuple[int, int]]], mandos: list[bool],
+                  ida_e_volta: bool) -> list[list[Jogo]]:
+    '''
+    Cria os jogos de *turno*, com os *mandos* de *resolve_mandos*, e, em ida e volta,
+    os do 2º turno, com os mandos invertidos.
+    '''
+    primeiro: list[list[tuple[Equipe, Equipe]]] = []
+    variavel = 0
+    for rodada in turno:
+        confrontos = []
+        for a, b in rodada:
+            confrontos.append((lista[a], lista[b]) if mandos[variavel] else (lista[b], lista[a]))
+            variavel += 1
+        primeiro.append(confrontos)
+    rodadas = [[Jogo(mandante, None, visitante, None) for mandante, visitante in rodada] for rodada in primeiro]
+    if ida_e_volta:
+        rodadas += [[Jogo(visitante, None, mandante, None) for mandante, visitante in rodada] for rodada in primeiro]
+    return rodadas
+
+
+def violacoes(rodadas: list[list[Jogo]], restricoes: Restricoes) -> list[str]:
+    '''
+    Devolve a descrição de cada violação de *restricoes* em *rodadas*, geradas por
+    qualquer método, em ordem de rodada dentro de cada tipo de restrição.
+
+    Exemplos:
+    >>> equipes = converte_equipe(['A', 'B', 'C', 'D'])
+    >>> for descricao in violacoes(gera_rodadas(equipes), Restricoes([('A', 'C')], 1, [('A', 'D')])):
+    ...     print(descricao)
+    A e C jogam em casa na 3ª rodada
+    B joga fora nas rodadas 3 a 4
+    C joga fora nas rodadas 5 a 6
+    D joga fora nas rodadas 1 a 2
+    A e D se enfrentam na 1ª rodada
+    '''
+    descricoes: list[str] = []
+    em_casa: list[set[str]] = [{jogo.mandante.nome for jogo in rodada} for rodada in rodadas]
+    fora: list[set[str]] = [{jogo.visitante.nome for jogo in rodada} for rodada in rodadas]
+    for a, b in restricoes.estadios_compartilhados:
+        for n, mandantes in enumerate(em_casa, 1):
+            if a in mandantes and b in mandantes:
+                descricoes.append(f'{a} e {b} jogam em casa na {n}ª rodada')
+    if restricoes.maximo_fora_seguidos is not None:
+        nomes = sorted({nome for visitantes in fora for nome in visitantes})
+        for nome in nomes:
+            sequencia = 0
+            for n, visitantes in enumerate(fora, 1):
+                sequencia = sequencia + 1 if nome in visitantes else 0
+                if sequencia == restricoes.maximo_fora_seguidos + 1:
+                    descricoes.append(f'{nome} joga fora nas rodadas {n - sequencia + 1} a {n}')
+    for a, b in restricoes.classicos:
+        if rodadas and any({jogo.mandante.nome, jogo.visitante.nome} == {a, b} for jogo in rodadas[0]):
+            descricoes.append(f'{a} e {b} se enfrentam na 1ª rodada')
+    return descricoes
+
+
+def main(argumentos: list[str] | None = None) -> int:
+    '''
+    Compara, para 20 equipes, o tempo e as violações do método circular de
+    *gera_rodadas* com os de *gera_rodadas_restritas*, com restrições de exemplo.
+    '''
+    # Importado aqui para que importar o módulo como biblioteca continue barato.
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Compara a geração de calendários com e sem restrições.')
+    parser.add_argument('--repeticoes', type=int, default=20, help='calendários gerados por método')
+    parser.add_argument('--semente', type=int, default=None, help='semente da busca')
+    opcoes = parser.parse_args(argumentos)
+
+    equipes = converte_equipe([f'Equipe {i + 1:02}' for i in range(20)])
+    restricoes = Restricoes(
+        estadios_compartilhados=[('Equipe 01', 'Equipe 02'), ('Equipe 03', 'Equipe 04')],
+        maximo_fora_seguidos=2,
+        classicos=[('Equipe 01', 'Equipe 20'), ('Equipe 02', 'Equipe 19'), ('Equipe 05', 'Equipe 06')],
+    )
+
+    inicio = time.perf_counter()
+    for _ in range(opcoes.repeticoes):
+        circular = gera_rodadas(equipes)
+    tempo_circular = (time.perf_counter() - inicio) / opcoes.repeticoes
+    print(f'Método circular: {tempo_circular * 1000:.2f} ms, {len(violacoes(circular, restricoes))} violações')
+
+    gerador = random.Random(opcoes.semente)
+    inicio = time.perf_counter()
+    for _ in range(opcoes.repeticoes):
+        calendario = gera_rodadas_restritas(equipes, restricoes, semente=gerador.randrange(1 << 30))
+    tempo_restrito = (time.perf_counter() - inicio) / opcoes.repeticoes
+    print(f'Com restrições: {tempo_restrito * 1000:.2f} ms, {len(violacoes(calendario.rodadas, restricoes))} '
+          f'violações, {calendario.tentativas} tentativa(s)')
+    for nome, vezes in calendario.ativas.items():
+        print(f'  {nome}: {vezes}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
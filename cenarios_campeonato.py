@@ -0,0 +1,166 @@
+# Cenários - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+from dataclasses import replace
+
+from simulador_campeonato_brasileiro import (Equipe, IndiceJogos, Jogo, contabiliza_placar,
+                                             ordena_intercalacao)
+
+
+class Cenario:
+    '''
+    Um cenário hipotético do campeonato ("e se este jogo tivesse terminado 2 X 1?"),
+    derivado de um cenário pai sem copiá-lo.
+
+    O cenário raiz apenas referencia as equipes e as rodadas reais. Cada ramo guarda
+    somente o que mudou em relação ao pai: os placares alterados e cópias das equipes
+    envolvidas nesses jogos, feitas na primeira alteração de cada uma (copy-on-write).
+    Todo o resto é lido do pai. Assim, criar um ramo é O(1), e alterar um placar copia
+    no máximo as duas equipes do jogo, em vez de todas as equipes e rodadas.
+
+    Como os ramos leem o estado do pai, um cenário fica congelado ao criar o seu primeiro
+    ramo, e *registra* passa a levantar ValueError nele. Pelo mesmo motivo, as equipes e
+    as rodadas reais não devem ser alteradas enquanto houver ramos.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> raiz = Cenario.raiz(equipes, rodadas)
+    >>> ramo = raiz.ramo()
+    >>> ramo.registra(1, 'Corinthians', 2, 1)
+    >>> ramo.equipe('Corinthians').pontos, equipes[0].pontos
+    (3, 0)
+    >>> ramo.equipe('Palmeiras') is equipes[1], sorted(ramo.equipes)
+    (True, ['Corinthians', 'São Paulo'])
+    >>> outro = ramo.ramo()
+    >>> outro.registra(1, 'Corinthians', 0, 0)
+    >>> outro.equipe('Corinthians').pontos, ramo.equipe('Corinthians').pontos
+    (1, 3)
+    >>> ramo.registra(1, 'Corinthians', 1, 2)
+    Traceback (most recent call last):
+    ...
+    ValueError: Um cenário com ramos não pode ser alterado!
+    >>> [equipe.nome for equipe in ramo.classificacao()][0]
+    'Corinthians'
+    >>> [(jogo.mandante.nome, jogo.gols_mandante, jogo.gols_visitante) for jogo in outro.jogos_da_rodada(1)]
+    [('Corinthians', 0, 0), ('Palmeiras', None, None)]
+    '''
+    pai: 'Cenario | None'
+    indice: IndiceJogos
+    nomes: list[str]
+    equipes: dict[str, Equipe]
+    placares: dict[tuple[int, int], tuple[int | None, int | None]]
+    congelado: bool
+
+    def __init__(self, pai: 'Cenario | None', indice: IndiceJogos, nomes: list[str],
+                 equipes: dict[str, Equipe]) -> None:
+        '''
+        Inicializa um cenário derivado de *pai*, com o índice de jogos *indice*, compartilhado
+        por todos os cenários, os *nomes* das equipes e as *equipes* próprias do cenário.
+        Use *raiz* e *ramo* em vez de chamar o construtor diretamente.
+        '''
+        self.pai = pai
+        self.indice = indice
+        self.nomes = nomes
+        self.equipes = equipes
+        self.placares = {}
+        self.congelado = False
+
+    @classmethod
+    def raiz(cls, equipes: list[Equipe], rodadas: list[list[Jogo]]) -> 'Cenario':
+        '''
+        Cria o cenário raiz, que representa o estado atual de *equipes* e *rodadas*.
+        '''
+        return cls(None, IndiceJogos(rodadas), [equipe.nome for equipe in equipes],
+                   {equipe.nome: equipe for equipe in equipes})
+
+    def ramo(self) -> 'Cenario':
+        '''
+        Cria, em O(1), um cenário derivado deste, que inicialmente compartilha todo o seu estado.
+        Este cenário fica congelado, para que alterá-lo não altere também os seus ramos.
+        '''
+        self.congelado = True
+        return Cenario(self, self.indice, self.nomes, {})
+
+    def equipe(self, nome: str) -> Equipe:
+        '''
+        Devolve a equipe *nome* como ela está neste cenário. A Equipe devolvida pode
+        pertencer a um cenário ancestral e não deve ser alterada.
+        '''
+        cenario: Cenario | None = self
+        while cenario is not None:
+            if nome in cenario.equipes:
+                return cenario.equipes[nome]
+            cenario = cenario.pai
+        raise ValueError('Equipe não encontrada!')
+
+    def placar(self, i: int, j: int) -> tuple[int | None, int | None]:
+        '''
+        Devolve o placar, neste cenário, do *j*-ésimo jogo da *i*-ésima rodada, contados a partir de 0.
+        '''
+        cenario: Cenario | None = self
+        while cenario is not None:
+            if (i, j) in cenario.placares:
+                return cenario.placares[(i, j)]
+            cenario = cenario.pai
+        jogo = self.indice.rodadas[i][j]
+        return (jogo.gols_mandante, jogo.gols_visitante)
+
+    def registra(self, rodada: int, mandante: str, gols_mandante: int | None, gols_visitante: int | None):
+        '''
+        Troca, apenas neste cenário, o placar do jogo de *mandante* na *rodada*º por
+        *gols_mandante* X *gols_visitante*. Com (None, None), o resultado é apagado.
+        Levanta ValueError se *mandante* não jogar como mandante nessa rodada, se este
+        for o cenário raiz, cujas equipes são as reais, ou se ele já tiver ramos.
+        '''
+        if self.pai is None:
+            raise ValueError('O cenário raiz não pode ser alterado!')
+        if self.congelado:
+            raise ValueError('Um cenário com ramos não pode ser alterado!')
+        if mandante not in self.indice.referencias:
+            raise ValueError('Equipe não encontrada!')
+        referencia = self.indice.referencia_na_rodada(mandante, rodada)
+        if referencia is None or self.indice.rodadas[referencia[0]][referencia[1]].mandante.nome != mandante:
+            raise ValueError(f'{mandante} não é mandante na {rodada}ª rodada!')
+        i, j = referencia
+        jogo = self.indice.rodadas[i][j]
+
+        anterior = self.placar(i, j)
+        casa = self.__propria(jogo.mandante.nome)
+        fora = self.__propria(jogo.visitante.nome)
+        if anterior[0] is not None and anterior[1] is not None:
+            contabiliza_placar(casa, fora, anterior[0], anterior[1], rodada, -1)
+        if gols_mandante is not None and gols_visitante is not None:
+            contabiliza_placar(casa, fora, gols_mandante, gols_visitante, rodada)
+        self.placares[(i, j)] = (gols_mandante, gols_visitante)
+
+    def jogos_da_rodada(self, rodada: int) -> list[Jogo]:
+        '''
+        Devolve os jogos da *rodada*º como estão neste cenário. Os jogos são criados
+        na hora e servem apenas para consulta, como em *exibe_rodada*.
+        '''
+        i = rodada - 1
+        jogos = []
+        for j, jogo in enumerate(self.indice.rodadas[i]):
+            gols_mandante, gols_visitante = self.placar(i, j)
+            jogos.append(Jogo(self.equipe(jogo.mandante.nome), gols_mandante,
+                              self.equipe(jogo.visitante.nome), gols_visitante))
+        return jogos
+
+    def classificacao(self) -> list[Equipe]:
+        '''
+        Devolve as equipes deste cenário na ordem de classificação.
+        '''
+        equipes = [self.equipe(nome) for nome in self.nomes]
+        ordena_intercalacao(equipes)
+        return equipes
+
+    def __propria(self, nome: str) -> Equipe:
+        '''
+        Devolve a cópia própria deste cenário da equipe *nome*, copiando-a na primeira vez.
+        '''
+        if nome not in self.equipes:
+            original = self.equipe(nome)
+            self.equipes[nome] = replace(original, desempenho=bytearray(original.desempenho))
+        return self.equipes[nome]
@@ -0,0 +1,213 @@
+# Critérios de Desempate - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+from collections.abc import Callable
+from itertools import groupby
+
+from simulador_campeonato_brasileiro import Equipe, Jogo
+
+# Critérios que dependem apenas das estatísticas da equipe. Cada um devolve uma chave em
+# que valores menores correspondem a colocações melhores.
+CRITERIOS_EQUIPE: dict[str, Callable[[Equipe], int | str]] = {
+    'pontos': lambda equipe: -equipe.pontos,
+    'vitorias': lambda equipe: -equipe.vitorias,
+    'saldo_gols': lambda equipe: -equipe.saldo_gols,
+    'gols_marcados': lambda equipe: -equipe.gols_marcados,
+    'menos_derrotas': lambda equipe: equipe.derrotas,
+    'nome': lambda equipe: equipe.nome,
+}
+
+# Critérios de confronto direto, calculados em uma minitabela formada apenas pelos jogos
+# entre as equipes empatadas. O valor é a posição da estatística na minitabela.
+PONTOS_CONFRONTO = 0
+SALDO_CONFRONTO = 1
+GOLS_CONFRONTO = 2
+GOLS_FORA_CONFRONTO = 3
+CRITERIOS_CONFRONTO = {
+    'confronto_direto': PONTOS_CONFRONTO,
+    'saldo_confronto': SALDO_CONFRONTO,
+    'gols_confronto': GOLS_CONFRONTO,
+    'gols_fora_confronto': GOLS_FORA_CONFRONTO,
+}
+
+# Critérios do regulamento do Campeonato Brasileiro, até onde o simulador registra dados:
+# cartões e sorteio são substituídos pela ordem alfabética, como em *intercala*.
+CRITERIOS_BRASILEIRAO = ('pontos', 'vitorias', 'saldo_gols', 'gols_marcados', 'confronto_direto', 'nome')
+
+# Minitabelas guardadas por ConfrontosDiretos. Passado o limite, as mais antigas são descartadas.
+LIMITE_MINITABELAS = 1024
+
+
+class ConfrontosDiretos:
+    '''
+    Estatísticas dos confrontos diretos entre cada par de equipes, mantidas a cada troca
+    de placar recebida por *atualiza_jogo*, ouvinte de LogResultados, que atualiza
+    apenas os dois pares do jogo, em O(1).
+
+    As minitabelas de grupos de equipes empatadas são calculadas a partir dos pares, sem
+    percorrer as rodadas, e guardadas até que um jogo entre duas equipes do grupo mude.
+    Os grupos guardados são indexados por equipe, de forma que um resultado só consulta
+    os grupos das suas duas equipes, e no máximo LIMITE_MINITABELAS ficam guardados.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> rodadas = gera_rodadas(converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo']))
+    >>> confrontos = ConfrontosDiretos()
+    >>> confrontos.atualiza_jogo(rodadas[0][0], 1, (None, None), (2, 1))   # Corinthians 2 X 1 São Paulo
+    >>> confrontos.atualiza_jogo(rodadas[3][0], 4, (None, None), (0, 0))   # São Paulo 0 X 0 Corinthians
+    >>> confrontos.minitabela(['Corinthians', 'São Paulo'])
+    {'Corinthians': (4, 1, 2, 0), 'São Paulo': (1, -1, 1, 1)}
+    >>> confrontos.atualiza_jogo(rodadas[3][0], 4, (0, 0), (None, None))
+    >>> confrontos.minitabela(['Corinthians', 'São Paulo'])
+    {'Corinthians': (3, 1, 2, 0), 'São Paulo': (0, -1, 1, 1)}
+    '''
+    pares: dict[tuple[str, str], list[int]]
+    minitabelas: dict[frozenset[str], dict[str, tuple[int, int, int, int]]]
+    grupos: dict[str, set[frozenset[str]]]
+
+    def __init__(self, rodadas: list[list[Jogo]] | None = None) -> None:
+        '''
+        Inicializa os confrontos, opcionalmente já com os placares registrados em *rodadas*.
+        '''
+        self.pares = {}
+        self.minitabelas = {}
+        self.grupos = {}
+        for rodada in rodadas or []:
+            for jogo in rodada:
+                if jogo.gols_mandante is not None and jogo.gols_visitante is not None:
+                    self.__contabiliza(jogo.mandante.nome, jogo.visitante.nome,
+                                       jogo.gols_mandante, jogo.gols_visitante, 1)
+
+    def atualiza_jogo(self, jogo: Jogo, rodada: int, anterior: tuple[int | None, int | None],
+                      novo: tuple[int | None, int | None]):
+        '''
+        Desconta dos confrontos o placar *anterior* de *jogo* e soma o placar *novo*.
+        Placares (None, None) não contam.
+        '''
+        mandante, visitante = jogo.mandante.nome, jogo.visitante.nome
+        if anterior[0] is not None and anterior[1] is not None:
+            self.__contabiliza(mandante, visitante, anterior[0], anterior[1], -1)
+        if novo[0] is not None and novo[1] is not None:
+            self.__contabiliza(mandante, visitante, novo[0], novo[1], 1)
+        for grupo in self.grupos.get(mandante, set()) & self.grupos.get(visitante, set()):
+            self.__descarta(grupo)
+
+    def minitabela(self, nomes: list[str]) -> dict[str, tuple[int, int, int, int]]:
+        '''
+        Devolve, para cada equipe de *nomes*, os pontos, o saldo de gols, os gols marcados
+        e os gols marcados fora de casa apenas nos jogos entre as equipes de *nomes*.
+        '''
+        grupo = frozenset(nomes)
+        if grupo not in self.minitabelas:
+            tabela: dict[str, tuple[int, int, int, int]] = {}
+            for nome in nomes:
+                totais = [0, 0, 0, 0]
+                for adversario in nomes:
+                    par = self.pares.get((nome, adversario))
+                    if par is not None:
+                        for i in range(4):
+                            totais[i] += par[i]
+                tabela[nome] = (totais[0], totais[1], totais[2], totais[3])
+            if len(self.minitabelas) >= LIMITE_MINITABELAS:
+                self.__descarta(next(iter(self.minitabelas)))
+            self.minitabelas[grupo] = tabela
+            for nome in grupo:
+                self.grupos.setdefault(nome, set()).add(grupo)
+        return self.minitabelas[grupo]
+
+    def __descarta(self, grupo: frozenset[str]):
+        '''
+        Descarta a minitabela guardada de *grupo* e a remove do índice das suas equipes.
+        '''
+        del self.minitabelas[grupo]
+        for nome in grupo:
+            self.grupos[nome].discard(grupo)
+
+    def __contabiliza(self, mandante: str, visitante: str, gols_mandante: int, gols_visitante: int, sinal: int):
+        '''
+        Soma, multiplicado por *sinal*, o placar *gols_mandante* X *gols_visitante* aos
+        pares (mandante, visitante) e (visitante, mandante).
+        '''
+        if gols_mandante > gols_visitante:
+            pontos_mandante, pontos_visitante = 3, 0
+        elif gols_mandante < gols_visitante:
+            pontos_mandante, pontos_visitante = 0, 3
+        else:
+            pontos_mandante, pontos_visitante = 1, 1
+        par = self.pares.setdefault((mandante, visitante), [0, 0, 0, 0])
+        par[PONTOS_CONFRONTO] += sinal * pontos_mandante
+        par[SALDO_CONFRONTO] += sinal * (gols_mandante - gols_visitante)
+        par[GOLS_CONFRONTO] += sinal * gols_mandante
+        par = self.pares.setdefault((visitante, mandante), [0, 0, 0, 0])
+        par[PONTOS_CONFRONTO] += sinal * pontos_visitante
+        par[SALDO_CONFRONTO] += sinal * (gols_visitante - gols_mandante)
+        par[GOLS_CONFRONTO] += sinal * gols_visitante
+        par[GOLS_FORA_CONFRONTO] += sinal * gols_visitante
+
+
+class MotorDesempate:
+    '''
+    Ordena equipes por uma sequência configurável de *criterios*, nomes de
+    CRITERIOS_EQUIPE ou de CRITERIOS_CONFRONTO. Cada critério só é aplicado aos grupos
+    de equipes que continuam empatadas em todos os anteriores, e os critérios de
+    confronto direto usam a minitabela exatamente desse grupo. Equipes empatadas em
+    todos os critérios mantêm a ordem em que foram informadas.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas, recalcula_estatisticas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> rodadas[0][0].gols_mandante, rodadas[0][0].gols_visitante = 0, 1   # Corinthians 0 X 1 São Paulo
+    >>> rodadas[1][0].gols_mandante, rodadas[1][0].gols_visitante = 1, 3   # Santos 1 X 3 Corinthians
+    >>> rodadas[1][1].gols_mandante, rodadas[1][1].gols_visitante = 0, 0   # Palmeiras 0 X 0 São Paulo
+    >>> rodadas[2][0].gols_mandante, rodadas[2][0].gols_visitante = 1, 1   # Corinthians 1 X 1 Palmeiras
+    >>> recalcula_estatisticas(equipes, rodadas)
+    >>> confrontos = ConfrontosDiretos(rodadas)
+    >>> [equipe.nome for equipe in MotorDesempate(CRITERIOS_BRASILEIRAO, confrontos).ordena(equipes)]
+    ['Corinthians', 'São Paulo', 'Palmeiras', 'Santos']
+    >>> [equipe.nome for equipe in MotorDesempate(('pontos', 'confronto_direto', 'nome'), confrontos).ordena(equipes)]
+    ['São Paulo', 'Corinthians', 'Palmeiras', 'Santos']
+    >>> MotorDesempate(('pontos', 'cartoes'), confrontos)
+    Traceback (most recent call last):
+    ...
+    ValueError: Critério desconhecido: cartoes
+    '''
+    criterios: tuple[str, ...]
+    confrontos: ConfrontosDiretos
+
+    def __init__(self, criterios: tuple[str, ...], confrontos: ConfrontosDiretos) -> None:
+        '''
+        Inicializa o motor com *criterios*, em ordem de prioridade, e com os *confrontos*
+        diretos do campeonato. Levanta ValueError se algum critério não existir.
+        '''
+        for criterio in criterios:
+            if criterio not in CRITERIOS_EQUIPE and criterio not in CRITERIOS_CONFRONTO:
+                raise ValueError(f'Critério desconhecido: {criterio}')
+        self.criterios = tuple(criterios)
+        self.confrontos = confrontos
+
+    def ordena(self, equipes: list[Equipe]) -> list[Equipe]:
+        '''
+        Devolve *equipes* ordenadas pelos critérios do motor, sem alterar a lista.
+        '''
+        return self.__refina(list(equipes), 0)
+
+    def __refina(self, grupo: list[Equipe], nivel: int) -> list[Equipe]:
+        '''
+        Ordena *grupo*, cujas equipes estão empatadas nos *nivel* primeiros critérios,
+        aplicando o critério *nivel* e, em cada novo empate, os seguintes.
+        '''
+        if len(grupo) <= 1 or nivel == len(self.criterios):
+            return grupo
+        criterio = self.criterios[nivel]
+        if criterio in CRITERIOS_EQUIPE:
+            chave = CRITERIOS_EQUIPE[criterio]
+        else:
+            minitabela = self.confrontos.minitabela([equipe.nome for equipe in grupo])
+            indice = CRITERIOS_CONFRONTO[criterio]
+            chave = lambda equipe: -minitabela[equipe.nome][indice]
+        grupo.sort(key=chave)
+        ordem: list[Equipe] = []
+        for _, empatadas in groupby(grupo, key=chave):
+            ordem.extend(self.__refina(list(empatadas), nivel + 1))
+        return ordem
@@ -0,0 +1,213 @@
+# Elo - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+#
+# Requer NumPy.
+
+from itertools import accumulate
+
+import numpy as np
+
+from simulador_campeonato_brasileiro import Equipe, Jogo
+
+ELO_INICIAL = 1500.0
+FATOR_K = 20.0
+VANTAGEM_ELO = 60.0
+
+# Nas colunas de *colunas_rodadas*, jogos sem placar e vagas de rodadas mais curtas
+# têm gols SEM_PLACAR.
+SEM_PLACAR = -1
+
+
+def variacao_elo(elo_mandante: float, elo_visitante: float, gols_mandante: int, gols_visitante: int) -> float:
+    '''
+    Devolve a variação do Elo do mandante em um jogo com o placar *gols_mandante* X
+    *gols_visitante*. O visitante varia o mesmo valor, com o sinal trocado. O mandante
+    joga com VANTAGEM_ELO pontos a mais.
+
+    Exemplos:
+    >>> variacao_elo(1500.0, 1500.0, 1, 1) < 0 < variacao_elo(1500.0, 1500.0, 1, 0)
+    True
+    >>> round(variacao_elo(1500.0, 1560.0, 2, 0), 2)
+    10.0
+    '''
+    esperado = 1 / (1 + 10 ** ((elo_visitante - elo_mandante - VANTAGEM_ELO) / 400))
+    pontuacao = 1.0 if gols_mandante > gols_visitante else 0.5 if gols_mandante == gols_visitante else 0.0
+    return FATOR_K * (pontuacao - esperado)
+
+
+class RatingsElo:
+    '''
+    Elo de cada equipe do campeonato, atualizado em O(1) a cada troca de placar recebida
+    por *atualiza_jogo*, ouvinte de LogResultados.
+
+    Cada jogo guarda a variação que aplicou. Apagar ou alterar um resultado desconta
+    exatamente essa variação, de forma que desfazer os eventos em ordem devolve o Elo
+    anterior sem nenhum recálculo. A variação de um placar novo é calculada com o Elo
+    atual das equipes; para obter o Elo exato da sequência das rodadas depois de
+    alterações fora de ordem, basta chamar *recalcula*.
+
+    As variações são acumuladas por rodada, o que dá a série do Elo de cada equipe ao
+    final de cada rodada.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> ratings = RatingsElo(equipes, len(rodadas))
+    >>> ratings.atualiza_jogo(rodadas[0][0], 1, (None, None), (2, 0))   # Corinthians 2 X 0 São Paulo
+    >>> ratings.atualiza_jogo(rodadas[1][0], 2, (None, None), (1, 1))   # Santos 1 X 1 Corinthians
+    >>> round(ratings.elo['Corinthians'], 2), round(ratings.elo['São Paulo'], 2)
+    (1509.77, 1491.71)
+    >>> [round(elo, 2) for elo in ratings.serie('Corinthians')]
+    [1500.0, 1508.29, 1509.77, 1509.77, 1509.77, 1509.77, 1509.77]
+    >>> ratings.atualiza_jogo(rodadas[1][0], 2, (1, 1), (None, None))
+    >>> ratings.atualiza_jogo(rodadas[0][0], 1, (2, 0), (None, None))
+    >>> ratings.elo['Corinthians'], ratings.elo['São Paulo']
+    (1500.0, 1500.0)
+    '''
+    elo: dict[str, float]
+    variacoes: dict[str, list[float]]
+    aplicadas: dict[int, tuple[int, float]]
+
+    def __init__(self, equipes: list[Equipe], rodadas: int) -> None:
+        '''
+        Inicializa o Elo de *equipes* em ELO_INICIAL, para um campeonato de *rodadas* rodadas.
+        '''
+        self.elo = {equipe.nome: ELO_INICIAL for equipe in equipes}
+        self.variacoes = {equipe.nome: [0.0] * (rodadas + 1) for equipe in equipes}
+        self.aplicadas = {}
+
+    def atualiza_jogo(self, jogo: Jogo, rodada: int, anterior: tuple[int | None, int | None],
+                      novo: tuple[int | None, int | None]):
+        '''
+        Desconta do Elo a variação do placar *anterior* de *jogo*, da *rodada*º, e soma a
+        do placar *novo*. Placares (None, None) não contam.
+        '''
+        mandante, visitante = jogo.mandante.nome, jogo.visitante.nome
+        aplicada = self.aplicadas.pop(id(jogo), None)
+        if aplicada is not None:
+            self.__soma(mandante, visitante, *aplicada, -1)
+        if novo[0] is not None and novo[1] is not None:
+            variacao = variacao_elo(self.elo[mandante], self.elo[visitante], novo[0], novo[1])
+            self.aplicadas[id(jogo)] = (rodada, variacao)
+            self.__soma(mandante, visitante, rodada, variacao)
+
+    def serie(self, nome: str) -> list[float]:
+        '''
+        Devolve o Elo da equipe *nome* no início do campeonato e ao final de cada rodada.
+        '''
+        return list(accumulate(self.variacoes[nome], initial=ELO_INICIAL))[1:]
+
+    def elo_na_rodada(self, nome: str, rodada: int) -> float:
+        '''
+        Devolve o Elo da equipe *nome* ao final da *rodada*º, ou no início do campeonato
+        se *rodada* for 0.
+        '''
+        return ELO_INICIAL + sum(self.variacoes[nome][:rodada + 1])
+
+    def recalcula(self, equipes: list[Equipe], rodadas: list[list[Jogo]]):
+        '''
+        Recalcula do zero o Elo de *equipes* a partir dos placares de *rodadas*, rodada a
+        rodada, em uma única passagem vetorizada de *elo_historico*.
+        '''
+        historico = elo_historico(*colunas_rodadas(equipes, rodadas), len(equipes))[0]
+        variacoes = np.diff(historico, axis=0, prepend=historico[:1])
+        self.elo = {equipe.nome: float(historico[-1, i]) for i, equipe in enumerate(equipes)}
+        self.variacoes = {equipe.nome: variacoes[:, i].tolist() for i, equipe in enumerate(equipes)}
+        posicao = {id(equipe): i for i, equipe in enumerate(equipes)}
+        self.aplicadas = {}
+        for i, rodada in enumerate(rodadas):
+            for jogo in rodada:
+                if jogo.gols_mandante is not None and jogo.gols_visitante is not None:
+                    m, v = posicao[id(jogo.mandante)], posicao[id(jogo.visitante)]
+                    variacao = variacao_elo(float(historico[i, m]), float(historico[i, v]),
+                                            jogo.gols_mandante, jogo.gols_visitante)
+                    self.aplicadas[id(jogo)] = (i + 1, variacao)
+
+    def __soma(self, mandante: str, visitante: str, rodada: int, variacao: float, sinal: int = 1):
+        '''
+        Soma *sinal* * *variacao* ao Elo do mandante na *rodada*º e o subtrai do visitante.
+        '''
+        self.elo[mandante] += sinal * variacao
+        self.elo[visitante] -= sinal * variacao
+        self.variacoes[mandante][rodada] += sinal * variacao
+        self.variacoes[visitante][rodada] -= sinal * variacao
+
+
+def colunas_rodadas(equipes: list[Equipe], rodadas: list[list[Jogo]]) -> tuple[np.ndarray, np.ndarray,
+                                                                                np.ndarray, np.ndarray]:
+    '''
+    Converte *rodadas* em quatro colunas de formato (1, rodadas, jogos por rodada): os
+    índices, em *equipes*, dos mandantes e dos visitantes e os gols de cada lado. Jogos
+    sem placar, e as vagas das rodadas com menos jogos, têm gols SEM_PLACAR.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['A', 'B', 'C'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> rodadas[0][0].gols_mandante, rodadas[0][0].gols_visitante = 2, 1
+    >>> mandantes, visitantes, gols_m, gols_v = colunas_rodadas(equipes, rodadas)
+    >>> mandantes.shape, gols_m[0, :, 0]
+    ((1, 6, 1), array([ 2, -1, -1, -1, -1, -1]))
+    '''
+    posicao = {id(equipe): i for i, equipe in enumerate(equipes)}
+    forma = (1, len(rodadas), max((len(rodada) for rodada in rodadas), default=0))
+    mandantes = np.zeros(forma, dtype=np.intp)
+    visitantes = np.zeros(forma, dtype=np.intp)
+    gols_mandante = np.full(forma, SEM_PLACAR, dtype=np.int64)
+    gols_visitante = np.full(forma, SEM_PLACAR, dtype=np.int64)
+    for i, rodada in enumerate(rodadas):
+        for j, jogo in enumerate(rodada):
+            mandantes[0, i, j] = posicao[id(jogo.mandante)]
+            visitantes[0, i, j] = posicao[id(jogo.visitante)]
+            if jogo.gols_mandante is not None and jogo.gols_visitante is not None:
+                gols_mandante[0, i, j] = jogo.gols_mandante
+                gols_visitante[0, i, j] = jogo.gols_visitante
+    return mandantes, visitantes, gols_mandante, gols_visitante
+
+
+def elo_historico(mandantes: np.ndarray, visitantes: np.ndarray, gols_mandante: np.ndarray,
+                  gols_visitante: np.ndarray, n: int) -> np.ndarray:
+    '''
+    Calcula o Elo de *n* equipes ao longo de um arquivo de temporadas, todas de uma vez.
+    As quatro colunas têm formato (temporadas, rodadas, jogos por rodada), como as de
+    *colunas_rodadas*; *mandantes* e *visitantes* também podem ter formato
+    (rodadas, jogos por rodada), quando todas as temporadas têm a mesma tabela. Jogos
+    com gols negativos são ignorados.
+
+    Devolve o Elo de formato (temporadas, rodadas + 1, n): a posição [s, r, i] é o Elo
+    da equipe *i* na temporada *s* ao final da *r*-ésima rodada. Como cada equipe joga
+    no máximo uma vez por rodada, cada rodada de todas as temporadas é uma única
+    operação vetorizada.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> rodadas[0][0].gols_mandante, rodadas[0][0].gols_visitante = 2, 0
+    >>> historico = elo_historico(*colunas_rodadas(equipes, rodadas), 4)
+    >>> historico.shape
+    (1, 7, 4)
+    >>> np.round(historico[0, 1], 2)
+    array([1508.29, 1500.  , 1500.  , 1491.71])
+    '''
+    gols_mandante = np.asarray(gols_mandante)
+    temporadas, rodadas, jogos = gols_mandante.shape
+    mandantes = np.broadcast_to(mandantes, gols_mandante.shape)
+    visitantes = np.broadcast_to(visitantes, gols_mandante.shape)
+    deslocamentos = (np.arange(temporadas, dtype=np.intp) * n)[:, None]
+
+    historico = np.empty((temporadas, rodadas + 1, n))
+    historico[:, 0] = ELO_INICIAL
+    elo = historico[:, 0].ravel()
+    for r in range(rodadas):
+        m = (deslocamentos + mandantes[:, r]).ravel()
+        v = (deslocamentos + visitantes[:, r]).ravel()
+        gols_m = gols_mandante[:, r].ravel()
+        gols_v = gols_visitante[:, r].ravel()
+        esperado = 1 / (1 + 10 ** ((elo[v] - elo[m] - VANTAGEM_ELO) / 400))
+        pontuacao = (gols_m > gols_v) + 0.5 * (gols_m == gols_v)
+        variacao = np.where(gols_m >= 0, FATOR_K * (pontuacao - esperado), 0.0)
+        elo = (elo + np.bincount(m, variacao, temporadas * n) - np.bincount(v, variacao, temporadas * n))
+        historico[:, r + 1] = elo.reshape(temporadas, n)
+    return historico
@@ -0,0 +1,189 @@
+# Força do Calendário - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+#
+# Requer NumPy.
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from elo_equipes import VANTAGEM_ELO
+from simulador_campeonato_brasileiro import Equipe, Jogo
+
+# Na matriz do calendário, rodadas em que a equipe folga têm adversário SEM_ADVERSARIO.
+SEM_ADVERSARIO = -1
+
+
+@dataclass
+class MatrizCalendario:
+    '''
+    Calendário de um campeonato em matrizes de formato (equipes, rodadas): a linha *i*
+    corresponde a *nomes[i]* e a coluna *r* à (r + 1)ª rodada.
+    '''
+    nomes: list[str]
+    adversarios: np.ndarray
+    mandante: np.ndarray
+    disputado: np.ndarray
+
+
+def matriz_calendario(equipes: list[Equipe], rodadas: list[list[Jogo]]) -> MatrizCalendario:
+    '''
+    Converte *rodadas*, como as de *gera_rodadas*, na matriz do calendário de *equipes*:
+    o índice do adversário de cada equipe em cada rodada, se ela joga em casa e se o
+    jogo já tem placar.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['A', 'B', 'C'])
+    >>> matriz = matriz_calendario(equipes, gera_rodadas(equipes))
+    >>> matriz.adversarios[0].tolist(), matriz.mandante[0].tolist()
+    ([-1, 2, 1, -1, 2, 1], [False, False, True, False, True, False])
+    '''
+    indices = {equipe.nome: i for i, equipe in enumerate(equipes)}
+    forma = (len(equipes), len(rodadas))
+    matriz = MatrizCalendario([equipe.nome for equipe in equipes], np.full(forma, SEM_ADVERSARIO, dtype=np.intp),
+                              np.zeros(forma, dtype=bool), np.zeros(forma, dtype=bool))
+    for r, rodada in enumerate(rodadas):
+        for jogo in rodada:
+            mandante, visitante = indices[jogo.mandante.nome], indices[jogo.visitante.nome]
+            disputado = jogo.gols_mandante is not None and jogo.gols_visitante is not None
+            matriz.adversarios[mandante, r], matriz.adversarios[visitante, r] = visitante, mandante
+            matriz.mandante[mandante, r] = True
+            matriz.disputado[mandante, r] = matriz.disputado[visitante, r] = disputado
+    return matriz
+
+
+class ForcaCalendario:
+    '''
+    Índices de dificuldade do calendário de todas as equipes, a partir de um rating por
+    equipe, como o Elo de RatingsElo: a força média dos adversários restantes, o número
+    de jogos e de mandos restantes e a força média dos adversários já enfrentados.
+
+    A força de um adversário é o seu rating somado à *vantagem* de jogar em casa, quando
+    a equipe é visitante, ou subtraído dela, quando a equipe é mandante. Os índices são
+    calculados sobre a MatrizCalendario de uma só vez, para todas as equipes pendentes,
+    e guardados: uma troca de placar, recebida como ouvinte de LogResultados, torna
+    pendentes apenas as duas equipes do jogo, e uma troca de ratings apenas as equipes
+    que enfrentam alguma equipe cujo rating mudou.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> ratings = {'Corinthians': 1500.0, 'Palmeiras': 1600.0, 'Santos': 1400.0, 'São Paulo': 1500.0}
+    >>> forca = ForcaCalendario(equipes, rodadas, ratings)
+    >>> forca.indices('Santos')
+    (1533.33, 6, 3, nan)
+    >>> forca.atualiza_jogo(rodadas[0][1], 1, (None, None), (1, 0))   # Palmeiras 1 X 0 Santos
+    >>> forca.indices('Santos'), forca.indices('Palmeiras')
+    ((1508.0, 5, 3, 1660.0), (1492.0, 5, 2, 1340.0))
+    >>> forca.atualiza_ratings({'Palmeiras': 1650.0})
+    >>> forca.pendentes.tolist()
+    [True, False, True, True]
+    >>> forca.mais_dificeis()
+    ['Santos', 'Corinthians', 'São Paulo', 'Palmeiras']
+    '''
+    matriz: MatrizCalendario
+    indices_equipes: dict[str, int]
+    ratings: np.ndarray
+    vantagem: float
+    pendentes: np.ndarray
+    dificuldade_restante: np.ndarray
+    jogos_restantes: np.ndarray
+    mandos_restantes: np.ndarray
+    forca_enfrentada: np.ndarray
+
+    def __init__(self, equipes: list[Equipe], rodadas: list[list[Jogo]], ratings: dict[str, float],
+                 vantagem: float = VANTAGEM_ELO) -> None:
+        '''
+        Monta a matriz do calendário de *equipes* e *rodadas*, com o rating de cada
+        equipe em *ratings*. Os índices são calculados na primeira consulta.
+        '''
+        self.matriz = matriz_calendario(equipes, rodadas)
+        self.indices_equipes = {nome: i for i, nome in enumerate(self.matriz.nomes)}
+        self.ratings = np.array([ratings[nome] for nome in self.matriz.nomes], dtype=np.float64)
+        self.vantagem = vantagem
+        n = len(equipes)
+        self.pendentes = np.ones(n, dtype=bool)
+        self.dificuldade_restante = np.full(n, np.nan)
+        self.jogos_restantes = np.zeros(n, dtype=np.int64)
+        self.mandos_restantes = np.zeros(n, dtype=np.int64)
+        self.forca_enfrentada = np.full(n, np.nan)
+
+    def atualiza_jogo(self, jogo: Jogo, rodada: int, anterior: tuple[int | None, int | None],
+                      novo: tuple[int | None, int | None]):
+        '''
+        Marca se *jogo*, da *rodada*º, tem placar e torna pendentes as suas duas equipes.
+        '''
+        disputado = novo[0] is not None and novo[1] is not None
+        for nome in (jogo.mandante.nome, jogo.visitante.nome):
+            i = self.indices_equipes[nome]
+            self.matriz.disputado[i, rodada - 1] = disputado
+            self.pendentes[i] = True
+
+    def atualiza_ratings(self, ratings: dict[str, float]):
+        '''
+        Troca os ratings das equipes de *ratings* e torna pendentes as equipes que
+        enfrentam, em qualquer rodada, alguma equipe cujo rating mudou.
+        '''
+        novos = self.ratings.copy()
+        for nome, rating in ratings.items():
+            novos[self.indices_equipes[nome]] = rating
+        mudaram = np.append(novos != self.ratings, False)   # A última posição é a de SEM_ADVERSARIO.
+        self.pendentes |= mudaram[self.matriz.adversarios].any(axis=1)
+        self.ratings = novos
+
+    def indices(self, nome: str) -> tuple[float, int, int, float]:
+        '''
+        Devolve, para a equipe *nome*, a força média dos adversários restantes, o número
+        de jogos restantes, quantos deles são em casa e a força média dos adversários já
+        enfrentados. Forças médias sem nenhum jogo são nan. As forças são arredondadas
+        para duas casas.
+        '''
+        self.calcula()
+        i = self.indices_equipes[nome]
+        return (round(float(self.dificuldade_restante[i]), 2), int(self.jogos_restantes[i]),
+                int(self.mandos_restantes[i]), round(float(self.forca_enfrentada[i]), 2))
+
+    def mais_dificeis(self) -> list[str]:
+        '''
+        Devolve os nomes das equipes, do calendário restante mais difícil para o mais
+        fácil. Equipes sem jogos restantes ficam no final.
+        '''
+        self.calcula()
+        return [self.matriz.nomes[i] for i in np.argsort(-self.dificuldade_restante, kind='stable')]
+
+    def calcula(self):
+        '''
+        Calcula os índices de todas as equipes pendentes, de uma só vez.
+        '''
+        linhas = np.flatnonzero(self.pendentes)
+        if len(linhas) == 0:
+            return
+        adversarios = self.matriz.adversarios[linhas]
+        mandante = self.matriz.mandante[linhas]
+        disputado = self.matriz.disputado[linhas]
+        existe = adversarios != SEM_ADVERSARIO
+        restantes = existe & ~disputado
+        jogados = existe & disputado
+        forca = self.ratings[adversarios] + np.where(mandante, -self.vantagem, self.vantagem)
+
+        self.jogos_restantes[linhas] = restantes.sum(axis=1)
+        self.mandos_restantes[linhas] = (restantes & mandante).sum(axis=1)
+        self.dificuldade_restante[linhas] = media_mascarada(forca, restantes)
+        self.forca_enfrentada[linhas] = media_mascarada(forca, jogados)
+        self.pendentes[linhas] = False
+
+
+def media_mascarada(valores: np.ndarray, mascara: np.ndarray) -> np.ndarray:
+    '''
+    Devolve a média de cada linha de *valores* apenas nas posições de *mascara*, ou nan
+    nas linhas sem nenhuma posição.
+
+    Exemplos:
+    >>> media_mascarada(np.array([[1.0, 3.0], [2.0, 4.0]]), np.array([[True, True], [False, False]]))
+    array([ 2., nan])
+    '''
+    quantidades = mascara.sum(axis=1)
+    somas = np.where(mascara, valores, 0.0).sum(axis=1)
+    return np.divide(somas, quantidades, out=np.full(len(quantidades), np.nan), where=quantidades > 0)
@@ -0,0 +1,211 @@
+# Histórico da Classificação - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+from simulador_campeonato_brasileiro import Equipe, Jogo
+
+# Estatísticas acumuladas rodada a rodada, na ordem em que são guardadas nas somas.
+ESTATISTICAS = ('pontos', 'jogos', 'vitorias', 'empates', 'derrotas', 'gols_marcados', 'gols_sofridos')
+PONTOS, JOGOS, VITORIAS, EMPATES, DERROTAS, GOLS_MARCADOS, GOLS_SOFRIDOS = range(len(ESTATISTICAS))
+
+
+def variacao_placar(gols_mandante: int, gols_visitante: int) -> tuple[list[int], list[int]]:
+    '''
+    Devolve o quanto o placar *gols_mandante* X *gols_visitante* soma a cada uma das
+    ESTATISTICAS do mandante e do visitante.
+
+    Exemplos:
+    >>> variacao_placar(2, 1)
+    ([3, 1, 1, 0, 0, 2, 1], [0, 1, 0, 0, 1, 1, 2])
+    '''
+    mandante = [0] * len(ESTATISTICAS)
+    visitante = [0] * len(ESTATISTICAS)
+    mandante[JOGOS] = visitante[JOGOS] = 1
+    mandante[GOLS_MARCADOS] = visitante[GOLS_SOFRIDOS] = gols_mandante
+    mandante[GOLS_SOFRIDOS] = visitante[GOLS_MARCADOS] = gols_visitante
+    if gols_mandante == gols_visitante:
+        mandante[PONTOS] = visitante[PONTOS] = 1
+        mandante[EMPATES] = visitante[EMPATES] = 1
+    elif gols_mandante > gols_visitante:
+        mandante[PONTOS] = 3
+        mandante[VITORIAS] = visitante[DERROTAS] = 1
+    else:
+        visitante[PONTOS] = 3
+        visitante[VITORIAS] = mandante[DERROTAS] = 1
+    return mandante, visitante
+
+
+class SomasFenwick:
+    '''
+    Árvore de Fenwick sobre as rodadas de uma equipe: guarda, para cada rodada, um vetor
+    de estatísticas e devolve a soma das rodadas 1 a *k* em O(log rodadas). Alterar uma
+    rodada antiga atualiza apenas os O(log rodadas) nós que a cobrem, em vez de todas as
+    somas das rodadas seguintes.
+
+    Exemplos:
+    >>> somas = SomasFenwick(5, 2)
+    >>> somas.adiciona(2, [3, 1])
+    >>> somas.adiciona(4, [1, 1])
+    >>> somas.soma(1), somas.soma(3), somas.soma(5)
+    ([0, 0], [3, 1], [4, 2])
+    >>> somas.adiciona(2, [3, 1], -1)
+    >>> somas.soma(5)
+    [1, 1]
+    '''
+    nos: list[list[int]]
+
+    def __init__(self, rodadas: int, largura: int) -> None:
+        '''
+        Inicializa somas zeradas para *rodadas* rodadas, com vetores de *largura* valores.
+        '''
+        self.nos = [[0] * largura for _ in range(rodadas + 1)]
+
+    def adiciona(self, rodada: int, valores: list[int], sinal: int = 1):
+        '''
+        Soma *valores*, multiplicados por *sinal*, à *rodada*º.
+        '''
+        while rodada < len(self.nos):
+            no = self.nos[rodada]
+            for i, valor in enumerate(valores):
+                no[i] += sinal * valor
+            rodada += rodada & -rodada
+
+    def soma(self, rodada: int) -> list[int]:
+        '''
+        Devolve a soma dos valores das rodadas 1 a *rodada*.
+        '''
+        total = [0] * len(self.nos[0])
+        while rodada > 0:
+            for i, valor in enumerate(self.nos[rodada]):
+                total[i] += valor
+            rodada -= rodada & -rodada
+        return total
+
+
+class HistoricoClassificacao:
+    '''
+    Mantém as estatísticas de cada equipe rodada a rodada, para consultar a tabela ao
+    final de qualquer rodada sem reaplicar os resultados. Como ouvinte de LogResultados,
+    cada troca de placar atualiza apenas as SomasFenwick das duas equipes do jogo, em
+    O(log rodadas).
+
+    A ordem de cada rodada consultada é guardada e só é descartada quando muda um jogo
+    daquela rodada ou de uma anterior. Com a ordem guardada, a colocação de uma equipe
+    em uma rodada é O(1), e a tabela ou a variação de colocações de uma rodada são O(equipes).
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> rodadas[0][0].gols_mandante, rodadas[0][0].gols_visitante = 0, 1   # Corinthians 0 X 1 São Paulo
+    >>> rodadas[1][0].gols_mandante, rodadas[1][0].gols_visitante = 0, 3   # Santos 0 X 3 Corinthians
+    >>> rodadas[1][1].gols_mandante, rodadas[1][1].gols_visitante = 2, 0   # Palmeiras 2 X 0 São Paulo
+    >>> historico = HistoricoClassificacao(equipes, rodadas)
+    >>> [equipe.nome for equipe in historico.tabela(1)]
+    ['São Paulo', 'Palmeiras', 'Santos', 'Corinthians']
+    >>> [(equipe.nome, equipe.pontos, equipe.saldo_gols) for equipe in historico.tabela(2)][:2]
+    [('Corinthians', 3, 2), ('Palmeiras', 3, 2)]
+    >>> historico.posicoes('São Paulo')
+    [1, 3, 3, 3, 3, 3]
+    >>> historico.maiores_subidas(1, 2)[:2]
+    [('Corinthians', 3), ('Palmeiras', 0)]
+    >>> historico.atualiza_jogo(rodadas[0][0], 1, (0, 1), (2, 1))   # Corinthians 2 X 1 São Paulo
+    >>> historico.posicao('Corinthians', 1), historico.tabela(2)[0].pontos
+    (1, 6)
+    '''
+    equipes: dict[str, Equipe]
+    rodadas: int
+    somas: dict[str, SomasFenwick]
+    ordens: dict[int, list[str]]
+    colocacoes: dict[int, dict[str, int]]
+
+    def __init__(self, equipes: list[Equipe], rodadas: list[list[Jogo]]) -> None:
+        '''
+        Inicializa o histórico das *equipes* para as *rodadas* do campeonato, já com os
+        placares registrados nelas.
+        '''
+        self.equipes = {equipe.nome: equipe for equipe in equipes}
+        self.rodadas = len(rodadas)
+        self.somas = {equipe.nome: SomasFenwick(self.rodadas, len(ESTATISTICAS)) for equipe in equipes}
+        self.ordens = {}
+        self.colocacoes = {}
+        for numero, rodada in enumerate(rodadas, 1):
+            for jogo in rodada:
+                self.atualiza_jogo(jogo, numero, (None, None), (jogo.gols_mandante, jogo.gols_visitante))
+
+    def atualiza_jogo(self, jogo: Jogo, rodada: int, anterior: tuple[int | None, int | None],
+                      novo: tuple[int | None, int | None]):
+        '''
+        Desconta da *rodada*º o placar *anterior* de *jogo* e soma o placar *novo*.
+        Placares (None, None) não contam.
+        '''
+        mandante, visitante = self.somas[jogo.mandante.nome], self.somas[jogo.visitante.nome]
+        for placar, sinal in ((anterior, -1), (novo, 1)):
+            if placar[0] is not None and placar[1] is not None:
+                variacao_mandante, variacao_visitante = variacao_placar(placar[0], placar[1])
+                mandante.adiciona(rodada, variacao_mandante, sinal)
+                visitante.adiciona(rodada, variacao_visitante, sinal)
+        for numero in [numero for numero in self.ordens if numero >= rodada]:
+            del self.ordens[numero]
+            del self.colocacoes[numero]
+
+    def equipe(self, nome: str, rodada: int) -> Equipe:
+        '''
+        Devolve uma cópia da equipe *nome* com as estatísticas ao final da *rodada*º.
+        O desempenho das rodadas seguintes aparece como não disputado.
+        '''
+        totais = self.somas[nome].soma(rodada)
+        pontos, jogos = totais[PONTOS], totais[JOGOS]
+        desempenho = self.equipes[nome].desempenho
+        return Equipe(nome, pontos, jogos, totais[VITORIAS], totais[EMPATES], totais[DERROTAS],
+                      totais[GOLS_MARCADOS], totais[GOLS_SOFRIDOS], totais[GOLS_MARCADOS] - totais[GOLS_SOFRIDOS],
+                      100.0 if jogos == 0 else (pontos / (jogos * 3)) * 100,
+                      desempenho[:rodada] + bytearray(len(desempenho) - rodada))
+
+    def tabela(self, rodada: int) -> list[Equipe]:
+        '''
+        Devolve as equipes, com as estatísticas ao final da *rodada*º, na ordem de
+        classificação daquela rodada. Levanta ValueError se a rodada não existir.
+        '''
+        return [self.equipe(nome, rodada) for nome in self.ordem(rodada)]
+
+    def ordem(self, rodada: int) -> list[str]:
+        '''
+        Devolve os nomes das equipes na ordem de classificação ao final da *rodada*º,
+        com os critérios da Classificacao. A rodada 0 é o início do campeonato.
+        '''
+        if rodada < 0 or rodada > self.rodadas:
+            raise ValueError('Rodada inválida!')
+        if rodada not in self.ordens:
+            chaves = []
+            for nome, somas in self.somas.items():
+                totais = somas.soma(rodada)
+                chaves.append((-totais[PONTOS], -totais[VITORIAS], totais[GOLS_SOFRIDOS] - totais[GOLS_MARCADOS], nome))
+            chaves.sort()
+            self.ordens[rodada] = [chave[3] for chave in chaves]
+            self.colocacoes[rodada] = {chave[3]: n for n, chave in enumerate(chaves, 1)}
+        return self.ordens[rodada]
+
+    def posicao(self, nome: str, rodada: int) -> int:
+        '''
+        Devolve a colocação da equipe *nome* ao final da *rodada*º, começando em 1.
+        '''
+        self.ordem(rodada)
+        return self.colocacoes[rodada][nome]
+
+    def posicoes(self, nome: str) -> list[int]:
+        '''
+        Devolve as colocações da equipe *nome* ao final de cada rodada, da 1ª à última.
+        '''
+        return [self.posicao(nome, rodada) for rodada in range(1, self.rodadas + 1)]
+
+    def maiores_subidas(self, de: int, ate: int) -> list[tuple[str, int]]:
+        '''
+        Devolve, para cada equipe, quantas colocações ela ganhou do final da *de*º ao
+        final da *ate*º rodada, das maiores subidas para as maiores quedas.
+        '''
+        self.ordem(de)
+        self.ordem(ate)
+        antes, depois = self.colocacoes[de], self.colocacoes[ate]
+        subidas = [(nome, antes[nome] - depois[nome]) for nome in self.ordens[ate]]
+        subidas.sort(key=lambda subida: -subida[1])
+        return subidas
@@ -0,0 +1,191 @@
+# Importação de Resultados - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+import csv
+import json
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from simulador_campeonato_brasileiro import (Equipe, IndiceJogos, Jogo, LogResultados, converte_equipe,
+                                             recalcula_estatisticas)
+
+CAMPOS = ('rodada', 'mandante', 'visitante', 'gols_mandante', 'gols_visitante')
+
+
+@dataclass(slots=True)
+class LinhaResultado:
+    '''
+    Representa uma linha de um arquivo de resultados.
+
+    Atributos:
+        numero (int): Número da linha no arquivo, usado nas mensagens de erro;
+        temporada (str | None): Temporada do jogo, presente apenas em arquivos históricos;
+        rodada (int): Número da rodada;
+        mandante (str): Nome do mandante;
+        visitante (str): Nome do visitante;
+        gols_mandante (int): Gols do mandante;
+        gols_visitante (int): Gols do visitante.
+    '''
+    numero: int
+    temporada: str | None
+    rodada: int
+    mandante: str
+    visitante: str
+    gols_mandante: int
+    gols_visitante: int
+
+
+def converte_linha(numero: int, campos: dict) -> LinhaResultado:
+    '''
+    Converte os *campos* lidos na linha *numero* de um arquivo em uma LinhaResultado.
+    Levanta ValueError se *campos* não for um dicionário ou se algum campo estiver
+    ausente ou for inválido.
+
+    Exemplos:
+    >>> converte_linha(2, {'rodada': '1', 'mandante': 'A', 'visitante': 'B', 'gols_mandante': '2', 'gols_visitante': 0})
+    LinhaResultado(numero=2, temporada=None, rodada=1, mandante='A', visitante='B', gols_mandante=2, gols_visitante=0)
+    >>> converte_linha(3, {'rodada': '1', 'mandante': 'A', 'visitante': 'B', 'gols_mandante': '-1', 'gols_visitante': 0})
+    Traceback (most recent call last):
+    ...
+    ValueError: Linha 3: número de gols inválido!
+    >>> converte_linha(4, [1, 2])
+    Traceback (most recent call last):
+    ...
+    ValueError: Linha 4: a linha deve ser um objeto com os campos do resultado!
+    '''
+    if not isinstance(campos, dict):
+        raise ValueError(f'Linha {numero}: a linha deve ser um objeto com os campos do resultado!')
+    try:
+        linha = LinhaResultado(numero, campos.get('temporada'), int(campos['rodada']), str(campos['mandante']),
+                               str(campos['visitante']), int(campos['gols_mandante']), int(campos['gols_visitante']))
+    except KeyError as e:
+        raise ValueError(f'Linha {numero}: campo {e} ausente!')
+    except (TypeError, ValueError):
+        raise ValueError(f'Linha {numero}: valor inválido!')
+    if linha.gols_mandante < 0 or linha.gols_visitante < 0:
+        raise ValueError(f'Linha {numero}: número de gols inválido!')
+    if linha.temporada is not None:
+        linha.temporada = str(linha.temporada)
+    return linha
+
+
+def le_resultados(caminho: str) -> Iterator[LinhaResultado]:
+    '''
+    Lê, uma linha por vez, os resultados do arquivo *caminho*, que pode ser um CSV com
+    cabeçalho ou um arquivo JSON Lines (.jsonl), com um objeto por linha. Os campos
+    obrigatórios são os de CAMPOS; o campo 'temporada' é opcional. Levanta ValueError
+    se alguma linha for inválida, inclusive se o CSV estiver malformado.
+
+    Como as linhas são lidas sob demanda, a memória usada não depende do tamanho do arquivo.
+    '''
+    with open(caminho, encoding='utf-8', newline='') as arquivo:
+        if caminho.endswith('.jsonl'):
+            numero = 0
+            for texto in arquivo:
+                numero += 1
+                if texto.strip():
+                    try:
+                        campos = json.loads(texto)
+                    except json.JSONDecodeError:
+                        raise ValueError(f'Linha {numero}: JSON inválido!')
+                    yield converte_linha(numero, campos)
+        else:
+            leitor = csv.DictReader(arquivo)
+            try:
+                for campos in leitor:
+                    yield converte_linha(leitor.line_num, campos)
+            except csv.Error as e:
+                raise ValueError(f'Linha {leitor.line_num + 1}: CSV inválido ({e})!')
+
+
+def importa_resultados(caminho: str, equipes: list[Equipe], indice: IndiceJogos,
+                       log: LogResultados | None = None) -> int:
+    '''
+    Importa os resultados do arquivo *caminho* para o campeonato formado por *equipes*
+    e pelas rodadas de *indice*, e devolve o número de linhas importadas.
+
+    Cada linha é validada contra o calendário: o mandante e o visitante devem se enfrentar,
+    nessa ordem, na rodada informada. Um resultado já registrado é substituído. Os placares
+    são gravados diretamente nos jogos, e as estatísticas de todas as equipes são
+    recalculadas uma única vez ao final, em vez de uma vez por linha.
+
+    Como os placares não passam por um LogResultados, os seus ouvintes, como a
+    Classificacao, ficam desatualizados. Se *log* for informado, depois que todas as
+    linhas forem validadas cada jogo alterado é registrado nele uma única vez, com o
+    placar final, o que avisa os ouvintes e permite desfazer a importação; nesse caso,
+    as estatísticas são atualizadas pelo próprio log, sem o recálculo.
+
+    Se alguma linha for inválida, nenhum placar é alterado e um ValueError é levantado;
+    qualquer outro erro durante a leitura, como um OSError, também desfaz os placares.
+    Apenas os placares anteriores dos jogos alterados são guardados para isso, de forma que
+    a memória usada é limitada pelo número de jogos do campeonato, e não pelo de linhas.
+    '''
+    anteriores: dict[int, tuple[Jogo, int, int | None, int | None]] = {}
+    importadas = 0
+    try:
+        for linha in le_resultados(caminho):
+            if linha.mandante not in indice.referencias:
+                raise ValueError(f'Linha {linha.numero}: equipe "{linha.mandante}" não está no campeonato!')
+            jogo = indice.jogo_na_rodada(linha.mandante, linha.rodada)
+            if jogo is None or jogo.mandante.nome != linha.mandante or jogo.visitante.nome != linha.visitante:
+                raise ValueError(f'Linha {linha.numero}: o jogo {linha.mandante} X {linha.visitante} '
+                                 f'não está na {linha.rodada}ª rodada!')
+            if id(jogo) not in anteriores:
+                anteriores[id(jogo)] = (jogo, linha.rodada, jogo.gols_mandante, jogo.gols_visitante)
+            jogo.gols_mandante = linha.gols_mandante
+            jogo.gols_visitante = linha.gols_visitante
+            importadas += 1
+    except BaseException:
+        for jogo, _, gols_mandante, gols_visitante in anteriores.values():
+            jogo.gols_mandante = gols_mandante
+            jogo.gols_visitante = gols_visitante
+        raise
+
+    if log is None:
+        recalcula_estatisticas(equipes, indice.rodadas)
+        return importadas
+    for jogo, rodada, gols_mandante, gols_visitante in anteriores.values():
+        novo = (jogo.gols_mandante, jogo.gols_visitante)
+        jogo.gols_mandante = gols_mandante
+        jogo.gols_visitante = gols_visitante
+        if novo != (gols_mandante, gols_visitante):
+            log.registra(jogo, rodada, novo[0], novo[1])
+    return importadas
+
+
+def totaliza_arquivo(caminho: str) -> dict[str | None, dict[str, Equipe]]:
+    '''
+    Percorre uma única vez um arquivo histórico de resultados, que pode ter várias
+    temporadas e milhões de linhas, e devolve as estatísticas finais de cada equipe em
+    cada temporada. A memória usada é proporcional ao número de equipes e temporadas,
+    e não ao número de linhas. O desempenho por rodada não é acumulado.
+    '''
+    temporadas: dict[str | None, dict[str, Equipe]] = {}
+    for linha in le_resultados(caminho):
+        equipes = temporadas.setdefault(linha.temporada, {})
+        for nome in (linha.mandante, linha.visitante):
+            if nome not in equipes:
+                equipes[nome] = converte_equipe([nome], 0)[0]
+        mandante, visitante = equipes[linha.mandante], equipes[linha.visitante]
+        mandante.jogos += 1
+        visitante.jogos += 1
+        mandante.gols_marcados += linha.gols_mandante
+        mandante.gols_sofridos += linha.gols_visitante
+        visitante.gols_marcados += linha.gols_visitante
+        visitante.gols_sofridos += linha.gols_mandante
+        if linha.gols_mandante == linha.gols_visitante:
+            mandante.empates += 1
+            visitante.empates += 1
+        elif linha.gols_mandante > linha.gols_visitante:
+            mandante.vitorias += 1
+            visitante.derrotas += 1
+        else:
+            visitante.vitorias += 1
+            mandante.derrotas += 1
+
+    for equipes in temporadas.values():
+        for equipe in equipes.values():
+            equipe.pontos = 3 * equipe.vitorias + equipe.empates
+            equipe.saldo_gols = equipe.gols_marcados - equipe.gols_sofridos
+            equipe.aproveitamento = (equipe.pontos / (equipe.jogos * 3)) * 100
+    return temporadas
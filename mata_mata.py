@@ -0,0 +1,649 @@
+# Mata-Mata - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+#
+# Requer NumPy.
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from modelos_partida import ModeloPartida
+from simulador_campeonato_brasileiro import (Classificacao, Equipe, Jogo, RegistroEquipes, gera_rodadas,
+                                             total_rodadas)
+from tabela_vetorizada import aplica_jogos, classificacao, cria_tabela, indices_jogos
+
+# As projeções sorteiam os confrontos em blocos de BLOCO_SIMULACOES torneios, o que
+# limita a memória usada pelos modelos que montam uma tabela de placares por jogo.
+BLOCO_SIMULACOES = 10000
+# Nas projeções, a disputa de pênaltis é um sorteio justo.
+PROBABILIDADE_PENALTIS = 0.5
+# Nas colunas de placares fixos de *decide_confrontos*, jogos e pênaltis ainda não
+# disputados têm SEM_PLACAR.
+SEM_PLACAR = -1
+
+
+@dataclass
+class Confronto:
+    '''
+    Confronto eliminatório de um ou dois jogos. Com dois jogos, a equipe que manda a
+    *volta* é a primeira do confronto; com jogo único, é a mandante da *ida*. Empates
+    no agregado são decididos pelos gols fora de casa, se *gols_fora* valer e houver
+    dois jogos, e depois pelo vencedor dos *penaltis*, que é registrado à parte.
+    '''
+    ida: Jogo
+    volta: Jogo | None
+    gols_fora: bool
+    penaltis: Equipe | None = None
+
+    def equipes(self) -> tuple[Equipe, Equipe]:
+        '''
+        Devolve as duas equipes do confronto, a primeira e a segunda.
+        '''
+        if self.volta is None:
+            return self.ida.mandante, self.ida.visitante
+        return self.volta.mandante, self.volta.visitante
+
+    def agregado(self) -> tuple[int, int] | None:
+        '''
+        Devolve os gols da primeira e da segunda equipe somados nos jogos do confronto,
+        ou None se algum jogo ainda não tiver placar.
+        '''
+        ida_mandante, ida_visitante = self.ida.gols_mandante, self.ida.gols_visitante
+        if ida_mandante is None or ida_visitante is None:
+            return None
+        if self.volta is None:
+            return ida_mandante, ida_visitante
+        volta_mandante, volta_visitante = self.volta.gols_mandante, self.volta.gols_visitante
+        if volta_mandante is None or volta_visitante is None:
+            return None
+        return ida_visitante + volta_mandante, ida_mandante + volta_visitante
+
+    def precisa_penaltis(self) -> bool:
+        '''
+        Devolve se todos os jogos têm placar e o confronto continua empatado depois do
+        agregado e dos gols fora de casa.
+        '''
+        agregado = self.agregado()
+        if agregado is None or agregado[0] != agregado[1]:
+            return False
+        return not (self.gols_fora and self.volta is not None
+                    and self.ida.gols_visitante != self.volta.gols_visitante)
+
+    def vencedor(self) -> Equipe | None:
+        '''
+        Devolve a equipe classificada, ou None se o confronto ainda não estiver decidido.
+        '''
+        primeira, segunda = self.equipes()
+        agregado = self.agregado()
+        if agregado is None:
+            return None
+        if agregado[0] != agregado[1]:
+            return primeira if agregado[0] > agregado[1] else segunda
+        if self.precisa_penaltis():
+            return self.penaltis
+        # Sem pênaltis, o empate no agregado só pode ter sido decidido pelos gols fora, com dois jogos.
+        assert self.volta is not None and self.ida.gols_visitante is not None and self.volta.gols_visitante is not None
+        return primeira if self.ida.gols_visitante > self.volta.gols_visitante else segunda
+
+
+def ordem_chave(n: int) -> list[int]:
+    '''
+    Devolve a ordem das *n* cabeças de chave, numeradas a partir de 0, nas vagas da chave:
+    as vagas 2i e 2i + 1 se enfrentam na primeira fase, e os vencedores de vagas
+    vizinhas se enfrentam nas seguintes. A melhor cabeça de chave enfrenta a pior, e as
+    duas melhores só podem se encontrar na final. Levanta ValueError se *n* não for uma
+    potência de 2 maior que 1.
+
+    Exemplos:
+    >>> ordem_chave(8)
+    [0, 7, 3, 4, 1, 6, 2, 5]
+    >>> ordem_chave(6)
+    Traceback (most recent call last):
+    ...
+    ValueError: O mata-mata exige 2, 4, 8, 16... equipes!
+    '''
+    if n < 2 or n & (n - 1):
+        raise ValueError('O mata-mata exige 2, 4, 8, 16... equipes!')
+    ordem = [0]
+    while len(ordem) < n:
+        tamanho = len(ordem) * 2
+        ordem = [vaga for semente in ordem for vaga in (semente, tamanho - 1 - semente)]
+    return ordem
+
+
+def rodadas_mata_mata(numero_equipes: int, ida_e_volta: bool = True, final_unica: bool = True) -> int:
+    '''
+    Devolve o número de rodadas de um mata-mata com *numero_equipes* equipes.
+
+    Exemplos:
+    >>> rodadas_mata_mata(16), rodadas_mata_mata(16, final_unica=False), rodadas_mata_mata(16, False)
+    (7, 8, 4)
+    '''
+    fases = len(ordem_chave(numero_equipes)).bit_length() - 1
+    if not ida_e_volta:
+        return fases
+    return fases * 2 - 1 if final_unica else fases * 2
+
+
+def dois_jogos(confrontos: int, ida_e_volta: bool, final_unica: bool) -> bool:
+    '''
+    Devolve se uma fase com *confrontos* confrontos é disputada em ida e volta.
+    '''
+    return ida_e_volta and not (confrontos == 1 and final_unica)
+
+
+class MataMata:
+    '''
+    Torneio eliminatório entre equipes em ordem de cabeça de chave, com confrontos de
+    ida e volta, ou de jogo único, e final única opcional. A melhor cabeça de chave de
+    cada confronto, guardada em *cabecas* para todas as fases, é a primeira equipe e
+    manda o jogo de volta, ou o jogo único.
+
+    Os jogos ficam em *rodadas*, numeradas a partir de *primeira_rodada*, e os placares
+    são registrados como nos pontos corridos, por *registra_placar* ou por um
+    LogResultados, o que mantém as estatísticas das equipes. Os pênaltis são
+    registrados por *decide_penaltis*. Cada fase só é criada por *avanca*, depois que
+    todos os confrontos da anterior estiverem decididos; alterar depois disso um placar
+    de uma fase encerrada não refaz as fases seguintes.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, registra_placar
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'], rodadas_mata_mata(4))
+    >>> copa = MataMata(equipes)
+    >>> [(confronto.equipes()[0].nome, confronto.equipes()[1].nome) for confronto in copa.fase_atual()]
+    [('Corinthians', 'São Paulo'), ('Palmeiras', 'Santos')]
+    >>> for numero, rodada in enumerate(copa.rodadas, copa.primeira_rodada):
+    ...     for jogo in rodada:
+    ...         registra_placar(jogo, numero, 1, 1 if jogo.mandante.nome != 'Santos' else 2)
+    >>> [confronto.agregado() for confronto in copa.fase_atual()]
+    [(2, 2), (3, 2)]
+    >>> copa.avanca()
+    Traceback (most recent call last):
+    ...
+    ValueError: A fase atual ainda não terminou!
+    >>> copa.decide_penaltis('São Paulo')
+    >>> copa.avanca()
+    >>> final = copa.fase_atual()[0]
+    >>> final.volta is None, final.equipes()[0].nome, final.equipes()[1].nome
+    (True, 'Palmeiras', 'São Paulo')
+    >>> registra_placar(final.ida, 3, 1, 0)
+    >>> copa.campeao().nome, copa.campeao().vitorias
+    ('Palmeiras', 2)
+    '''
+    fases: list[list[Confronto]]
+    rodadas: list[list[Jogo]]
+    cabecas: dict[str, int]
+    primeira_rodada: int
+    ida_e_volta: bool
+    final_unica: bool
+    gols_fora: bool
+
+    def __init__(self, equipes: list[Equipe], ida_e_volta: bool = True, final_unica: bool = True,
+                 gols_fora: bool = True, primeira_rodada: int = 1) -> None:
+        '''
+        Cria a primeira fase entre *equipes*, em ordem de cabeça de chave. O desempenho
+        das equipes precisa ter espaço para as rodadas do mata-mata a partir de
+        *primeira_rodada* (veja *rodadas_mata_mata*). Levanta ValueError se o número de
+        equipes não for uma potência de 2 maior que 1.
+        '''
+        self.fases = []
+        self.rodadas = []
+        self.cabecas = {equipe.nome: i for i, equipe in enumerate(equipes)}
+        self.primeira_rodada = primeira_rodada
+        self.ida_e_volta = ida_e_volta
+        self.final_unica = final_unica
+        self.gols_fora = gols_fora
+        self.__cria_fase([equipes[semente] for semente in ordem_chave(len(equipes))])
+
+    def fase_atual(self) -> list[Confronto]:
+        '''
+        Devolve os confrontos da última fase criada, em ordem de chave.
+        '''
+        return self.fases[-1]
+
+    def confronto(self, nome: str) -> Confronto:
+        '''
+        Devolve o confronto da fase atual da equipe *nome*.
+        Levanta ValueError se ela não estiver na fase atual.
+        '''
+        for confronto in self.fase_atual():
+            if nome in (equipe.nome for equipe in confronto.equipes()):
+                return confronto
+        raise ValueError(f'A equipe "{nome}" não está na fase atual!')
+
+    def decide_penaltis(self, nome: str):
+        '''
+        Registra a equipe *nome* como vencedora dos pênaltis do seu confronto na fase
+        atual. Levanta ValueError se o confronto não estiver empatado depois de todos
+        os jogos.
+        '''
+        confronto = self.confronto(nome)
+        if not confronto.precisa_penaltis():
+            raise ValueError('O confronto não terminou empatado!')
+        confronto.penaltis = next(equipe for equipe in confronto.equipes() if equipe.nome == nome)
+
+    def avanca(self):
+        '''
+        Cria a próxima fase com os classificados da fase atual. Levanta ValueError se
+        algum confronto ainda não estiver decidido ou se a final já tiver sido criada.
+        '''
+        if len(self.fase_atual()) == 1:
+            raise ValueError('O mata-mata já está na final!')
+        vencedores = [confronto.vencedor() for confronto in self.fase_atual()]
+        if None in vencedores:
+            raise ValueError('A fase atual ainda não terminou!')
+        self.__cria_fase(vencedores)
+
+    def campeao(self) -> Equipe | None:
+        '''
+        Devolve a equipe campeã, ou None se a final ainda não estiver decidida.
+        '''
+        if len(self.fase_atual()) > 1:
+            return None
+        return self.fase_atual()[0].vencedor()
+
+    def __cria_fase(self, equipes: list[Equipe]):
+        '''
+        Cria os confrontos entre as vagas vizinhas de *equipes* e as suas rodadas, com a
+        melhor cabeça de chave de cada confronto como primeira equipe.
+        '''
+        pares = [(a, b) if self.cabecas[a.nome] < self.cabecas[b.nome] else (b, a)
+                 for a, b in zip(equipes[0::2], equipes[1::2])]
+        if dois_jogos(len(pares), self.ida_e_volta, self.final_unica):
+            idas = [Jogo(segunda, None, primeira, None) for primeira, segunda in pares]
+            voltas = [Jogo(primeira, None, segunda, None) for primeira, segunda in pares]
+            fase = [Confronto(ida, volta, self.gols_fora) for ida, volta in zip(idas, voltas)]
+            self.rodadas += [idas, voltas]
+        else:
+            fase = [Confronto(Jogo(primeira, None, segunda, None), None, self.gols_fora) for primeira, segunda in pares]
+            self.rodadas.append([confronto.ida for confronto in fase])
+        self.fases.append(fase)
+
+
+def inicia_mata_mata(registro: RegistroEquipes, ida_e_volta: bool = True, final_unica: bool = True,
+                     gols_fora: bool = True) -> MataMata:
+    '''
+    Cria as Equipes de *registro*, com espaço no desempenho para todas as rodadas, e um
+    MataMata entre elas, com as cabeças de chave na ordem de registro.
+
+    Exemplos:
+    >>> copa = inicia_mata_mata(RegistroEquipes(['A', 'B', 'C', 'D', 'E', 'F', 'G', 'H']))
+    >>> len(copa.rodadas), len(copa.fase_atual()[0].equipes()[0].desempenho)
+    (2, 5)
+    '''
+    equipes = registro.inicia_equipes(rodadas_mata_mata(len(registro), ida_e_volta, final_unica))
+    return MataMata(equipes, ida_e_volta, final_unica, gols_fora)
+
+
+def ordem_sementes(grupos: int, classificados: int) -> list[tuple[int, int]]:
+    '''
+    Devolve, para cada cabeça de chave do mata-mata de uma fase de grupos, o grupo e a
+    colocação (a partir de 0) de onde ela vem. Os primeiros colocados são as melhores
+    cabeças de chave, e os piores colocados são ordenados de forma que, na primeira
+    fase, nenhum confronto reúna duas equipes do mesmo grupo.
+
+    Exemplos:
+    >>> ordem_sementes(4, 2)
+    [(0, 0), (1, 0), (2, 0), (3, 0), (0, 1), (3, 1), (2, 1), (1, 1)]
+    '''
+    sementes = []
+    for colocacao in range(classificados):
+        for j in range(grupos):
+            grupo = (grupos - j) % grupos if 2 * colocacao > classificados - 1 else j
+            sementes.append((grupo, colocacao))
+    return sementes
+
+
+class CopaComGrupos:
+    '''
+    Competição com fase de grupos em pontos corridos e mata-mata entre os *classificados*
+    de cada grupo, como a Libertadores. As Equipes são criadas a partir do registro,
+    com espaço no desempenho para as duas fases.
+
+    Todos os grupos jogam cada rodada ao mesmo tempo, e as *rodadas* da fase de grupos
+    são numeradas a partir de 1; as do mata-mata continuam a numeração. Os resultados
+    são registrados como nos pontos corridos e, se passarem por um LogResultados com
+    *atualiza_jogo* entre os ouvintes, a Classificacao de cada grupo se mantém
+    atualizada, com os critérios de desempate de *intercala*.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import LogResultados
+    >>> registro = RegistroEquipes(['A', 'B', 'C', 'D', 'E', 'F'])
+    >>> copa = CopaComGrupos(registro, [['A', 'B', 'C'], ['D', 'E', 'F']], ida_e_volta=False)
+    >>> log = LogResultados()
+    >>> log.ouvintes.append(copa.atualiza_jogo)
+    >>> for numero, rodada in enumerate(copa.rodadas, 1):
+    ...     for jogo in rodada:
+    ...         log.registra(jogo, numero, 1 if jogo.mandante.nome in 'AD' else 0, 0)
+    >>> [[equipe.nome for equipe in c.ordem()] for c in copa.classificacoes]
+    [['A', 'C', 'B'], ['D', 'F', 'E']]
+    >>> [(c.equipes()[0].nome, c.equipes()[1].nome) for c in copa.inicia_mata_mata().fase_atual()]
+    [('A', 'F'), ('D', 'C')]
+    >>> CopaComGrupos(registro, [['A', 'B', 'C'], ['D', 'E']])
+    Traceback (most recent call last):
+    ...
+    ValueError: Os grupos devem ter o mesmo número de equipes!
+    '''
+    registro: RegistroEquipes
+    grupos: list[list[Equipe]]
+    grupo_da_equipe: dict[str, int]
+    rodadas: list[list[Jogo]]
+    classificacoes: list[Classificacao]
+    classificados: int
+    ida_e_volta: bool
+    final_unica: bool
+    gols_fora: bool
+    mata_mata: MataMata | None
+
+    def __init__(self, registro: RegistroEquipes, grupos: list[list[str]], classificados: int = 2,
+                 ida_e_volta: bool = True, final_unica: bool = True, gols_fora: bool = True) -> None:
+        '''
+        Cria as Equipes de *registro* e as rodadas dos *grupos*, listas de nomes de
+        equipes registradas. *ida_e_volta* vale para os grupos e para o mata-mata.
+        Levanta ValueError se os grupos tiverem tamanhos diferentes, se alguma equipe não
+        estiver registrada ou estiver em mais de um grupo, ou se o número de
+        classificados não formar uma chave de 2, 4, 8, 16... equipes.
+        '''
+        if len({len(grupo) for grupo in grupos}) != 1:
+            raise ValueError('Os grupos devem ter o mesmo número de equipes!')
+        self.grupo_da_equipe = {}
+        for g, grupo in enumerate(grupos):
+            for nome in grupo:
+                if nome not in registro:
+                    raise ValueError(f'A equipe "{nome}" não está no campeonato!')
+                if nome in self.grupo_da_equipe:
+                    raise ValueError(f'A equipe "{nome}" está em mais de um grupo!')
+                self.grupo_da_equipe[nome] = g
+        if not 0 < classificados <= len(grupos[0]):
+            raise ValueError('Número de classificados inválido!')
+        rodadas_grupos = total_rodadas(len(grupos[0]), ida_e_volta)
+        registro.inicia_equipes(rodadas_grupos + rodadas_mata_mata(classificados * len(grupos), ida_e_volta,
+                                                                   final_unica))
+        self.registro = registro
+        self.grupos = [[registro.equipe(nome) for nome in grupo] for grupo in grupos]
+        self.rodadas = [[] for _ in range(rodadas_grupos)]
+        for equipes_grupo in self.grupos:
+            for rodada, jogos in zip(self.rodadas, gera_rodadas(equipes_grupo, ida_e_volta)):
+                rodada.extend(jogos)
+        self.classificacoes = [Classificacao(grupo) for grupo in self.grupos]
+        self.classificados = classificados
+        self.ida_e_volta = ida_e_volta
+        self.final_unica = final_unica
+        self.gols_fora = gols_fora
+        self.mata_mata = None
+
+    def atualiza_jogo(self, jogo: Jogo, rodada: int, anterior: tuple[int | None, int | None],
+                      novo: tuple[int | None, int | None]):
+        '''
+        Repassa a troca de placar de um jogo da fase de grupos à Classificacao do grupo.
+        Jogos do mata-mata são ignorados.
+        '''
+        if rodada <= len(self.rodadas):
+            self.classificacoes[self.grupo_da_equipe[jogo.mandante.nome]].atualiza_jogo(jogo, rodada, anterior, novo)
+
+    def fase_de_grupos_encerrada(self) -> bool:
+        '''
+        Devolve se todos os jogos da fase de grupos têm placar.
+        '''
+        return all(jogo.gols_mandante is not None and jogo.gols_visitante is not None
+                   for rodada in self.rodadas for jogo in rodada)
+
+    def sementes(self) -> list[Equipe]:
+        '''
+        Devolve os classificados de cada grupo, pela classificação atual, em ordem de
+        cabeça de chave (veja *ordem_sementes*).
+        '''
+        ordens = [classificacao.ordem() for classificacao in self.classificacoes]
+        return [ordens[grupo][colocacao] for grupo, colocacao in ordem_sementes(len(self.grupos), self.classificados)]
+
+    def inicia_mata_mata(self) -> MataMata:
+        '''
+        Cria o mata-mata entre os classificados, com as rodadas numeradas a partir da
+        última rodada da fase de grupos. Levanta ValueError se a fase de grupos não tiver
+        terminado ou se o mata-mata já tiver começado.
+        '''
+        if self.mata_mata is not None:
+            raise ValueError('O mata-mata já começou!')
+        if not self.fase_de_grupos_encerrada():
+            raise ValueError('A fase de grupos ainda não terminou!')
+        self.mata_mata = MataMata(self.sementes(), self.ida_e_volta, self.final_unica, self.gols_fora,
+                                  len(self.rodadas) + 1)
+        return self.mata_mata
+
+
+def sorteia_partidas(modelo: ModeloPartida, mandantes: np.ndarray, visitantes: np.ndarray,
+                     gerador: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Sorteia com *modelo* um placar para cada posição de *mandantes* e *visitantes*,
+    matrizes de índices em *modelo.nomes* de qualquer formato, em que cada posição é um
+    jogo diferente. Devolve os gols do mandante e do visitante, no mesmo formato.
+
+    Em uma chave, os mesmos confrontos se repetem em muitas simulações. Por isso, cada
+    par (mandante, visitante) distinto é passado uma única vez a *modelo.sorteia*, e a
+    k-ésima repetição de cada par recebe o k-ésimo sorteio dele. Assim, modelos que
+    montam uma tabela de placares por jogo, como o de Dixon-Coles, montam uma por par,
+    e não uma por jogo. Os pares são agrupados por potência de 2 do número de
+    repetições, e cada grupo é sorteado com as repetições do seu par mais frequente,
+    o que limita os sorteios descartados a menos da metade.
+
+    Exemplos:
+    >>> from modelos_partida import ModeloPoisson
+    >>> modelo = ModeloPoisson(['A', 'B'], 1.3, 1.15, np.ones(2), np.ones(2))
+    >>> gols_m, gols_v = sorteia_partidas(modelo, np.zeros((4, 3), dtype=np.intp), np.ones((4, 3), dtype=np.intp),
+    ...                                   np.random.default_rng(0))
+    >>> gols_m.shape, len(np.unique(gols_m)) > 1
+    ((4, 3), True)
+    '''
+    n = len(modelo.nomes)
+    chaves = mandantes.ravel() * n + visitantes.ravel()
+    ordem = np.argsort(chaves, kind='stable')
+    ordenadas = chaves[ordem]
+    inicios = np.flatnonzero(np.r_[True, ordenadas[1:] != ordenadas[:-1]])
+    pares = ordenadas[inicios]
+    repeticoes = np.diff(np.r_[inicios, len(chaves)])
+    jogo_par = np.empty_like(ordem)
+    jogo_par[ordem] = np.repeat(np.arange(len(pares)), repeticoes)
+    repeticao = np.empty_like(ordem)
+    repeticao[ordem] = np.arange(len(ordem)) - np.repeat(inicios, repeticoes)
+    grupo_par = np.ceil(np.log2(repeticoes)).astype(np.int64)
+    coluna_par = np.empty_like(pares)
+    gols_mandante = np.empty(len(jogo_par), dtype=np.int64)
+    gols_visitante = np.empty(len(jogo_par), dtype=np.int64)
+    for grupo in np.unique(grupo_par):
+        selecionados = np.flatnonzero(grupo_par == grupo)
+        coluna_par[selecionados] = np.arange(len(selecionados))
+        sorteio_m, sorteio_v = modelo.sorteia(pares[selecionados] // n, pares[selecionados] % n,
+                                              int(repeticoes[selecionados].max()), gerador)
+        jogos = np.flatnonzero(grupo_par[jogo_par] == grupo)
+        gols_mandante[jogos] = sorteio_m[repeticao[jogos], coluna_par[jogo_par[jogos]]]
+        gols_visitante[jogos] = sorteio_v[repeticao[jogos], coluna_par[jogo_par[jogos]]]
+    return gols_mandante.reshape(mandantes.shape), gols_visitante.reshape(mandantes.shape)
+
+
+def decide_confrontos(modelo: ModeloPartida, primeiras: np.ndarray, segundas: np.ndarray, dois_jogos: bool,
+                      gols_fora: bool, gerador: np.random.Generator,
+                      fixos: np.ndarray | None = None) -> np.ndarray:
+    '''
+    Sorteia os confrontos entre *primeiras* e *segundas*, matrizes (simulações,
+    confrontos) de índices em *modelo.nomes*, e devolve os classificados no mesmo
+    formato. Com *dois_jogos*, a segunda equipe manda a ida e a primeira, a volta.
+
+    *fixos*, de formato (confrontos, 5), guarda os gols do mandante e do visitante da ida
+    e da volta e se a primeira equipe venceu os pênaltis (1) ou não (0), iguais em todas
+    as simulações; os valores SEM_PLACAR são sorteados.
+
+    Exemplos:
+    >>> from modelos_partida import ModeloPoisson
+    >>> modelo = ModeloPoisson(['A', 'B'], 1.3, 1.15, np.array([1.0, 1.0]), np.array([1.0, 1.0]))
+    >>> fixos = np.array([[0, 2, 1, 0, SEM_PLACAR]])
+    >>> decide_confrontos(modelo, np.zeros((3, 1), dtype=np.intp), np.ones((3, 1), dtype=np.intp), True, True,
+    ...                   np.random.default_rng(0), fixos).ravel().tolist()
+    [0, 0, 0]
+    '''
+    if dois_jogos:
+        ida_m, ida_v = sorteia_partidas(modelo, segundas, primeiras, gerador)
+        volta_m, volta_v = sorteia_partidas(modelo, primeiras, segundas, gerador)
+    else:
+        volta_m, volta_v = sorteia_partidas(modelo, primeiras, segundas, gerador)
+        ida_m = ida_v = np.zeros_like(volta_m)
+    penaltis = gerador.random(primeiras.shape) < PROBABILIDADE_PENALTIS
+    if fixos is not None:
+        ida_m, ida_v, volta_m, volta_v = (np.where(fixos[:, i] != SEM_PLACAR, fixos[:, i], sorteio)
+                                          for i, sorteio in enumerate((ida_m, ida_v, volta_m, volta_v)))
+        penaltis = np.where(fixos[:, 4] != SEM_PLACAR, fixos[:, 4] == 1, penaltis)
+    saldo = (volta_m + ida_v) - (ida_m + volta_v)
+    if dois_jogos and gols_fora:
+        saldo_fora = ida_v - volta_v
+    else:
+        saldo_fora = np.zeros_like(saldo)
+    primeira_vence = (saldo > 0) | ((saldo == 0) & ((saldo_fora > 0) | ((saldo_fora == 0) & penaltis)))
+    return np.where(primeira_vence, primeiras, segundas)
+
+
+def simula_chave(modelo: ModeloPartida, vagas: np.ndarray, ida_e_volta: bool, final_unica: bool, gols_fora: bool,
+                 gerador: np.random.Generator, fixos: np.ndarray | None = None,
+                 cabecas: np.ndarray | None = None) -> list[np.ndarray]:
+    '''
+    Simula as fases de um mata-mata entre as equipes de *vagas*, de formato (simulações,
+    vagas), em ordem de chave. Devolve as equipes vivas no início de cada fase, da de
+    *vagas* até a campeã, de formato (simulações, 1). *fixos* vale para a primeira fase,
+    como em *decide_confrontos*.
+
+    *cabecas* dá a cabeça de chave de cada vaga, por padrão a de *ordem_chave*. Na
+    primeira fase, a primeira equipe de cada confronto é a da vaga par, como em *fixos*;
+    nas seguintes, como em MataMata, é a melhor cabeça de chave, que manda a volta.
+
+    Exemplos:
+    >>> from modelos_partida import ModeloPoisson
+    >>> modelo = ModeloPoisson(['A', 'B', 'C', 'D'], 1.3, 1.15, np.ones(4), np.ones(4))
+    >>> fixos = np.array([[1, 0, 0, 0, SEM_PLACAR], [1, 0, 0, 0, SEM_PLACAR]])   # D e C vencem a ida
+    >>> vivas = simula_chave(modelo, np.array([[0, 3, 1, 2]]), True, True, True, np.random.default_rng(0), fixos)
+    >>> vivas[1].tolist()
+    [[3, 2]]
+    '''
+    if cabecas is None:
+        cabecas = np.broadcast_to(np.array(ordem_chave(vagas.shape[1])), vagas.shape)
+    vivas = [vagas]
+    while vagas.shape[1] > 1:
+        if len(vivas) > 1:
+            trocadas = np.repeat(cabecas[:, 0::2] > cabecas[:, 1::2], 2, axis=1)
+            parceiras = np.arange(vagas.shape[1]) ^ 1
+            vagas = np.where(trocadas, vagas[:, parceiras], vagas)
+            cabecas = np.where(trocadas, cabecas[:, parceiras], cabecas)
+        vencedoras = decide_confrontos(modelo, vagas[:, 0::2], vagas[:, 1::2],
+                                       dois_jogos(vagas.shape[1] // 2, ida_e_volta, final_unica), gols_fora, gerador,
+                                       fixos)
+        cabecas = np.where(vencedoras == vagas[:, 0::2], cabecas[:, 0::2], cabecas[:, 1::2])
+        vagas = vencedoras
+        fixos = None
+        vivas.append(vagas)
+    return vivas
+
+
+def placares_fixos(fase: list[Confronto]) -> np.ndarray:
+    '''
+    Devolve os placares já registrados dos confrontos de *fase* no formato de *fixos*
+    de *decide_confrontos*.
+    '''
+    fixos = np.full((len(fase), 5), SEM_PLACAR, dtype=np.int64)
+    for i, confronto in enumerate(fase):
+        jogos = [confronto.ida, confronto.volta] if confronto.volta is not None else [None, confronto.ida]
+        for j, jogo in enumerate(jogos):
+            if jogo is not None and jogo.gols_mandante is not None and jogo.gols_visitante is not None:
+                fixos[i, 2 * j], fixos[i, 2 * j + 1] = jogo.gols_mandante, jogo.gols_visitante
+        if confronto.penaltis is not None:
+            fixos[i, 4] = int(confronto.penaltis is confronto.equipes()[0])
+    return fixos
+
+
+def contagem_fases(vivas: list[np.ndarray], n: int) -> np.ndarray:
+    '''
+    Devolve, para cada uma das *n* equipes do modelo, quantas vezes ela aparece em cada
+    matriz de *vivas*, de formato (n, fases).
+    '''
+    return np.stack([np.bincount(fase.ravel(), minlength=n) for fase in vivas], axis=1)
+
+
+def projeta_mata_mata(mata_mata: MataMata, modelo: ModeloPartida, simulacoes: int,
+                      semente: int | None = None) -> dict[str, list[float]]:
+    '''
+    Simula *simulacoes* vezes o restante de *mata_mata* com *modelo*, que deve conhecer
+    todas as equipes, e devolve, para cada equipe ainda viva, a probabilidade de chegar
+    a cada fase, da atual até a final, e, por último, a de ser campeã. Os placares e pênaltis já
+    registrados na fase atual são mantidos. A mesma *semente* produz sempre a mesma
+    projeção.
+
+    Exemplos:
+    >>> from modelos_partida import ModeloPoisson
+    >>> modelo = ModeloPoisson(['A', 'B', 'C', 'D'], 1.3, 1.15, np.array([2.0, 1.4, 1.0, 0.5]), np.ones(4))
+    >>> copa = inicia_mata_mata(RegistroEquipes(['A', 'B', 'C', 'D']))
+    >>> projecao = projeta_mata_mata(copa, modelo, 20000, semente=1)
+    >>> sorted(projecao, key=lambda nome: -projecao[nome][-1])
+    ['A', 'B', 'C', 'D']
+    >>> sum(chances[-1] for chances in projecao.values())
+    1.0
+    '''
+    indices = {nome: i for i, nome in enumerate(modelo.nomes)}
+    fase = mata_mata.fase_atual()
+    equipes = [equipe for confronto in fase for equipe in confronto.equipes()]
+    vagas = np.array([indices[equipe.nome] for equipe in equipes])
+    cabecas = np.array([mata_mata.cabecas[equipe.nome] for equipe in equipes])
+    fixos = placares_fixos(fase)
+    gerador = np.random.default_rng(semente)
+    contagens = np.zeros((len(modelo.nomes), len(vagas).bit_length()), dtype=np.int64)
+    for inicio in range(0, simulacoes, BLOCO_SIMULACOES):
+        bloco = min(BLOCO_SIMULACOES, simulacoes - inicio)
+        vivas = simula_chave(modelo, np.tile(vagas, (bloco, 1)), mata_mata.ida_e_volta, mata_mata.final_unica,
+                             mata_mata.gols_fora, gerador, fixos, np.tile(cabecas, (bloco, 1)))
+        contagens += contagem_fases(vivas, len(modelo.nomes))
+    return {modelo.nomes[i]: (contagens[i] / simulacoes).tolist() for i in vagas}
+
+
+def projeta_copa(copa: CopaComGrupos, modelo: ModeloPartida, simulacoes: int,
+                 semente: int | None = None) -> dict[str, list[float]]:
+    '''
+    Simula *simulacoes* vezes o restante de *copa* com *modelo*, que deve conhecer todas
+    as equipes, e devolve, para cada equipe, a probabilidade de chegar a cada fase do
+    mata-mata e, por último, a de ser campeã. Se o mata-mata já tiver começado, é o mesmo
+    que *projeta_mata_mata*.
+
+    Os jogos restantes da fase de grupos são sorteados para todas as simulações de um
+    bloco de uma vez e aplicados a uma TabelaVetorizada por grupo; os classificados de
+    cada simulação seguem para a chave pela ordem de *ordem_sementes*.
+
+    Exemplos:
+    >>> from modelos_partida import ModeloPoisson
+    >>> nomes = [f'E{i}' for i in range(8)]
+    >>> copa = CopaComGrupos(RegistroEquipes(nomes), [nomes[:4], nomes[4:]])
+    >>> ataque = np.array([3.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 0.3])
+    >>> projecao = projeta_copa(copa, ModeloPoisson(nomes, 1.3, 1.15, ataque, np.ones(8)), 20000, semente=2)
+    >>> [round(chance, 1) for chance in projecao['E0']], round(sum(p[0] for p in projecao.values()), 6)
+    ([1.0, 0.9, 0.9], 4.0)
+    '''
+    if copa.mata_mata is not None:
+        return projeta_mata_mata(copa.mata_mata, modelo, simulacoes, semente)
+    indices = {nome: i for i, nome in enumerate(modelo.nomes)}
+    restantes = [jogo for rodada in copa.rodadas for jogo in rodada
+                 if jogo.gols_mandante is None or jogo.gols_visitante is None]
+    por_grupo = [[jogo for jogo in restantes if copa.grupo_da_equipe[jogo.mandante.nome] == g]
+                 for g in range(len(copa.grupos))]
+    no_modelo = [np.array([indices[equipe.nome] for equipe in grupo]) for grupo in copa.grupos]
+    sementes = ordem_sementes(len(copa.grupos), copa.classificados)
+    vagas_chave = ordem_chave(len(sementes))
+    gerador = np.random.default_rng(semente)
+    contagens = np.zeros((len(modelo.nomes), len(sementes).bit_length()), dtype=np.int64)
+    for inicio in range(0, simulacoes, BLOCO_SIMULACOES):
+        bloco = min(BLOCO_SIMULACOES, simulacoes - inicio)
+        ordens = []
+        for grupo, jogos, modelo_grupo in zip(copa.grupos, por_grupo, no_modelo):
+            tabela = cria_tabela(grupo, bloco)
+            if jogos:
+                mandantes, visitantes = indices_jogos(jogos, tabela.nomes)
+                aplica_jogos(tabela, mandantes, visitantes,
+                             *modelo.sorteia(modelo_grupo[mandantes], modelo_grupo[visitantes], bloco, gerador))
+            ordens.append(modelo_grupo[classificacao(tabela)])
+        vagas = np.stack([ordens[grupo][:, colocacao] for grupo, colocacao in sementes], axis=1)[:, vagas_chave]
+        vivas = simula_chave(modelo, vagas, copa.ida_e_volta, copa.final_unica, copa.gols_fora, gerador)
+        contagens += contagem_fases(vivas, len(modelo.nomes))
+    return {equipe.nome: (contagens[indices[equipe.nome]] / simulacoes).tolist()
+            for grupo in copa.grupos for equipe in grupo}
@@ -0,0 +1,387 @@
+# Modelos de Partida - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+#
+# Requer NumPy.
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from elo_equipes import VANTAGEM_ELO, colunas_rodadas, elo_historico
+from projecao_campeonato import JOGOS_PRIORI, MAXIMO_GOLS, MEDIA_GOLS_PADRAO, VANTAGEM_MANDANTE
+from simulador_campeonato_brasileiro import Equipe, Jogo
+from tabela_vetorizada import indices_jogos
+
+ITERACOES_AJUSTE = 25
+
+# Valores candidatos dos parâmetros ajustados por busca em grade: a correlação *rho*
+# do modelo de Dixon-Coles e a escala que converte diferença de Elo em gols.
+GRADE_RHO = np.linspace(-0.25, 0.25, 101)
+GRADE_ESCALA = np.linspace(0.0, 2.0, 201)
+
+
+@dataclass
+class PlacaresRegistrados:
+    '''
+    Guarda, em colunas NumPy, os jogos de um campeonato que já têm placar registrado,
+    na ordem das rodadas. *mandantes* e *visitantes* são índices em *nomes*.
+    '''
+    nomes: list[str]
+    mandantes: np.ndarray
+    visitantes: np.ndarray
+    gols_mandante: np.ndarray
+    gols_visitante: np.ndarray
+
+
+@dataclass
+class ModeloPoisson:
+    '''
+    Modelo de gols independentes com distribuição de Poisson. A média de gols do mandante
+    é *media* * *ataque[m]* * *defesa[v]* * *vantagem*, e a do visitante é
+    *media* * *ataque[v]* * *defesa[m]* / *vantagem*.
+    '''
+    nomes: list[str]
+    media: float
+    vantagem: float
+    ataque: np.ndarray
+    defesa: np.ndarray
+
+    def medias(self, mandantes: np.ndarray, visitantes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Devolve as médias de gols do mandante e do visitante de cada jogo.
+        '''
+        media_mandante = self.media * self.ataque[mandantes] * self.defesa[visitantes] * self.vantagem
+        media_visitante = self.media * self.ataque[visitantes] * self.defesa[mandantes] / self.vantagem
+        return media_mandante, media_visitante
+
+    def sorteia(self, mandantes: np.ndarray, visitantes: np.ndarray, temporadas: int,
+                gerador: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Sorteia os placares dos jogos de *mandantes* contra *visitantes* em *temporadas*
+        temporadas. Devolve os gols do mandante e do visitante, de formato (temporadas, jogos).
+        '''
+        return sorteia_poisson(*self.medias(mandantes, visitantes), temporadas, gerador)
+
+
+@dataclass
+class ModeloDixonColes(ModeloPoisson):
+    '''
+    Modelo de Dixon-Coles: as médias de gols são as do modelo de Poisson, mas as
+    probabilidades dos placares 0 x 0, 1 x 0, 0 x 1 e 1 x 1 são corrigidas pelo fator
+    de dependência *rho*. Com *rho* negativo, empates com poucos gols ficam mais prováveis.
+    '''
+    rho: float
+
+    def sorteia(self, mandantes: np.ndarray, visitantes: np.ndarray, temporadas: int,
+                gerador: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Sorteia os placares pela inversa da distribuição acumulada de cada jogo: as
+        distribuições de todos os jogos são concatenadas, cada uma deslocada pelo índice do
+        jogo, e todos os sorteios são resolvidos em uma única chamada a np.searchsorted.
+        '''
+        tabelas = tabela_dixon_coles(*self.medias(mandantes, visitantes), self.rho)
+        jogos = len(mandantes)
+        placares = (MAXIMO_GOLS + 1) ** 2
+        acumuladas = np.cumsum(tabelas.reshape(jogos, placares), axis=1)
+        acumuladas[:, -1] = 1.0
+        deslocamentos = np.arange(jogos, dtype=np.float64)
+        concatenadas = (acumuladas + deslocamentos[:, None]).ravel()
+        sorteios = gerador.random((temporadas, jogos)) + deslocamentos
+        indices = np.searchsorted(concatenadas, sorteios, side='right') - np.arange(jogos) * placares
+        indices = np.minimum(indices, placares - 1)
+        return indices // (MAXIMO_GOLS + 1), indices % (MAXIMO_GOLS + 1)
+
+
+@dataclass
+class ModeloElo:
+    '''
+    Modelo guiado pelo Elo das equipes. A diferença de Elo do jogo, somada a *vantagem*
+    pontos a favor do mandante, é convertida em médias de gols:
+    *media* * 10 ** (±*escala* * diferença / 400), e os gols são sorteados como no
+    modelo de Poisson.
+    '''
+    nomes: list[str]
+    media: float
+    vantagem: float
+    escala: float
+    elo: np.ndarray
+
+    def medias(self, mandantes: np.ndarray, visitantes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Devolve as médias de gols do mandante e do visitante de cada jogo.
+        '''
+        fator = 10.0 ** (self.escala * (self.elo[mandantes] + self.vantagem - self.elo[visitantes]) / 400)
+        return self.media * fator, self.media / fator
+
+    def sorteia(self, mandantes: np.ndarray, visitantes: np.ndarray, temporadas: int,
+                gerador: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+        '''
+        Sorteia os placares dos jogos de *mandantes* contra *visitantes* em *temporadas*
+        temporadas. Devolve os gols do mandante e do visitante, de formato (temporadas, jogos).
+        '''
+        return sorteia_poisson(*self.medias(mandantes, visitantes), temporadas, gerador)
+
+
+ModeloPartida = ModeloPoisson | ModeloDixonColes | ModeloElo
+
+
+def placares_registrados(equipes: list[Equipe], rodadas: list[list[Jogo]]) -> PlacaresRegistrados:
+    '''
+    Reúne os jogos de *rodadas* cujo placar já foi registrado, por exemplo por *resultado*.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['A', 'B', 'C', 'D'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> rodadas[0][0].gols_mandante, rodadas[0][0].gols_visitante = 2, 1
+    >>> registrados = placares_registrados(equipes, rodadas)
+    >>> registrados.mandantes, registrados.visitantes, registrados.gols_mandante
+    (array([0]), array([3]), array([2]))
+    '''
+    nomes = [equipe.nome for equipe in equipes]
+    jogos = [jogo for rodada in rodadas for jogo in rodada if jogo.gols_mandante is not None]
+    mandantes, visitantes = indices_jogos(jogos, nomes)
+    return PlacaresRegistrados(
+        nomes, mandantes, visitantes,
+        np.array([jogo.gols_mandante for jogo in jogos], dtype=np.int64),
+        np.array([jogo.gols_visitante for jogo in jogos], dtype=np.int64),
+    )
+
+
+def probabilidades_poisson(medias: np.ndarray) -> np.ndarray:
+    '''
+    Devolve, para cada elemento de *medias*, as probabilidades de 0 a MAXIMO_GOLS gols
+    em uma distribuição de Poisson, com formato (len(medias), MAXIMO_GOLS + 1).
+
+    Exemplos:
+    >>> np.round(probabilidades_poisson(np.array([1.0]))[0, :3], 4)
+    array([0.3679, 0.3679, 0.1839])
+    '''
+    razoes = medias[:, None] / np.arange(1, MAXIMO_GOLS + 1)
+    return np.exp(-medias)[:, None] * np.cumprod(np.hstack((np.ones((len(medias), 1)), razoes)), axis=1)
+
+
+def tabela_dixon_coles(media_mandante: np.ndarray, media_visitante: np.ndarray, rho: float) -> np.ndarray:
+    '''
+    Devolve a distribuição de placares de cada jogo no modelo de Dixon-Coles, com
+    formato (jogos, MAXIMO_GOLS + 1, MAXIMO_GOLS + 1). Cada distribuição é normalizada
+    para somar 1 entre os placares considerados.
+
+    Exemplos:
+    >>> tabela = tabela_dixon_coles(np.array([1.2]), np.array([1.0]), -0.1)
+    >>> round(float(tabela.sum()), 6)
+    1.0
+    >>> bool(tabela[0, 0, 0] > tabela_dixon_coles(np.array([1.2]), np.array([1.0]), 0.0)[0, 0, 0])
+    True
+    '''
+    tabelas = probabilidades_poisson(media_mandante)[:, :, None] * probabilidades_poisson(media_visitante)[:, None, :]
+    tabelas[:, 0, 0] *= np.maximum(1 - media_mandante * media_visitante * rho, 0.0)
+    tabelas[:, 0, 1] *= np.maximum(1 + media_mandante * rho, 0.0)
+    tabelas[:, 1, 0] *= np.maximum(1 + media_visitante * rho, 0.0)
+    tabelas[:, 1, 1] *= max(1 - rho, 0.0)
+    return tabelas / tabelas.sum(axis=(1, 2), keepdims=True)
+
+
+def sorteia_poisson(media_mandante: np.ndarray, media_visitante: np.ndarray, temporadas: int,
+                    gerador: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Sorteia gols independentes com distribuição de Poisson para cada jogo em *temporadas*
+    temporadas, com uma única chamada ao gerador por equipe. Os gols são limitados a
+    MAXIMO_GOLS, como nas demais projeções.
+
+    Exemplos:
+    >>> gols_m, gols_v = sorteia_poisson(np.array([1.5, 0.5]), np.array([1.0, 2.0]), 3, np.random.default_rng(0))
+    >>> gols_m.shape, gols_m.dtype
+    ((3, 2), dtype('int64'))
+    '''
+    forma = (temporadas, len(media_mandante))
+    gols_mandante = np.minimum(gerador.poisson(media_mandante, forma), MAXIMO_GOLS)
+    gols_visitante = np.minimum(gerador.poisson(media_visitante, forma), MAXIMO_GOLS)
+    return gols_mandante.astype(np.int64, copy=False), gols_visitante.astype(np.int64, copy=False)
+
+
+def media_e_vantagem(registrados: PlacaresRegistrados) -> tuple[float, float]:
+    '''
+    Estima a média de gols por equipe em cada jogo e a vantagem do mandante, como a
+    raiz da razão entre os gols dos mandantes e os dos visitantes. Sem jogos registrados,
+    ou sem gols de um dos lados, usa MEDIA_GOLS_PADRAO e VANTAGEM_MANDANTE.
+
+    Exemplos:
+    >>> registrados = PlacaresRegistrados(['A', 'B'], np.array([0, 1]), np.array([1, 0]),
+    ...                                   np.array([3, 1]), np.array([1, 0]))
+    >>> media_e_vantagem(registrados)
+    (1.25, 2.0)
+    '''
+    jogos = len(registrados.mandantes)
+    gols_mandantes = int(registrados.gols_mandante.sum())
+    gols_visitantes = int(registrados.gols_visitante.sum())
+    if gols_mandantes + gols_visitantes == 0:
+        return MEDIA_GOLS_PADRAO, VANTAGEM_MANDANTE
+    media = (gols_mandantes + gols_visitantes) / (2 * jogos)
+    if gols_mandantes == 0 or gols_visitantes == 0:
+        return media, VANTAGEM_MANDANTE
+    return media, math.sqrt(gols_mandantes / gols_visitantes)
+
+
+def ajusta_poisson(equipes: list[Equipe], rodadas: list[list[Jogo]]) -> ModeloPoisson:
+    '''
+    Ajusta o modelo de Poisson aos placares já registrados em *rodadas*. As forças de
+    ataque e de defesa são estimadas por máxima verossimilhança, em ITERACOES_AJUSTE
+    iterações de ponto fixo que levam em conta a força dos adversários enfrentados.
+
+    Como em *forcas_equipes*, cada equipe começa com JOGOS_PRIORI jogos fictícios contra
+    um adversário médio, o que mantém as forças em 1 sem jogos registrados.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['A', 'B', 'C', 'D'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> modelo = ajusta_poisson(equipes, rodadas)
+    >>> modelo.media, modelo.ataque
+    (1.3, array([1., 1., 1., 1.]))
+    >>> for jogo in rodadas[0]:
+    ...     jogo.gols_mandante, jogo.gols_visitante = 4, 0
+    >>> modelo = ajusta_poisson(equipes, rodadas)
+    >>> bool(modelo.ataque[0] > 1 > modelo.ataque[3])
+    True
+    '''
+    registrados = placares_registrados(equipes, rodadas)
+    media, vantagem = media_e_vantagem(registrados)
+    return ModeloPoisson(registrados.nomes, media, vantagem, *forcas_maxima_verossimilhanca(registrados, media, vantagem))
+
+
+def forcas_maxima_verossimilhanca(registrados: PlacaresRegistrados, media: float,
+                                  vantagem: float) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Devolve as forças de ataque e de defesa que maximizam a verossimilhança dos placares
+    de *registrados* no modelo de Poisson, com a regularização de JOGOS_PRIORI jogos.
+    '''
+    n = len(registrados.nomes)
+    mandantes, visitantes = registrados.mandantes, registrados.visitantes
+    equipes = np.concatenate((mandantes, visitantes))
+    adversarios = np.concatenate((visitantes, mandantes))
+    # Fatores da média de gols marcados e da média de gols sofridos de cada equipe em cada jogo.
+    fatores_marcados = np.concatenate((np.full(len(mandantes), media * vantagem),
+                                       np.full(len(visitantes), media / vantagem)))
+    fatores_sofridos = np.concatenate((np.full(len(mandantes), media / vantagem),
+                                       np.full(len(visitantes), media * vantagem)))
+    marcados = np.bincount(equipes, np.concatenate((registrados.gols_mandante, registrados.gols_visitante)), n)
+    sofridos = np.bincount(equipes, np.concatenate((registrados.gols_visitante, registrados.gols_mandante)), n)
+
+    ataque = np.ones(n)
+    defesa = np.ones(n)
+    for _ in range(ITERACOES_AJUSTE):
+        ataque = (marcados + media * JOGOS_PRIORI) / (np.bincount(equipes, fatores_marcados * defesa[adversarios], n)
+                                                      + media * JOGOS_PRIORI)
+        defesa = (sofridos + media * JOGOS_PRIORI) / (np.bincount(equipes, fatores_sofridos * ataque[adversarios], n)
+                                                      + media * JOGOS_PRIORI)
+    return ataque, defesa
+
+
+def ajusta_dixon_coles(equipes: list[Equipe], rodadas: list[list[Jogo]]) -> ModeloDixonColes:
+    '''
+    Ajusta o modelo de Dixon-Coles aos placares já registrados em *rodadas*. As forças
+    são as do modelo de Poisson e *rho* é escolhido em GRADE_RHO pela verossimilhança
+    dos placares com poucos gols, os únicos afetados pela correção.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['A', 'B', 'C', 'D'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> for rodada in rodadas:
+    ...     for jogo in rodada:
+    ...         jogo.gols_mandante, jogo.gols_visitante = 0, 0
+    >>> bool(ajusta_dixon_coles(equipes, rodadas).rho < 0)
+    True
+    '''
+    poisson = ajusta_poisson(equipes, rodadas)
+    registrados = placares_registrados(equipes, rodadas)
+    media_m, media_v = poisson.medias(registrados.mandantes, registrados.visitantes)
+    gols_m, gols_v = registrados.gols_mandante, registrados.gols_visitante
+
+    grade = GRADE_RHO[:, None]
+    correcoes = np.ones((len(GRADE_RHO), len(gols_m)))
+    correcoes = np.where((gols_m == 0) & (gols_v == 0), 1 - media_m * media_v * grade, correcoes)
+    correcoes = np.where((gols_m == 0) & (gols_v == 1), 1 + media_m * grade, correcoes)
+    correcoes = np.where((gols_m == 1) & (gols_v == 0), 1 + media_v * grade, correcoes)
+    correcoes = np.where((gols_m == 1) & (gols_v == 1), 1 - grade, correcoes)
+    with np.errstate(divide='ignore'):
+        verossimilhancas = np.log(np.maximum(correcoes, 0.0)).sum(axis=1)
+    melhor = np.flatnonzero(verossimilhancas == verossimilhancas.max())
+    rho = float(GRADE_RHO[melhor[np.argmin(np.abs(GRADE_RHO[melhor]))]])
+    return ModeloDixonColes(poisson.nomes, poisson.media, poisson.vantagem, poisson.ataque, poisson.defesa, rho)
+
+
+def ajusta_elo(equipes: list[Equipe], rodadas: list[list[Jogo]], rodada: int | None = None) -> ModeloElo:
+    '''
+    Ajusta o modelo de Elo aos placares já registrados em *rodadas*. O Elo de cada equipe
+    é o de *elo_historico*, ao final da *rodada*º ou, por padrão, da última rodada. A
+    escala que converte diferença de Elo em gols é escolhida em GRADE_ESCALA pela
+    verossimilhança dos placares até essa rodada, usando o Elo de cada equipe antes de
+    cada jogo.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['A', 'B', 'C', 'D'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> for rodada in rodadas[:3]:
+    ...     for jogo in rodada:
+    ...         jogo.gols_mandante, jogo.gols_visitante = (3, 0) if jogo.mandante.nome < jogo.visitante.nome else (0, 3)
+    >>> modelo = ajusta_elo(equipes, rodadas)
+    >>> [int(elo) for elo in modelo.elo]
+    [1527, 1507, 1488, 1475]
+    >>> bool(modelo.escala > 0)
+    True
+    >>> [int(elo) for elo in ajusta_elo(equipes, rodadas, 1).elo]
+    [1508, 1508, 1491, 1491]
+    '''
+    if rodada is None:
+        rodada = len(rodadas)
+    mandantes, visitantes, gols_mandante, gols_visitante = (coluna[0, :rodada] for coluna in
+                                                            colunas_rodadas(equipes, rodadas))
+    historico = elo_historico(mandantes, visitantes, gols_mandante[None], gols_visitante[None], len(equipes))[0]
+    media, _ = media_e_vantagem(placares_registrados(equipes, rodadas[:rodada]))
+
+    jogados = gols_mandante >= 0
+    antes = np.broadcast_to(np.arange(rodada)[:, None], jogados.shape)[jogados]
+    diferencas = (historico[antes, mandantes[jogados]] + VANTAGEM_ELO - historico[antes, visitantes[jogados]])
+    log_fatores = GRADE_ESCALA[:, None] * diferencas / 400 * math.log(10)
+    verossimilhancas = (gols_mandante[jogados] * log_fatores - media * np.exp(log_fatores)
+                        - gols_visitante[jogados] * log_fatores - media * np.exp(-log_fatores)).sum(axis=1)
+    escala = float(GRADE_ESCALA[np.argmax(verossimilhancas)])
+    return ModeloElo([equipe.nome for equipe in equipes], media, VANTAGEM_ELO, escala, historico[-1])
+
+
+MODELOS = {
+    'poisson': ajusta_poisson,
+    'dixon_coles': ajusta_dixon_coles,
+    'elo': ajusta_elo,
+}
+
+
+def sorteia_jogos(modelo: ModeloPartida, jogos: list[Jogo], temporadas: int,
+                  semente: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Sorteia, com *modelo*, os placares de *jogos* em *temporadas* temporadas. Devolve
+    os gols do mandante e do visitante, de formato (temporadas, jogos), prontos para
+    *aplica_jogos*. A mesma *semente* produz sempre os mesmos placares.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['A', 'B', 'C', 'D'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> jogos = [jogo for rodada in rodadas for jogo in rodada]
+    >>> for nome, ajusta in MODELOS.items():
+    ...     gols_m, gols_v = sorteia_jogos(ajusta(equipes, rodadas), jogos, 1000, semente=7)
+    ...     print(nome, gols_m.shape, bool(gols_m.mean() > gols_v.mean()))
+    poisson (1000, 12) True
+    dixon_coles (1000, 12) True
+    elo (1000, 12) True
+    >>> a = sorteia_jogos(ajusta_poisson(equipes, rodadas), jogos, 5, semente=1)
+    >>> b = sorteia_jogos(ajusta_poisson(equipes, rodadas), jogos, 5, semente=1)
+    >>> all(np.array_equal(x, y) for x, y in zip(a, b))
+    True
+    '''
+    mandantes, visitantes = indices_jogos(jogos, modelo.nomes)
+    return modelo.sorteia(mandantes, visitantes, temporadas, np.random.default_rng(semente))
@@ -0,0 +1,265 @@
+# Persistência - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterable
+
+from simulador_campeonato_brasileiro import Jogo, RegistroEquipes, recalcula_estatisticas
+
+# Formato de um snapshot, com todos os inteiros em little-endian:
+#   cabeçalho: MAGICO, VERSAO, número de equipes e número de rodadas;
+#   número de jogos de cada rodada (uint16);
+#   tamanho e conteúdo dos nomes das equipes em UTF-8, separados por '\0';
+#   identificadores do mandante e do visitante de cada jogo (uint16);
+#   gols do mandante e do visitante de cada jogo (uint8), com SEM_PLACAR para jogos sem placar;
+#   por isso, só placares de 0 a MAXIMO_GOLS gols podem ser gravados.
+# As estatísticas das equipes não são gravadas: elas são recalculadas dos placares na carga.
+MAGICO = b'CBSN'
+VERSAO = 1
+CABECALHO = struct.Struct('<4sBHH')
+TAMANHO_NOMES = struct.Struct('<I')
+SEM_PLACAR = 255
+MAXIMO_GOLS = SEM_PLACAR - 1
+
+# Um arquivo de snapshots é a concatenação dos snapshots, seguida pelo deslocamento de
+# cada um (uint64) e por um rodapé com a quantidade de snapshots e MAGICO_ARQUIVO.
+MAGICO_ARQUIVO = b'CBAR'
+RODAPE = struct.Struct('<Q4s')
+
+
+def little_endian(valores: array) -> array:
+    '''
+    Converte *valores* da ordem de bytes da máquina para little-endian, ou vice-versa.
+    Nas máquinas little-endian, que são quase todas, não faz nada.
+    '''
+    if sys.byteorder == 'big':
+        valores.byteswap()
+    return valores
+
+
+def placar_gravavel(gols_mandante: int | None, gols_visitante: int | None) -> bool:
+    '''
+    Devolve se o placar *gols_mandante* X *gols_visitante* pode ser gravado em um
+    snapshot: sem placar, com (None, None), ou com gols de 0 a MAXIMO_GOLS.
+
+    Exemplos:
+    >>> placar_gravavel(None, None), placar_gravavel(3, 0), placar_gravavel(255, 0), placar_gravavel(-1, 0)
+    (True, True, False, False)
+    '''
+    if gols_mandante is None or gols_visitante is None:
+        return gols_mandante is None and gols_visitante is None
+    return 0 <= gols_mandante <= MAXIMO_GOLS and 0 <= gols_visitante <= MAXIMO_GOLS
+
+
+def serializa(registro: RegistroEquipes, rodadas: list[list[Jogo]]) -> bytes:
+    '''
+    Devolve o snapshot binário do campeonato formado pelas equipes de *registro* e por
+    *rodadas*, com os placares já registrados. Levanta ValueError se algum jogo tiver
+    apenas um dos placares ou gols fora do intervalo de 0 a MAXIMO_GOLS.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import gera_rodadas
+    >>> registro = RegistroEquipes(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(registro.inicia_equipes())
+    >>> len(serializa(registro, rodadas))
+    136
+    >>> rodadas[0][0].gols_mandante, rodadas[0][0].gols_visitante = 255, 0
+    >>> serializa(registro, rodadas)
+    Traceback (most recent call last):
+    ...
+    ValueError: Placar inválido na 1ª rodada: Corinthians 255 X 0 São Paulo!
+    '''
+    identificadores = {id(equipe): i for i, equipe in enumerate(registro.equipes)}
+    tamanhos = array('H', [len(rodada) for rodada in rodadas])
+    equipes = array('H')
+    placares = array('B')
+    for numero, rodada in enumerate(rodadas, 1):
+        for jogo in rodada:
+            if not placar_gravavel(jogo.gols_mandante, jogo.gols_visitante):
+                raise ValueError(f'Placar inválido na {numero}ª rodada: {jogo.mandante.nome} {jogo.gols_mandante} '
+                                 f'X {jogo.gols_visitante} {jogo.visitante.nome}!')
+            equipes.append(identificadores[id(jogo.mandante)])
+            equipes.append(identificadores[id(jogo.visitante)])
+            placares.append(SEM_PLACAR if jogo.gols_mandante is None else jogo.gols_mandante)
+            placares.append(SEM_PLACAR if jogo.gols_visitante is None else jogo.gols_visitante)
+    nomes = '\0'.join(registro.nomes).encode()
+
+    return b''.join((
+        CABECALHO.pack(MAGICO, VERSAO, len(registro), len(rodadas)),
+        little_endian(tamanhos).tobytes(),
+        TAMANHO_NOMES.pack(len(nomes)),
+        nomes,
+        little_endian(equipes).tobytes(),
+        placares.tobytes(),
+    ))
+
+
+def desserializa(dados: bytes | memoryview) -> tuple[RegistroEquipes, list[list[Jogo]]]:
+    '''
+    Reconstrói o registro de equipes e as rodadas do snapshot *dados*, e recalcula as
+    estatísticas das equipes a partir dos placares. *dados* pode ser uma fatia de um
+    arquivo mapeado em memória, sem cópia prévia. Levanta ValueError se o snapshot
+    for inválido.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import gera_rodadas
+    >>> registro = RegistroEquipes(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(registro.inicia_equipes())
+    >>> rodadas[0][0].gols_mandante, rodadas[0][0].gols_visitante = 3, 1
+    >>> copia, rodadas_copia = desserializa(serializa(registro, rodadas))
+    >>> list(copia), copia.equipe('Corinthians').pontos
+    (['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'], 3)
+    >>> rodadas_copia[0][0].visitante is copia.equipe('São Paulo')
+    True
+    '''
+    dados = memoryview(dados)
+    try:
+        magico, versao, numero_equipes, numero_rodadas = CABECALHO.unpack_from(dados, 0)
+        if magico != MAGICO or versao != VERSAO:
+            raise ValueError('Snapshot inválido!')
+        posicao = CABECALHO.size
+
+        tamanhos = array('H')
+        tamanhos.frombytes(dados[posicao:posicao + 2 * numero_rodadas])
+        little_endian(tamanhos)
+        posicao += 2 * numero_rodadas
+
+        (tamanho_nomes,) = TAMANHO_NOMES.unpack_from(dados, posicao)
+        posicao += TAMANHO_NOMES.size
+        nomes = bytes(dados[posicao:posicao + tamanho_nomes]).decode().split('\0') if numero_equipes > 0 else []
+        posicao += tamanho_nomes
+
+        total_jogos = sum(tamanhos)
+        equipes = array('H')
+        equipes.frombytes(dados[posicao:posicao + 4 * total_jogos])
+        little_endian(equipes)
+        posicao += 4 * total_jogos
+        placares = dados[posicao:posicao + 2 * total_jogos]
+    except struct.error:
+        raise ValueError('Snapshot inválido!')
+    if len(nomes) != numero_equipes or len(placares) != 2 * total_jogos or any(i >= numero_equipes for i in equipes):
+        raise ValueError('Snapshot inválido!')
+
+    registro = RegistroEquipes(nomes)
+    times = registro.inicia_equipes(numero_rodadas)
+    rodadas: list[list[Jogo]] = []
+    k = 0
+    for tamanho in tamanhos:
+        rodada = []
+        for _ in range(tamanho):
+            gols_mandante, gols_visitante = placares[k], placares[k + 1]
+            if (gols_mandante == SEM_PLACAR) != (gols_visitante == SEM_PLACAR):
+                raise ValueError('Snapshot inválido!')
+            rodada.append(Jogo(times[equipes[k]], None if gols_mandante == SEM_PLACAR else gols_mandante,
+                               times[equipes[k + 1]], None if gols_visitante == SEM_PLACAR else gols_visitante))
+            k += 2
+        rodadas.append(rodada)
+
+    recalcula_estatisticas(times, rodadas)
+    return registro, rodadas
+
+
+def salva(caminho: str, registro: RegistroEquipes, rodadas: list[list[Jogo]]):
+    '''
+    Grava em *caminho* o snapshot do campeonato formado por *registro* e *rodadas*.
+    Levanta ValueError, sem criar o arquivo, se algum placar não puder ser gravado.
+    '''
+    dados = serializa(registro, rodadas)
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(dados)
+
+
+def carrega(caminho: str) -> tuple[RegistroEquipes, list[list[Jogo]]]:
+    '''
+    Carrega o campeonato gravado em *caminho* por *salva*.
+    '''
+    with open(caminho, 'rb') as arquivo:
+        return desserializa(arquivo.read())
+
+
+def salva_arquivo(caminho: str, snapshots: Iterable[bytes]):
+    '''
+    Grava em *caminho* um arquivo com todos os *snapshots*, gerados por *serializa*,
+    seguidos do índice de deslocamentos usado por ArquivoSnapshots.
+    '''
+    deslocamentos = array('Q')
+    with open(caminho, 'wb') as arquivo:
+        for snapshot in snapshots:
+            deslocamentos.append(arquivo.tell())
+            arquivo.write(snapshot)
+        deslocamentos.append(arquivo.tell())
+        arquivo.write(little_endian(deslocamentos).tobytes())
+        arquivo.write(RODAPE.pack(len(deslocamentos) - 1, MAGICO_ARQUIVO))
+
+
+class ArquivoSnapshots:
+    '''
+    Dá acesso aleatório aos snapshots de um arquivo gravado por *salva_arquivo*, mapeando-o
+    em memória. Abrir o arquivo lê apenas o rodapé e o índice, e carregar um snapshot lê
+    apenas os bytes dele, de forma que arquivos com milhares de temporadas não precisam
+    ser lidos por inteiro.
+
+    Exemplos:
+    >>> import os, tempfile
+    >>> from simulador_campeonato_brasileiro import gera_rodadas
+    >>> registro = RegistroEquipes(['A', 'B', 'C', 'D'])
+    >>> rodadas = gera_rodadas(registro.inicia_equipes())
+    >>> caminho = os.path.join(tempfile.mkdtemp(), 'temporadas.bin')
+    >>> salva_arquivo(caminho, [serializa(registro, rodadas)] * 3)
+    >>> with ArquivoSnapshots(caminho) as arquivo:
+    ...     len(arquivo), list(arquivo.carrega(2)[0])
+    (3, ['A', 'B', 'C', 'D'])
+    >>> open(caminho, 'wb').close()
+    >>> ArquivoSnapshots(caminho)
+    Traceback (most recent call last):
+    ...
+    ValueError: Arquivo de snapshots inválido!
+    '''
+    mapa: mmap.mmap
+    deslocamentos: array
+
+    def __init__(self, caminho: str) -> None:
+        '''
+        Abre e mapeia em memória o arquivo *caminho*. Levanta ValueError se ele não for
+        um arquivo de snapshots.
+        '''
+        if os.path.getsize(caminho) < RODAPE.size:
+            raise ValueError('Arquivo de snapshots inválido!')
+        with open(caminho, 'rb') as arquivo:
+            self.mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        quantidade, magico = RODAPE.unpack_from(self.mapa, len(self.mapa) - RODAPE.size)
+        if magico != MAGICO_ARQUIVO:
+            self.mapa.close()
+            raise ValueError('Arquivo de snapshots inválido!')
+        inicio = len(self.mapa) - RODAPE.size - 8 * (quantidade + 1)
+        self.deslocamentos = array('Q')
+        self.deslocamentos.frombytes(self.mapa[inicio:len(self.mapa) - RODAPE.size])
+        little_endian(self.deslocamentos)
+
+    def __len__(self) -> int:
+        return len(self.deslocamentos) - 1
+
+    def __enter__(self) -> 'ArquivoSnapshots':
+        return self
+
+    def __exit__(self, *erro) -> None:
+        self.fecha()
+
+    def carrega(self, i: int) -> tuple[RegistroEquipes, list[list[Jogo]]]:
+        '''
+        Carrega o *i*-ésimo snapshot do arquivo.
+        '''
+        if i < 0 or i >= len(self):
+            raise IndexError('Snapshot inexistente!')
+        with memoryview(self.mapa) as dados:
+            return desserializa(dados[self.deslocamentos[i]:self.deslocamentos[i + 1]])
+
+    def fecha(self):
+        '''
+        Libera o mapeamento do arquivo.
+        '''
+        self.mapa.close()
@@ -0,0 +1,380 @@
+# Projeção - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import accumulate, repeat
+
+from simulador_campeonato_brasileiro import Equipe, Jogo
+
+MAXIMO_GOLS = 10
+MEDIA_GOLS_PADRAO = 1.3
+JOGOS_PRIORI = 5
+VANTAGEM_MANDANTE = 1.15
+TAMANHO_BLOCO = 1000
+TAMANHO_LOTE = 5000
+
+# Cada equipe é representada na simulação por um único inteiro que concentra os critérios
+# de desempate do campeonato, do mais significativo para o menos significativo:
+# pontos, vitórias, saldo de gols e ordem alfabética. Assim, um jogo simulado custa apenas
+# duas somas e a classificação de uma temporada é uma única ordenação de inteiros.
+DESLOCAMENTO_PONTOS = 52
+DESLOCAMENTO_VITORIAS = 36
+DESLOCAMENTO_SALDO = 16
+COMPENSACAO_SALDO = 1 << 19
+
+ZONAS = {
+    'titulo': (1, 1),
+    'libertadores': (1, 6),
+    'sul_americana': (7, 12),
+    'rebaixamento': (17, 20),
+}
+
+
+@dataclass
+class JogoRestante:
+    '''
+    Representa uma partida ainda sem placar, já preparada para a simulação.
+
+    Atributos:
+        mandante (int): Índice do mandante na lista de equipes da projeção;
+        visitante (int): Índice do visitante na lista de equipes da projeção;
+        pesos (list[float]): Pesos acumulados de cada placar possível;
+        deltas_mandante (list[int]): Variação da chave do mandante para cada placar;
+        deltas_visitante (list[int]): Variação da chave do visitante para cada placar.
+    '''
+    mandante: int
+    visitante: int
+    pesos: list[float]
+    deltas_mandante: list[int]
+    deltas_visitante: list[int]
+
+
+@dataclass
+class EstadoProjecao:
+    '''
+    Representa o estado do campeonato no momento da projeção: a chave inicial de cada
+    equipe, calculada a partir dos resultados já registrados, e os jogos restantes.
+    '''
+    nomes: list[str]
+    chaves: list[int]
+    jogos: list[JogoRestante]
+
+
+@dataclass
+class Projecao:
+    '''
+    Resultado de uma projeção. *histograma[i][p]* é o número de temporadas simuladas
+    em que a equipe *nomes[i]* terminou na (p + 1)ª colocação.
+    '''
+    nomes: list[str]
+    histograma: list[list[int]]
+    temporadas: int
+
+
+def chave_equipe(pontos: int, vitorias: int, saldo_gols: int, ordem_nome: int) -> int:
+    '''
+    Devolve a chave de ordenação de uma equipe com *pontos*, *vitorias* e *saldo_gols*.
+    *ordem_nome* é maior para nomes que vêm antes na ordem alfabética. Chaves maiores
+    correspondem a colocações melhores.
+
+    Exemplos:
+    >>> chave_equipe(10, 3, 2, 0) > chave_equipe(10, 3, 1, 5)
+    True
+    >>> chave_equipe(10, 3, -4, 0) > chave_equipe(9, 9, 30, 5)
+    True
+    >>> chave_equipe(10, 3, 2, 1) > chave_equipe(10, 3, 2, 0)
+    True
+    '''
+    return ((pontos << DESLOCAMENTO_PONTOS) + (vitorias << DESLOCAMENTO_VITORIAS)
+            + ((saldo_gols + COMPENSACAO_SALDO) << DESLOCAMENTO_SALDO) + ordem_nome)
+
+
+def poisson(k: int, media: float) -> float:
+    '''
+    Devolve a probabilidade de *k* ocorrências em uma distribuição de Poisson de *media*.
+
+    Exemplos:
+    >>> round(poisson(0, 1.0), 4)
+    0.3679
+    >>> round(poisson(2, 1.5), 4)
+    0.251
+    '''
+    return math.exp(-media) * media ** k / math.factorial(k)
+
+
+def forcas_equipes(equipes: list[Equipe]) -> tuple[float, list[float], list[float]]:
+    '''
+    Estima a média de gols por equipe em cada jogo e as forças de ataque e de defesa
+    de *equipes*, a partir dos resultados já registrados.
+
+    Para que poucos jogos não produzam forças extremas, cada equipe começa com
+    JOGOS_PRIORI jogos fictícios na média da liga.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe
+    >>> media, ataque, defesa = forcas_equipes(converte_equipe(['A', 'B']))
+    >>> media, ataque, defesa
+    (1.3, [1.0, 1.0], [1.0, 1.0])
+    '''
+    total_jogos = sum(equipe.jogos for equipe in equipes)
+    total_gols = sum(equipe.gols_marcados for equipe in equipes)
+    if total_gols == 0:
+        media = MEDIA_GOLS_PADRAO
+    else:
+        media = total_gols / total_jogos
+
+    ataque: list[float] = []
+    defesa: list[float] = []
+    for equipe in equipes:
+        jogos = equipe.jogos + JOGOS_PRIORI
+        ataque.append((equipe.gols_marcados + media * JOGOS_PRIORI) / jogos / media)
+        defesa.append((equipe.gols_sofridos + media * JOGOS_PRIORI) / jogos / media)
+    return media, ataque, defesa
+
+
+def distribuicao_placares(media_mandante: float, media_visitante: float) -> list[float]:
+    '''
+    Devolve as probabilidades de todos os placares de 0 x 0 até MAXIMO_GOLS x MAXIMO_GOLS,
+    supondo gols independentes com distribuição de Poisson. O placar de índice
+    *i* é (i // (MAXIMO_GOLS + 1), i % (MAXIMO_GOLS + 1)).
+
+    Exemplos:
+    >>> probabilidades = distribuicao_placares(1.0, 1.0)
+    >>> len(probabilidades)
+    121
+    >>> round(sum(probabilidades), 6)
+    1.0
+    '''
+    mandante = [poisson(k, media_mandante) for k in range(MAXIMO_GOLS + 1)]
+    visitante = [poisson(k, media_visitante) for k in range(MAXIMO_GOLS + 1)]
+    return [pm * pv for pm in mandante for pv in visitante]
+
+
+def deltas_placares() -> tuple[list[int], list[int]]:
+    '''
+    Devolve, para cada placar possível (na mesma ordem de *distribuicao_placares*),
+    a variação da chave do mandante e a variação da chave do visitante.
+
+    Exemplos:
+    >>> deltas_mandante, deltas_visitante = deltas_placares()
+    >>> deltas_mandante[0] == deltas_visitante[0] == 1 << DESLOCAMENTO_PONTOS
+    True
+    >>> deltas_visitante[1] == chave_equipe(3, 1, 1, 0) - chave_equipe(0, 0, 0, 0)
+    True
+    '''
+    deltas_mandante: list[int] = []
+    deltas_visitante: list[int] = []
+    for gols_mandante in range(MAXIMO_GOLS + 1):
+        for gols_visitante in range(MAXIMO_GOLS + 1):
+            saldo = gols_mandante - gols_visitante
+            if saldo > 0:
+                pontos_m, vitorias_m, pontos_v, vitorias_v = 3, 1, 0, 0
+            elif saldo < 0:
+                pontos_m, vitorias_m, pontos_v, vitorias_v = 0, 0, 3, 1
+            else:
+                pontos_m, vitorias_m, pontos_v, vitorias_v = 1, 0, 1, 0
+            deltas_mandante.append((pontos_m << DESLOCAMENTO_PONTOS) + (vitorias_m << DESLOCAMENTO_VITORIAS)
+                                   + (saldo << DESLOCAMENTO_SALDO))
+            deltas_visitante.append((pontos_v << DESLOCAMENTO_PONTOS) + (vitorias_v << DESLOCAMENTO_VITORIAS)
+                                    - (saldo << DESLOCAMENTO_SALDO))
+    return deltas_mandante, deltas_visitante
+
+
+def prepara_projecao(equipes: list[Equipe], rodadas: list[list[Jogo]]) -> EstadoProjecao:
+    '''
+    Prepara a projeção do campeonato formado por *equipes* e *rodadas*, as rodadas
+    geradas por *gera_rodadas*. Os jogos com placar registrado entram na chave inicial
+    de cada equipe; os demais serão simulados.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> estado = prepara_projecao(equipes, rodadas)
+    >>> estado.nomes
+    ['Corinthians', 'Palmeiras', 'Santos', 'São Paulo']
+    >>> len(estado.jogos)
+    12
+    '''
+    nomes = [equipe.nome for equipe in equipes]
+    indices = {nome: i for i, nome in enumerate(nomes)}
+    ordem_nome = {nome: i for i, nome in enumerate(sorted(nomes, reverse=True))}
+    chaves = [chave_equipe(equipe.pontos, equipe.vitorias, equipe.saldo_gols, ordem_nome[equipe.nome])
+              for equipe in equipes]
+
+    media, ataque, defesa = forcas_equipes(equipes)
+    deltas_mandante, deltas_visitante = deltas_placares()
+    jogos: list[JogoRestante] = []
+    for rodada in rodadas:
+        for jogo in rodada:
+            if jogo.gols_mandante is None:
+                m = indices[jogo.mandante.nome]
+                v = indices[jogo.visitante.nome]
+                media_mandante = media * ataque[m] * defesa[v] * VANTAGEM_MANDANTE
+                media_visitante = media * ataque[v] * defesa[m] / VANTAGEM_MANDANTE
+                pesos = list(accumulate(distribuicao_placares(media_mandante, media_visitante)))
+                jogos.append(JogoRestante(m, v, pesos, deltas_mandante, deltas_visitante))
+    return EstadoProjecao(nomes, chaves, jogos)
+
+
+def simula_temporadas(estado: EstadoProjecao, temporadas: int, semente: int | str | None = None) -> Projecao:
+    '''
+    Simula *temporadas* vezes os jogos restantes de *estado* e devolve o histograma de
+    colocações finais de cada equipe. A mesma *semente* produz sempre a mesma projeção.
+
+    Os placares de cada jogo são sorteados em blocos de TAMANHO_BLOCO temporadas, e cada
+    jogo simulado apenas soma as variações pré-calculadas às chaves das duas equipes.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> estado = prepara_projecao(equipes, gera_rodadas(equipes))
+    >>> projecao = simula_temporadas(estado, 500, semente=1)
+    >>> [sum(linha) for linha in projecao.histograma]
+    [500, 500, 500, 500]
+    >>> projecao.histograma == simula_temporadas(estado, 500, semente=1).histograma
+    True
+    '''
+    n = len(estado.nomes)
+    gerador = random.Random(semente)
+    contagem = [0] * (n * n)
+    placares = range((MAXIMO_GOLS + 1) ** 2)
+    equipes = range(n)
+    restantes = temporadas
+    while restantes > 0:
+        bloco = min(restantes, TAMANHO_BLOCO)
+        sorteios = [gerador.choices(placares, cum_weights=jogo.pesos, k=bloco) for jogo in estado.jogos]
+        por_temporada = zip(*sorteios) if sorteios else [()] * bloco
+        for codigos in por_temporada:
+            chaves = estado.chaves[:]
+            for jogo, c in zip(estado.jogos, codigos):
+                chaves[jogo.mandante] += jogo.deltas_mandante[c]
+                chaves[jogo.visitante] += jogo.deltas_visitante[c]
+            posicao = 0
+            for equipe in sorted(equipes, key=chaves.__getitem__, reverse=True):
+                contagem[equipe * n + posicao] += 1
+                posicao += 1
+        restantes -= bloco
+
+    histograma = [contagem[i * n:(i + 1) * n] for i in range(n)]
+    return Projecao(estado.nomes, histograma, temporadas)
+
+
+def soma_projecoes(projecoes: list[Projecao]) -> Projecao:
+    '''
+    Junta *projecoes* do mesmo campeonato em uma só, somando os histogramas.
+
+    Exemplos:
+    >>> a = Projecao(['A', 'B'], [[3, 1], [1, 3]], 4)
+    >>> b = Projecao(['A', 'B'], [[0, 2], [2, 0]], 2)
+    >>> soma_projecoes([a, b])
+    Projecao(nomes=['A', 'B'], histograma=[[3, 3], [3, 3]], temporadas=6)
+    '''
+    nomes = projecoes[0].nomes
+    histograma = [[0] * len(nomes) for _ in nomes]
+    temporadas = 0
+    for projecao in projecoes:
+        for i, linha in enumerate(projecao.histograma):
+            for p, quantidade in enumerate(linha):
+                histograma[i][p] += quantidade
+        temporadas += projecao.temporadas
+    return Projecao(nomes, histograma, temporadas)
+
+
+def semente_lote(semente: int | str, lote: int) -> str:
+    '''
+    Devolve a semente do *lote*-ésimo lote de uma projeção com *semente*. Sementes do
+    tipo str são convertidas por random.Random com SHA-512, o que torna independentes
+    as sequências de lotes diferentes.
+
+    Exemplos:
+    >>> semente_lote(42, 0), semente_lote(42, 1)
+    ('42:0', '42:1')
+    '''
+    return f'{semente}:{lote}'
+
+
+def projeta_em_paralelo(estado: EstadoProjecao, temporadas: int, semente: int | str,
+                        trabalhadores: int | None = None, tamanho_lote: int = TAMANHO_LOTE) -> Projecao:
+    '''
+    Simula *temporadas* vezes os jogos restantes de *estado*, dividindo o trabalho entre
+    *trabalhadores* processos (por padrão, um por núcleo).
+
+    As temporadas são divididas em lotes de *tamanho_lote*, e cada lote tem sua própria
+    semente, derivada de *semente* e do número do lote. Como a divisão em lotes não
+    depende de quantos processos existem, o resultado é sempre o mesmo para a mesma
+    *semente* e o mesmo *tamanho_lote*, com qualquer número de *trabalhadores*.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> estado = prepara_projecao(equipes, gera_rodadas(equipes))
+    >>> um = projeta_em_paralelo(estado, 900, 7, trabalhadores=1, tamanho_lote=200)
+    >>> dois = projeta_em_paralelo(estado, 900, 7, trabalhadores=2, tamanho_lote=200)
+    >>> um == dois
+    True
+    >>> um.temporadas
+    900
+    '''
+    lotes = [tamanho_lote] * (temporadas // tamanho_lote)
+    if temporadas % tamanho_lote > 0:
+        lotes.append(temporadas % tamanho_lote)
+    sementes = [semente_lote(semente, i) for i in range(len(lotes))]
+
+    with ProcessPoolExecutor(max_workers=trabalhadores) as executor:
+        projecoes = list(executor.map(simula_temporadas, repeat(estado), lotes, sementes))
+    return soma_projecoes(projecoes)
+
+
+def probabilidade(projecao: Projecao, equipe: int, inicio: int, fim: int) -> float:
+    '''
+    Devolve a probabilidade de *equipe* terminar entre a *inicio*ª e a *fim*ª colocação
+    em *projecao*.
+
+    Exemplos:
+    >>> p = Projecao(['A', 'B'], [[3, 1], [1, 3]], 4)
+    >>> probabilidade(p, 0, 1, 1)
+    0.75
+    >>> probabilidade(p, 1, 1, 2)
+    1.0
+    '''
+    return sum(projecao.histograma[equipe][inicio - 1:fim]) / projecao.temporadas
+
+
+def resumo_projecao(projecao: Projecao) -> dict[str, dict[str, float]]:
+    '''
+    Devolve, para cada equipe de *projecao*, as probabilidades de título, de vaga na
+    Libertadores, de vaga na Copa Sul-Americana e de rebaixamento, conforme as zonas
+    descritas em *exibe_regras*. Em ligas com menos de 20 equipes, as zonas são
+    limitadas ao número de equipes e o rebaixamento continua sendo dos últimos 4.
+
+    Exemplos:
+    >>> p = Projecao(['A', 'B'], [[3, 1], [1, 3]], 4)
+    >>> resumo_projecao(p)['A']
+    {'titulo': 0.75, 'libertadores': 1.0, 'sul_americana': 0.0, 'rebaixamento': 1.0}
+    '''
+    n = len(projecao.nomes)
+    resumo: dict[str, dict[str, float]] = {}
+    for i, nome in enumerate(projecao.nomes):
+        resumo[nome] = {}
+        for zona, (inicio, fim) in ZONAS.items():
+            if zona == 'rebaixamento':
+                inicio, fim = n - (fim - inicio), n
+            resumo[nome][zona] = probabilidade(projecao, i, max(inicio, 1), min(fim, n))
+    return resumo
+
+
+def exibe_projecao(projecao: Projecao):
+    '''
+    Exibe as probabilidades de *projecao* para cada equipe, da maior para a menor chance de título.
+    '''
+    resumo = resumo_projecao(projecao)
+    print()
+    print(f'{'EQUIPE':<20} {'TÍTULO':^9} {'LIBERTA.':^9} {'SUL-AM.':^9} {'REBAIX.':^9}')
+    for nome in sorted(resumo, key=lambda nome: (-resumo[nome]['titulo'], -resumo[nome]['libertadores'], nome)):
+        zonas = resumo[nome]
+        print(f'{nome:<20} {zonas['titulo']:^9.1%} {zonas['libertadores']:^9.1%} '
+              f'{zonas['sul_americana']:^9.1%} {zonas['rebaixamento']:^9.1%}')
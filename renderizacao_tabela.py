@@ -0,0 +1,108 @@
+# Renderização da Tabela - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+from simulador_campeonato_brasileiro import Classificacao, Equipe, Jogo, formata_linha
+
+
+class RenderizadorTabela:
+    '''
+    Mantém as linhas já formatadas da tabela de uma Classificacao e, a cada renderização,
+    formata novamente apenas as linhas que podem ter mudado, devolvendo só as diferenças.
+
+    Como ouvinte de LogResultados, depois da Classificacao, cada troca de placar marca
+    as duas equipes do jogo. Na renderização, só mudam as linhas das equipes marcadas e
+    as das colocações entre a posição anterior e a atual de cada uma delas, que são as
+    únicas deslocadas; as demais linhas não são nem consultadas. O custo depende do
+    número de equipes alteradas, e não do tamanho da liga.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import LogResultados, converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> classificacao = Classificacao(equipes)
+    >>> renderizador = RenderizadorTabela(classificacao)
+    >>> log = LogResultados()
+    >>> log.ouvintes += [classificacao.atualiza_jogo, renderizador.atualiza_jogo]
+    >>> log.registra(rodadas[0][1], 1, 0, 2)      # Palmeiras 0 X 2 Santos
+    >>> for posicao, linha in renderizador.renderiza():
+    ...     print(posicao, linha[:28])
+    1  1º Santos                 3
+    2  2º Corinthians            0
+    3  3º São Paulo              0
+    4  4º Palmeiras              0
+    >>> renderizador.renderiza()
+    []
+    >>> log.registra(rodadas[0][0], 1, 1, 1)      # Corinthians 1 X 1 São Paulo
+    >>> [posicao for posicao, _ in renderizador.renderiza()]
+    [2, 3]
+    '''
+    classificacao: Classificacao
+    linhas: list[str]
+    posicoes: dict[str, int]
+    alteradas: set[str]
+
+    def __init__(self, classificacao: Classificacao) -> None:
+        '''
+        Formata uma única vez todas as linhas da tabela atual de *classificacao*.
+        '''
+        self.classificacao = classificacao
+        self.linhas = []
+        self.posicoes = {}
+        for n, equipe in enumerate(classificacao.ordem(), 1):
+            self.linhas.append(formata_linha(n, equipe))
+            self.posicoes[equipe.nome] = n
+        self.alteradas = set()
+
+    def atualiza_jogo(self, jogo: Jogo, rodada: int, anterior: tuple[int | None, int | None],
+                      novo: tuple[int | None, int | None]):
+        '''
+        Marca as duas equipes de *jogo* para a próxima renderização.
+        '''
+        self.alteradas.add(jogo.mandante.nome)
+        self.alteradas.add(jogo.visitante.nome)
+
+    def marca(self, equipe: Equipe):
+        '''
+        Marca *equipe* para a próxima renderização, para alterações feitas sem o log.
+        '''
+        self.alteradas.add(equipe.nome)
+
+    def renderiza(self) -> list[tuple[int, str]]:
+        '''
+        Atualiza as linhas que mudaram desde a última renderização e as devolve como
+        (colocação, linha), em ordem de colocação.
+        '''
+        colocacoes: set[int] = set()
+        for nome in self.alteradas:
+            anterior, atual = self.posicoes[nome], self.classificacao.posicao(nome)
+            colocacoes.update(range(min(anterior, atual), max(anterior, atual) + 1))
+        self.alteradas = set()
+
+        diferencas: list[tuple[int, str]] = []
+        for n in sorted(colocacoes):
+            equipe = self.classificacao.equipes[self.classificacao.chaves[n - 1][3]]
+            linha = formata_linha(n, equipe)
+            self.posicoes[equipe.nome] = n
+            if linha != self.linhas[n - 1]:
+                self.linhas[n - 1] = linha
+                diferencas.append((n, linha))
+        return diferencas
+
+    def tabela(self) -> list[str]:
+        '''
+        Devolve todas as linhas da tabela, formatando novamente apenas as que mudaram.
+        '''
+        self.renderiza()
+        return list(self.linhas)
+
+
+def codigos_terminal(diferencas: list[tuple[int, str]], primeira_linha: int = 1) -> str:
+    '''
+    Devolve o texto que, escrito em um terminal ANSI que já exibe a tabela a partir da
+    linha *primeira_linha*, reescreve no lugar apenas as linhas de *diferencas*.
+
+    Exemplos:
+    >>> codigos_terminal([(3, ' 3º Santos')], primeira_linha=2)
+    '\\x1b[4;1H\\x1b[2K 3º Santos'
+    '''
+    return ''.join(f'\x1b[{primeira_linha + n - 1};1H\x1b[2K{linha}' for n, linha in diferencas)
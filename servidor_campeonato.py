@@ -0,0 +1,348 @@
+# Servidor - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+
+import asyncio
+import json
+from dataclasses import dataclass
+
+from api_campeonato import SEPARADOR, Campeonato, executa_comando
+from simulador_campeonato_brasileiro import Jogo
+
+# Protocolo: cada mensagem é uma linha de texto em UTF-8. O cliente envia comandos no
+# formato dos roteiros de *executa_comando*, além de:
+#   tabela          devolve a tabela atual;
+#   rodada;N        devolve os jogos da N-ésima rodada;
+#   assina          passa a receber cada nova versão da tabela, com as rodadas alteradas.
+# Consultas e atualizações são objetos JSON, um por linha; comandos de escrita são
+# respondidos com 'ok' ou com 'erro: mensagem'.
+COMANDOS_ESCRITA = ('resultado', 'altera', 'apaga', 'desfaz', 'refaz')
+
+# Bytes pendentes no buffer de envio a partir dos quais um assinante é considerado atrasado.
+LIMITE_BUFFER = 1 << 16
+# Número de assinantes atendidos pela distribuição de uma versão antes de devolver o
+# controle ao laço de eventos, para que consultas e escritas não esperem a distribuição.
+LOTE_ASSINANTES = 256
+
+
+@dataclass(frozen=True, slots=True)
+class Snapshot:
+    '''
+    Estado imutável do campeonato em uma versão, compartilhado por todos os leitores.
+
+    Atributos:
+        versao (int): Número de trocas de placar aplicadas pelo servidor até esta versão;
+        tabela (tuple): Linhas da tabela: colocação, nome, pontos, jogos, vitórias, empates,
+            derrotas, gols marcados, gols sofridos e saldo de gols;
+        rodadas (tuple): Jogos de cada rodada, como (mandante, visitante, gols, gols);
+        alteradas (tuple[int, ...]): Rodadas alteradas desde a versão anterior;
+        mensagem (bytes): Atualização enviada aos assinantes, já codificada uma única vez.
+    '''
+    versao: int
+    tabela: tuple[tuple[int | str, ...], ...]
+    rodadas: tuple[tuple[tuple[str, str, int | None, int | None], ...], ...]
+    alteradas: tuple[int, ...]
+    mensagem: bytes
+
+
+def linha_json(objeto: object) -> bytes:
+    '''
+    Codifica *objeto* como uma linha de JSON em UTF-8.
+
+    Exemplos:
+    >>> linha_json({'versao': 1})
+    b'{"versao": 1}\\n'
+    '''
+    return (json.dumps(objeto, ensure_ascii=False) + '\n').encode()
+
+
+def jogos_rodada(rodada: list[Jogo]) -> tuple[tuple[str, str, int | None, int | None], ...]:
+    '''
+    Devolve os jogos de *rodada* como tuplas imutáveis (mandante, visitante, gols, gols).
+    '''
+    return tuple((jogo.mandante.nome, jogo.visitante.nome, jogo.gols_mandante, jogo.gols_visitante)
+                 for jogo in rodada)
+
+
+def cria_snapshot(campeonato: Campeonato, versao: int, anterior: Snapshot | None,
+                  alteradas: set[int]) -> Snapshot:
+    '''
+    Cria o snapshot da *versao* de *campeonato*. Apenas as rodadas *alteradas* são
+    copiadas novamente; as demais são compartilhadas com o snapshot *anterior*.
+
+    Exemplos:
+    >>> campeonato = Campeonato(['A', 'B', 'C', 'D'])
+    >>> campeonato.inicia()
+    >>> primeiro = cria_snapshot(campeonato, 0, None, set())
+    >>> campeonato.registra_resultado(2, 'C', 'A', 1, 0)
+    >>> segundo = cria_snapshot(campeonato, 1, primeiro, {2})
+    >>> segundo.tabela[0], segundo.rodadas[1][0]
+    ((1, 'C', 3, 1, 1, 0, 0, 1, 0, 1), ('C', 'A', 1, 0))
+    >>> segundo.rodadas[0] is primeiro.rodadas[0]
+    True
+    >>> segundo.mensagem
+    b'{"versao": 1, "tabela": [[1, "C", 3, 1, 1, 0, 0, 1, 0, 1], [2, "B", 0, 0, 0, 0, 0, 0, 0, 0], [3, "D", 0, 0, 0, 0, 0, 0, 0, 0], [4, "A", 0, 1, 0, 0, 1, 0, 1, -1]], "rodadas": {"2": [["C", "A", 1, 0], ["B", "D", null, null]]}}\\n'
+    '''
+    tabela = tuple((n, equipe.nome, equipe.pontos, equipe.jogos, equipe.vitorias, equipe.empates,
+                    equipe.derrotas, equipe.gols_marcados, equipe.gols_sofridos, equipe.saldo_gols)
+                   for n, equipe in enumerate(campeonato.tabela(), 1))
+    if anterior is None:
+        rodadas = tuple(jogos_rodada(rodada) for rodada in campeonato.rodadas)
+    else:
+        rodadas = tuple(jogos_rodada(campeonato.rodadas[i]) if i + 1 in alteradas else jogos
+                        for i, jogos in enumerate(anterior.rodadas))
+    ordenadas = tuple(sorted(alteradas))
+    mensagem = linha_json({'versao': versao, 'tabela': tabela,
+                           'rodadas': {str(rodada): rodadas[rodada - 1] for rodada in ordenadas}})
+    return Snapshot(versao, tabela, rodadas, ordenadas, mensagem)
+
+
+class ServidorCampeonato:
+    '''
+    Servidor asyncio da tabela de um campeonato já iniciado, para muitos clientes ao
+    mesmo tempo.
+
+    Todas as escritas passam por uma fila e são aplicadas, uma a uma, por uma única
+    tarefa escritora, que publica um novo Snapshot a cada troca de placar. Os leitores
+    só acessam o snapshot atual, que nunca muda depois de criado: leituras não usam
+    travas e nunca esperam pelas escritas.
+
+    A mensagem de cada versão é codificada uma única vez e enviada aos assinantes por
+    uma tarefa distribuidora, com uma escrita não bloqueante para cada um, sem acordar
+    uma tarefa por assinante. A distribuição é feita em lotes de LOTE_ASSINANTES, e uma
+    versão publicada durante a distribuição substitui a anterior para os assinantes
+    que ainda não a receberam. Um
+    assinante com mais de LIMITE_BUFFER bytes ainda por enviar é considerado atrasado:
+    ele deixa de receber as versões intermediárias, e uma tarefa própria espera o seu
+    buffer esvaziar para enviar apenas a versão mais recente. Assim, um cliente lento
+    não atrasa o escritor nem os demais assinantes.
+
+    Exemplos:
+    >>> async def exemplo():
+    ...     campeonato = Campeonato(['A', 'B', 'C', 'D'])
+    ...     campeonato.inicia()
+    ...     servidor = ServidorCampeonato(campeonato)
+    ...     await servidor.inicia(porta=0)
+    ...     leitor, escritor = await asyncio.open_connection('127.0.0.1', servidor.porta)
+    ...     escritor.write(b'assina\\n')
+    ...     print(json.loads(await leitor.readline())['versao'])
+    ...     cliente, envio = await asyncio.open_connection('127.0.0.1', servidor.porta)
+    ...     envio.write(b'resultado;1;A;D;2;0\\nresultado;1;A;D;1;1\\n')
+    ...     print((await cliente.readline()).decode().strip())
+    ...     print((await cliente.readline()).decode().strip())
+    ...     atualizacao = json.loads(await leitor.readline())
+    ...     print(atualizacao['versao'], atualizacao['tabela'][0][:3], atualizacao['rodadas']['1'][0])
+    ...     envio.write(b'rodada;1\\n')
+    ...     print(json.loads(await cliente.readline()))
+    ...     for conexao in (escritor, envio):
+    ...         conexao.close()
+    ...     await servidor.encerra()
+    >>> asyncio.run(exemplo())
+    0
+    ok
+    erro: Resultado já registrado!
+    1 [1, 'A', 3] ['A', 'D', 2, 0]
+    {'rodada': 1, 'jogos': [['A', 'D', 2, 0], ['B', 'C', None, None]]}
+    '''
+    campeonato: Campeonato
+    snapshot: Snapshot
+    fila: asyncio.Queue
+    alteradas: set[int]
+    assinantes: dict[asyncio.StreamWriter, int]
+    publicada: asyncio.Event
+    atrasados: set[asyncio.StreamWriter]
+    servidor: asyncio.Server | None
+    tarefas: set[asyncio.Task]
+    conexoes: dict[asyncio.Task, asyncio.StreamWriter]
+
+    def __init__(self, campeonato: Campeonato) -> None:
+        '''
+        Prepara o servidor de *campeonato*, que já deve ter sido iniciado.
+        '''
+        self.campeonato = campeonato
+        self.alteradas = set()
+        self.campeonato.log.ouvintes.append(self.__registra_alteracao)
+        self.snapshot = cria_snapshot(campeonato, 0, None, set())
+        self.fila = asyncio.Queue()
+        self.assinantes = {}
+        self.publicada = asyncio.Event()
+        self.atrasados = set()
+        self.servidor = None
+        self.tarefas = set()
+        self.conexoes = {}
+
+    @property
+    def porta(self) -> int:
+        '''
+        Porta em que o servidor está escutando.
+        Levanta ValueError se o servidor ainda não tiver sido iniciado.
+        '''
+        if self.servidor is None:
+            raise ValueError('O servidor ainda não foi iniciado!')
+        return self.servidor.sockets[0].getsockname()[1]
+
+    async def inicia(self, endereco: str = '127.0.0.1', porta: int = 0):
+        '''
+        Começa a escutar em *endereco* e *porta*, por padrão em uma porta livre do
+        localhost, e inicia as tarefas escritora e distribuidora.
+        '''
+        self.__cria_tarefa(self.__escreve())
+        self.__cria_tarefa(self.__distribui())
+        self.servidor = await asyncio.start_server(self.__atende, endereco, porta, limit=1 << 16)
+
+    async def encerra(self):
+        '''
+        Para de aceitar conexões, fecha as de todos os clientes e encerra as tarefas do
+        servidor. Levanta ValueError se o servidor ainda não tiver sido iniciado.
+        '''
+        if self.servidor is None:
+            raise ValueError('O servidor ainda não foi iniciado!')
+        self.servidor.close()
+        # As conexões não são canceladas: fechadas, a leitura de cada uma chega ao fim e
+        # a sua tarefa termina normalmente, depois de responder a uma escrita pendente.
+        for escritor in self.conexoes.values():
+            escritor.close()
+        await asyncio.gather(*self.conexoes, return_exceptions=True)
+        for tarefa in list(self.tarefas):
+            tarefa.cancel()
+        await asyncio.gather(*self.tarefas, return_exceptions=True)
+        await self.servidor.wait_closed()
+
+    async def escreve(self, comando: str) -> str:
+        '''
+        Envia *comando*, no formato dos roteiros, à tarefa escritora e espera a resposta:
+        'ok' ou 'erro: mensagem'.
+        '''
+        resposta = asyncio.get_running_loop().create_future()
+        await self.fila.put((comando, resposta))
+        return await resposta
+
+    async def __escreve(self):
+        '''
+        Tarefa escritora: aplica os comandos da fila em ordem e publica um snapshot
+        depois de cada comando que alterou algum placar.
+        '''
+        while True:
+            comando, resposta = await self.fila.get()
+            try:
+                executa_comando(self.campeonato, [campo.strip() for campo in comando.split(SEPARADOR)])
+            except ValueError as e:
+                resposta.set_result(f'erro: {e}')
+            else:
+                resposta.set_result('ok')
+            if self.alteradas:
+                self.__publica()
+
+    def __registra_alteracao(self, jogo: Jogo, rodada: int, anterior: tuple[int | None, int | None],
+                             novo: tuple[int | None, int | None]):
+        '''
+        Ouvinte do log do campeonato: anota a rodada alterada para o próximo snapshot.
+        '''
+        self.alteradas.add(rodada)
+
+    def __publica(self):
+        '''
+        Troca o snapshot atual por um novo e avisa a tarefa distribuidora.
+        '''
+        self.snapshot = cria_snapshot(self.campeonato, self.snapshot.versao + 1, self.snapshot, self.alteradas)
+        self.alteradas = set()
+        self.publicada.set()
+
+    async def __distribui(self):
+        '''
+        Tarefa distribuidora: a cada publicação, envia o snapshot mais recente a todos os
+        assinantes, em lotes de LOTE_ASSINANTES.
+        '''
+        while True:
+            await self.publicada.wait()
+            self.publicada.clear()
+            assinantes = list(self.assinantes)
+            for inicio in range(0, len(assinantes), LOTE_ASSINANTES):
+                for escritor in assinantes[inicio:inicio + LOTE_ASSINANTES]:
+                    if escritor in self.assinantes:
+                        self.__envia(escritor)
+                await asyncio.sleep(0)
+
+    async def __atende(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        '''
+        Atende uma conexão: responde às consultas com o snapshot atual, repassa as escritas
+        à tarefa escritora e, após 'assina', passa a enviar as novas versões.
+        '''
+        tarefa = asyncio.current_task()
+        assert tarefa is not None
+        self.conexoes[tarefa] = escritor
+        try:
+            while linha := await leitor.readline():
+                comando = linha.decode().strip()
+                campos = comando.split(SEPARADOR)
+                if not comando:
+                    continue
+                if comando == 'tabela':
+                    escritor.write(self.snapshot.mensagem)
+                elif campos[0] == 'rodada' and len(campos) == 2:
+                    escritor.write(self.__rodada(campos[1]))
+                elif comando == 'assina':
+                    self.assinantes.setdefault(escritor, -1)
+                    self.__envia(escritor)
+                elif campos[0].strip() in COMANDOS_ESCRITA:
+                    escritor.write((await self.escreve(comando) + '\n').encode())
+                else:
+                    escritor.write(f'erro: Comando desconhecido: {campos[0]}\n'.encode())
+                await escritor.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.assinantes.pop(escritor, None)
+            self.conexoes.pop(tarefa, None)
+            escritor.close()
+
+    def __envia(self, escritor: asyncio.StreamWriter):
+        '''
+        Envia o snapshot atual ao assinante *escritor*, se ele ainda não o recebeu, ou o
+        marca como atrasado, se o seu buffer de envio estiver cheio.
+        '''
+        if escritor in self.atrasados or escritor.transport.is_closing():
+            return
+        if self.assinantes[escritor] == self.snapshot.versao:
+            return
+        if escritor.transport.get_write_buffer_size() < LIMITE_BUFFER:
+            escritor.write(self.snapshot.mensagem)
+            self.assinantes[escritor] = self.snapshot.versao
+        else:
+            self.atrasados.add(escritor)
+            self.__cria_tarefa(self.__alcanca(escritor))
+
+    async def __alcanca(self, escritor: asyncio.StreamWriter):
+        '''
+        Espera o buffer de envio do assinante atrasado *escritor* esvaziar e envia a versão
+        mais recente, até que ele esteja em dia.
+        '''
+        try:
+            while escritor in self.assinantes and self.assinantes[escritor] != self.snapshot.versao:
+                await escritor.drain()
+                if escritor in self.assinantes:
+                    escritor.write(self.snapshot.mensagem)
+                    self.assinantes[escritor] = self.snapshot.versao
+        except ConnectionError:
+            pass
+        finally:
+            self.atrasados.discard(escritor)
+
+    def __rodada(self, numero: str) -> bytes:
+        '''
+        Devolve a resposta à consulta da rodada *numero*, a partir do snapshot atual.
+        '''
+        try:
+            rodada = int(numero)
+            if not 1 <= rodada <= len(self.snapshot.rodadas):
+                raise ValueError
+        except ValueError:
+            return b'erro: Rodada inexistente!\n'
+        return linha_json({'rodada': rodada, 'jogos': self.snapshot.rodadas[rodada - 1]})
+
+    def __cria_tarefa(self, corrotina):
+        '''
+        Cria uma tarefa do servidor, que será cancelada por *encerra*.
+        '''
+        tarefa = asyncio.get_running_loop().create_task(corrotina)
+        self.tarefas.add(tarefa)
+        tarefa.add_done_callback(self.tarefas.discard)
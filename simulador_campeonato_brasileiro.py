@@ -1,10 +1,23 @@
 # Simulador - Campeonato Brasileiro
 # Autor: Matheus Henrique Borsato
 
+from bisect import bisect_left, insort
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
 
+# O desempenho de cada equipe é guardado em um bytearray, com um byte por rodada.
+NADA = 0
+VITORIA = 1
+EMPATE = 2
+DERROTA = 3
+LETRAS = bytes.maketrans(bytes([NADA, VITORIA, EMPATE, DERROTA]), b'-VED')
 
-@dataclass
+# Número de equipes do Campeonato Brasileiro, exigido pelo menu. As funções de geração de
+# rodadas aceitam qualquer número de equipes.
+NUMERO_EQUIPES = 20
+
+
+@dataclass(slots=True)
 class Equipe:
     '''
     Representa uma equipe participante do campeonato.
@@ -20,7 +33,7 @@ class Equipe:
         gols_sofridos (int): Total de gols sofridos pela equipe;
         saldo_gols (int): Diferença entre gols marcados e gols sofridos;
         aproveitamento (float): Porcentagem de aproveitamento da equipe no campeonato. Por padrão, é iniciado em 100.0;
-        desempenho (list[str]): Histórico dos resultados da equipe (ex: ['V', 'D', 'E', 'V', 'V']).
+        desempenho (bytearray): Histórico dos resultados da equipe, com um byte por rodada (NADA, VITORIA, EMPATE ou DERROTA).
     '''
     nome: str
     pontos: int
@@ -32,10 +45,10 @@ class Equipe:
     gols_sofridos: int
     saldo_gols: int
     aproveitamento: float
-    desempenho: list[str] 
+    desempenho: bytearray
 
 
-@dataclass
+@dataclass(slots=True)
 class Jogo:
     '''
     Representa uma partida entre duas equipes em uma rodada do campeonato.
@@ -47,7 +60,7 @@ class Jogo:
     gols_visitante: int | None
 
 
-@dataclass
+@dataclass(slots=True)
 class Rodada:
     '''
     Representa uma rodada do campeonato, contendo um conjunto de jogos e 
@@ -55,13 +68,415 @@ class Rodada:
     '''
     lista_jogos: list[Jogo]
     numero: int
-    
 
-def procura_nome (lista: list[str], nome: str) -> bool:
+
+class Classificacao:
+    '''
+    Mantém a ordem de classificação das equipes do campeonato, com os mesmos critérios
+    de *intercala*, sem precisar reordenar a tabela inteira a cada resultado.
+
+    Cada equipe é representada por uma chave (-pontos, -vitórias, -saldo de gols, nome),
+    guardada em uma lista sempre ordenada. Quando um resultado muda as estatísticas de
+    uma equipe, apenas a sua chave é removida e reinserida na posição correta, que é
+    encontrada por busca binária em O(log n). Ler a tabela é O(n) e não exige ordenação.
+
+    Exemplos:
+    >>> equipes = converte_equipe(['Santos', 'Corinthians', 'Palmeiras'])
+    >>> c = Classificacao(equipes)
+    >>> [equipe.nome for equipe in c.ordem()]
+    ['Corinthians', 'Palmeiras', 'Santos']
+    >>> vitoria(equipes[0], equipes[2], 1)
+    >>> c.atualiza(equipes[0])
+    >>> c.atualiza(equipes[2])
+    >>> [equipe.nome for equipe in c.ordem()]
+    ['Santos', 'Corinthians', 'Palmeiras']
+    >>> c.posicao('Palmeiras')
+    3
+    '''
+    chaves: list[tuple[int, int, int, str]]
+    chave_atual: dict[str, tuple[int, int, int, str]]
+    equipes: dict[str, Equipe]
+
+    def __init__(self, equipes: list[Equipe]) -> None:
+        '''
+        Inicializa a classificação com *equipes*, ordenando-as uma única vez.
+        '''
+        self.equipes = {equipe.nome: equipe for equipe in equipes}
+        self.chave_atual = {equipe.nome: self.__chave(equipe) for equipe in equipes}
+        self.chaves = sorted(self.chave_atual.values())
+
+    def atualiza(self, equipe: Equipe):
+        '''
+        Reposiciona *equipe* na classificação de acordo com suas estatísticas atuais.
+        '''
+        antiga = self.chave_atual[equipe.nome]
+        nova = self.__chave(equipe)
+        if nova != antiga:
+            del self.chaves[bisect_left(self.chaves, antiga)]
+            insort(self.chaves, nova)
+            self.chave_atual[equipe.nome] = nova
+
+    def atualiza_jogo(self, jogo: Jogo, rodada: int, anterior: tuple[int | None, int | None],
+                      novo: tuple[int | None, int | None]):
+        '''
+        Reposiciona as duas equipes de *jogo* após a troca do seu placar. Feito para ser
+        adicionado aos ouvintes de um LogResultados.
+        '''
+        self.atualiza(jogo.mandante)
+        self.atualiza(jogo.visitante)
+
+    def ordem(self) -> list[Equipe]:
+        '''
+        Devolve as equipes na ordem atual de classificação.
+        '''
+        return [self.equipes[chave[3]] for chave in self.chaves]
+
+    def posicao(self, nome: str) -> int:
+        '''
+        Devolve a colocação atual da equipe *nome*, começando em 1.
+        '''
+        return bisect_left(self.chaves, self.chave_atual[nome]) + 1
+
+    def __chave(self, equipe: Equipe) -> tuple[int, int, int, str]:
+        '''
+        Devolve a chave de ordenação de *equipe*.
+        '''
+        return (-equipe.pontos, -equipe.vitorias, -equipe.saldo_gols, equipe.nome)
+
+
+class RegistroEquipes:
+    '''
+    Registro único das equipes do campeonato, indexado pelo nome e por um identificador
+    inteiro estável, que é a ordem de registro da equipe e nunca muda, nem mesmo quando
+    a equipe é renomeada. Todas as buscas por nome são feitas em O(1).
+
+    Exemplos:
+    >>> r = RegistroEquipes()
+    >>> r.registra('Santos')
+    0
+    >>> r.registra('Palmeiras')
+    1
+    >>> 'Santos' in r, 'Flamengo' in r, len(r)
+    (True, False, 2)
+    >>> r.renomeia('Santos', 'Flamengo')
+    >>> r.identificador('Flamengo'), 'Santos' in r
+    (0, False)
+    >>> list(r)
+    ['Flamengo', 'Palmeiras']
+    >>> r.renomeia('Flamengo', 'Palmeiras')
+    Traceback (most recent call last):
+    ...
+    ValueError: Nome já registrado!
+    '''
+    nomes: list[str]
+    identificadores: dict[str, int]
+    equipes: list[Equipe]
+
+    def __init__(self, nomes: list[str] | None = None) -> None:
+        '''
+        Inicializa o registro, opcionalmente já com as equipes de *nomes*.
+        '''
+        self.nomes = []
+        self.identificadores = {}
+        self.equipes = []
+        for nome in nomes or []:
+            self.registra(nome)
+
+    def __contains__(self, nome: object) -> bool:
+        return nome in self.identificadores
+
+    def __len__(self) -> int:
+        return len(self.nomes)
+
+    def __iter__(self):
+        return iter(self.nomes)
+
+    def registra(self, nome: str) -> int:
+        '''
+        Registra a equipe *nome* e devolve o seu identificador.
+        Levanta ValueError se a equipe já estiver registrada.
+        '''
+        if nome in self.identificadores:
+            raise ValueError('Equipe já registrada!')
+        self.identificadores[nome] = len(self.nomes)
+        self.nomes.append(nome)
+        return self.identificadores[nome]
+
+    def renomeia(self, nome: str, novo_nome: str):
+        '''
+        Troca o nome da equipe *nome* por *novo_nome*, mantendo o seu identificador.
+
+        Todas as verificações são feitas antes de qualquer alteração, de forma que o
+        índice por nome, a lista de nomes e a Equipe correspondente, se já existir,
+        nunca fiquem inconsistentes entre si.
+        '''
+        if novo_nome in self.identificadores:
+            raise ValueError('Nome já registrado!')
+        if nome not in self.identificadores:
+            raise ValueError('Nome não encontrado!')
+        identificador = self.identificadores.pop(nome)
+        self.identificadores[novo_nome] = identificador
+        self.nomes[identificador] = novo_nome
+        if self.equipes:
+            self.equipes[identificador].nome = novo_nome
+
+    def identificador(self, nome: str) -> int:
+        '''
+        Devolve o identificador da equipe *nome*.
+        '''
+        return self.identificadores[nome]
+
+    def inicia_equipes(self, rodadas: int | None = None) -> list[Equipe]:
+        '''
+        Cria as Equipes do campeonato, na ordem dos identificadores, e as guarda no registro.
+        *rodadas* é repassado para *converte_equipe*.
+        '''
+        self.equipes = converte_equipe(self.nomes, rodadas)
+        return self.equipes
+
+    def equipe(self, nome: str) -> Equipe:
+        '''
+        Devolve a Equipe de nome *nome*. Requer que *inicia_equipes* já tenha sido chamado.
+        '''
+        return self.equipes[self.identificadores[nome]]
+
+
+class IndiceJogos:
+    '''
+    Índice dos jogos de cada equipe, construído uma única vez logo após a geração das
+    rodadas. Para cada equipe, guarda as referências (rodada, jogo) de todas as suas
+    partidas, em ordem de rodada, e quantas delas são como mandante e como visitante.
+    Assim, o calendário de uma equipe, o seu próximo jogo e o seu equilíbrio de mandos
+    são consultas diretas, sem percorrer as rodadas.
+
+    Exemplos:
+    >>> rodadas = gera_rodadas(converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo']))
+    >>> indice = IndiceJogos(rodadas)
+    >>> indice.referencias['Santos']
+    [(0, 1), (1, 0), (2, 1), (3, 1), (4, 0), (5, 1)]
+    >>> [(rodada, jogo.mandante.nome, jogo.visitante.nome) for rodada, jogo in indice.calendario('Santos')][:2]
+    [(1, 'Palmeiras', 'Santos'), (2, 'Santos', 'Corinthians')]
+    >>> rodadas[0][1].gols_mandante, rodadas[0][1].gols_visitante = 1, 0
+    >>> rodada, jogo = indice.proximo_jogo('Santos')
+    >>> rodada, jogo.mandante.nome, jogo.visitante.nome
+    (2, 'Santos', 'Corinthians')
+    >>> indice.mandos('Santos')
+    (3, 3)
+    '''
+    rodadas: list[list[Jogo]]
+    referencias: dict[str, list[tuple[int, int]]]
+    mandantes: dict[str, int]
+
+    def __init__(self, rodadas: list[list[Jogo]]) -> None:
+        '''
+        Constrói o índice das partidas de *rodadas*, percorrendo-as uma única vez.
+        '''
+        self.rodadas = rodadas
+        self.referencias = {}
+        self.mandantes = {}
+        for i in range(len(rodadas)):
+            for j in range(len(rodadas[i])):
+                jogo = rodadas[i][j]
+                self.referencias.setdefault(jogo.mandante.nome, []).append((i, j))
+                self.referencias.setdefault(jogo.visitante.nome, []).append((i, j))
+                self.mandantes[jogo.mandante.nome] = self.mandantes.get(jogo.mandante.nome, 0) + 1
+
+    def calendario(self, nome: str) -> list[tuple[int, Jogo]]:
+        '''
+        Devolve todos os jogos da equipe *nome*, em ordem, junto com o número da rodada.
+        '''
+        return [(i + 1, self.rodadas[i][j]) for i, j in self.referencias[nome]]
+
+    def proximo_jogo(self, nome: str) -> tuple[int, Jogo] | None:
+        '''
+        Devolve o primeiro jogo sem resultado da equipe *nome*, junto com o número da
+        rodada, ou None se todos os seus jogos já tiverem resultado.
+        '''
+        for i, j in self.referencias[nome]:
+            if self.rodadas[i][j].gols_mandante is None:
+                return (i + 1, self.rodadas[i][j])
+        return None
+
+    def mandos(self, nome: str) -> tuple[int, int]:
+        '''
+        Devolve quantos jogos a equipe *nome* disputa como mandante e como visitante.
+        '''
+        mandante = self.mandantes.get(nome, 0)
+        return (mandante, len(self.referencias[nome]) - mandante)
+
+    def referencia_na_rodada(self, nome: str, rodada: int) -> tuple[int, int] | None:
+        '''
+        Devolve a referência (rodada, jogo) do jogo da equipe *nome* na *rodada*º, ou None
+        se ela folga nessa rodada. A busca é binária nas referências da equipe, que estão
+        em ordem de rodada.
+        '''
+        referencias = self.referencias[nome]
+        k = bisect_left(referencias, (rodada - 1,))
+        if k < len(referencias) and referencias[k][0] == rodada - 1:
+            return referencias[k]
+        return None
+
+    def jogo_na_rodada(self, nome: str, rodada: int) -> Jogo | None:
+        '''
+        Devolve o jogo da equipe *nome* na *rodada*º, ou None se ela folga nessa rodada.
+        '''
+        referencia = self.referencia_na_rodada(nome, rodada)
+        if referencia is None:
+            return None
+        return self.rodadas[referencia[0]][referencia[1]]
+
+
+@dataclass(slots=True)
+class Evento:
+    '''
+    Representa uma alteração no placar de um jogo: o registro, a alteração ou a remoção
+    de um resultado. Um placar (None, None) indica jogo sem resultado.
+    '''
+    jogo: Jogo
+    rodada: int
+    anterior: tuple[int | None, int | None]
+    novo: tuple[int | None, int | None]
+
+
+class LogResultados:
+    '''
+    Log de todas as alterações de resultados do campeonato, em ordem. Ele é a única
+    forma de alterar um placar, e as estatísticas das equipes são o acúmulo dos seus
+    eventos. Cada evento guarda o placar anterior e o novo, de forma que desfazê-lo ou
+    refazê-lo custa O(1), e voltar a um ponto de controle custa O(eventos entre os dois
+    pontos), sem recalcular o campeonato.
+
+    Desfazer não apaga eventos: eles podem ser refeitos até que um novo resultado seja
+    registrado, o que descarta os eventos desfeitos, como em um editor de texto.
+
+    A cada evento aplicado, desfeito ou refeito, os *ouvintes* são chamados com
+    (jogo, rodada, placar anterior, placar novo), na ordem em que foram adicionados.
+    Esse é o protocolo de todas as estruturas que acompanham o campeonato, como a
+    Classificacao e o HistoricoClassificacao: o seu método *atualiza_jogo* é adicionado
+    aos ouvintes e, como recebe o placar anterior, desconta-o e soma o novo, sem
+    distinguir registro, alteração, apagamento, desfazer ou refazer.
+
+    Exemplos:
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> log = LogResultados()
+    >>> log.ouvintes.append(lambda jogo, rodada, anterior, novo: print(rodada, anterior, novo))
+    >>> log.registra(rodadas[0][0], 1, 2, 1)
+    1 (None, None) (2, 1)
+    >>> log.marca('rodada 1')
+    >>> log.registra(rodadas[0][0], 1, 0, 0)
+    1 (2, 1) (0, 0)
+    >>> log.registra(rodadas[1][0], 2, 3, 0)
+    2 (None, None) (3, 0)
+    >>> equipes[0].pontos, equipes[0].jogos
+    (1, 2)
+    >>> log.volta_para('rodada 1')
+    2 (3, 0) (None, None)
+    1 (0, 0) (2, 1)
+    >>> equipes[0].pontos, equipes[0].jogos, rodadas[1][0].gols_mandante
+    (3, 1, None)
+    >>> log.refaz().novo
+    1 (2, 1) (0, 0)
+    (0, 0)
+    >>> equipes[0].pontos, len(log), len(log.eventos)
+    (1, 2, 3)
+    '''
+    eventos: list[Evento]
+    posicao: int
+    pontos_controle: dict[str, int]
+    ouvintes: list[Callable[[Jogo, int, tuple[int | None, int | None], tuple[int | None, int | None]], None]]
+
+    def __init__(self) -> None:
+        '''
+        Inicializa um log vazio.
+        '''
+        self.eventos = []
+        self.posicao = 0
+        self.pontos_controle = {}
+        self.ouvintes = []
+
+    def __len__(self) -> int:
+        '''
+        Devolve o número de eventos aplicados, isto é, não desfeitos.
+        '''
+        return self.posicao
+
+    def registra(self, jogo: Jogo, rodada: int, gols_mandante: int | None, gols_visitante: int | None):
+        '''
+        Registra o placar *gols_mandante* X *gols_visitante* para *jogo* da *rodada*º,
+        substituindo o placar atual. Com (None, None), o resultado é apagado.
+        Os eventos desfeitos deixam de poder ser refeitos.
+        '''
+        evento = Evento(jogo, rodada, (jogo.gols_mandante, jogo.gols_visitante), (gols_mandante, gols_visitante))
+        del self.eventos[self.posicao:]
+        for nome in [nome for nome, posicao in self.pontos_controle.items() if posicao > self.posicao]:
+            del self.pontos_controle[nome]
+        self.eventos.append(evento)
+        self.posicao += 1
+        self.__aplica(evento.jogo, evento.rodada, evento.anterior, evento.novo)
+
+    def desfaz(self) -> Evento | None:
+        '''
+        Desfaz o último evento aplicado e o devolve, ou devolve None se não houver nenhum.
+        '''
+        if self.posicao == 0:
+            return None
+        self.posicao -= 1
+        evento = self.eventos[self.posicao]
+        self.__aplica(evento.jogo, evento.rodada, evento.novo, evento.anterior)
+        return evento
+
+    def refaz(self) -> Evento | None:
+        '''
+        Refaz o último evento desfeito e o devolve, ou devolve None se não houver nenhum.
+        '''
+        if self.posicao == len(self.eventos):
+            return None
+        evento = self.eventos[self.posicao]
+        self.posicao += 1
+        self.__aplica(evento.jogo, evento.rodada, evento.anterior, evento.novo)
+        return evento
+
+    def marca(self, nome: str):
+        '''
+        Cria, ou move, o ponto de controle *nome* na posição atual do log.
+        '''
+        self.pontos_controle[nome] = self.posicao
+
+    def volta_para(self, nome: str):
+        '''
+        Desfaz ou refaz eventos até chegar ao ponto de controle *nome*.
+        Levanta ValueError se ele não existir.
+        '''
+        if nome not in self.pontos_controle:
+            raise ValueError('Ponto de controle não encontrado!')
+        alvo = self.pontos_controle[nome]
+        while self.posicao > alvo:
+            self.desfaz()
+        while self.posicao < alvo:
+            self.refaz()
+
+    def historico(self) -> list[Evento]:
+        '''
+        Devolve os eventos aplicados, em ordem, para auditoria.
+        '''
+        return self.eventos[:self.posicao]
+
+    def __aplica(self, jogo: Jogo, rodada: int, anterior: tuple[int | None, int | None],
+                 novo: tuple[int | None, int | None]):
+        '''
+        Troca o placar de *jogo* de *anterior* para *novo* e avisa os ouvintes.
+        '''
+        aplica_placar(jogo, rodada, novo[0], novo[1])
+        for ouvinte in self.ouvintes:
+            ouvinte(jogo, rodada, anterior, novo)
+
+
+def procura_nome (lista: list[str] | RegistroEquipes, nome: str) -> bool:
     '''
     Verifica se *nome* está em *lista*. Devolve True, caso esteja
-    e False, caso contrário.
-    
+    e False, caso contrário. Se *lista* for um RegistroEquipes, a busca é O(1).
+
     Exemplos:
     >>> procura_nome ([], 'equipe')
     False
@@ -69,40 +484,33 @@ def procura_nome (lista: list[str], nome: str) -> bool:
     False
     >>> procura_nome (['time', 'equipe'], 'equipe')
     True
+    >>> procura_nome (RegistroEquipes(['time', 'equipe']), 'equipe')
+    True
     '''
-    esta = False
-    i = 0
-    while i < len(lista) and not esta:
-        if nome == lista[i]:
-            esta = True
-        i += 1
-    return esta
+    return nome in lista
 
 
-def registra_equipe(lista: list[str]):
+def registra_equipe(registro: RegistroEquipes):
     '''
-    Registra uma nova equipe em *lista*.
+    Registra uma nova equipe em *registro*.
 
-    O usuário informa o nome da equipe a ser adicionada. A função verifica se a equipe já foi 
-    registrada ou se o limite máximo de 20 equipes foi atingido. Se a equipe já estiver presente, 
+    O usuário informa o nome da equipe a ser adicionada. A função verifica se a equipe já foi
+    registrada ou se o limite máximo de NUMERO_EQUIPES equipes foi atingido. Se a equipe já estiver presente,
     a adição não é realizada. Caso o limite tenha sido atingido, uma exceção é levantada.
     '''
     try:
-        if len(lista) == 20:
-            raise ValueError('As 20 Equipes foram registradas!')
+        if len(registro) == NUMERO_EQUIPES:
+            raise ValueError(f'As {NUMERO_EQUIPES} Equipes foram registradas!')
         nome: str = input('\nNome da Equipe: ')
-        nova = True
-        for equipe in lista:
-            if nome == equipe:
-                nova = False
-                print ('\nEquipe já registrada!')
-        if nova:
-            lista.append(nome)
+        if procura_nome(registro, nome):
+            print ('\nEquipe já registrada!')
+        else:
+            registro.registra(nome)
     except ValueError as e:
         print(f'\nErro: {e}')
 
 
-def exibe_equipes(lista: list[str]):
+def exibe_equipes(lista: list[str] | RegistroEquipes):
     '''
     Exibe *lista* que representa as equipes registradas no campeonato, numeradas em ordem.
     '''
@@ -112,55 +520,114 @@ def exibe_equipes(lista: list[str]):
         print(f'{n:2}º: {equipe}')
         n += 1
 
-            
-def altera_equipe(lista: list[str]):
+
+def altera_equipe(registro: RegistroEquipes):
     '''
-    Altera o nome de uma equipe registrada no campeonato em *lista*.
+    Altera o nome de uma equipe registrada no campeonato em *registro*.
 
     O usuário informa o nome atual da equipe e o novo nome desejado. Caso o novo nome já
-    esteja registrado, a alteração não é realizada. Se o nome atual não for encontrado na lista, 
+    esteja registrado, a alteração não é realizada. Se o nome atual não for encontrado no registro,
     nenhuma alteração é feita.
     '''
     nome = input('\nNome atual da Equipe: ')
     novo_nome = input('Novo nome da Equipe: ')
-    encontrado = False
-    
-    if procura_nome(lista, novo_nome):
-        print('\nNome já registrado!')
-    else:
-        i = 0
-        while i < len(lista) and not encontrado:
-            if lista[i] == nome:
-                lista[i] = novo_nome
-                encontrado = True
-            i += 1
-        if not encontrado:
-            print ('\nNome não encontrado!')
-    
+    try:
+        registro.renomeia(nome, novo_nome)
+    except ValueError as e:
+        print(f'\n{e}')
+
     
-def converte_equipe(lista: list[str]) -> list[Equipe]:
+def total_rodadas(numero_equipes: int, ida_e_volta: bool = True) -> int:
     '''
-    Converte *lista* em uma lista de objetos da classe Equipe.
-    
+    Devolve o número de rodadas de um campeonato de pontos corridos com *numero_equipes*
+    equipes, em turno único ou em ida e volta. Com um número ímpar de equipes, cada equipe
+    folga uma vez por turno.
+
+    Exemplos:
+    >>> total_rodadas(20)
+    38
+    >>> total_rodadas(5), total_rodadas(5, ida_e_volta=False)
+    (10, 5)
+    >>> total_rodadas(1)
+    0
+    '''
+    if numero_equipes < 2:
+        return 0
+    por_turno = numero_equipes - 1 if numero_equipes % 2 == 0 else numero_equipes
+    return por_turno * 2 if ida_e_volta else por_turno
+
+
+def converte_equipe(lista: list[str], rodadas: int | None = None) -> list[Equipe]:
+    '''
+    Converte *lista* em uma lista de objetos da classe Equipe, com desempenho para *rodadas*
+    rodadas. Por padrão, o número de rodadas é o de um campeonato em ida e volta entre as
+    equipes de *lista*.
+
     Exemplos:
     >>> time = ['Corinthians']
-    >>> converte_equipe(time)
-    [Equipe(nome='Corinthians', pontos=0, jogos=0, vitorias=0, empates=0, derrotas=0, gols_marcados=0, gols_sofridos=0, saldo_gols=0, aproveitamento=100.0, desempenho=['Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada', 'Nada'])]
+    >>> converte_equipe(time, 0)
+    [Equipe(nome='Corinthians', pontos=0, jogos=0, vitorias=0, empates=0, derrotas=0, gols_marcados=0, gols_sofridos=0, saldo_gols=0, aproveitamento=100.0, desempenho=bytearray(b''))]
+    >>> len(converte_equipe(['Corinthians', 'Palmeiras', 'Santos'])[0].desempenho)
+    6
     '''
+    if rodadas is None:
+        rodadas = total_rodadas(len(lista))
     equipes: list[Equipe] = []
     for nome in lista:
-        equipe = Equipe(nome, 0, 0, 0, 0, 0, 0, 0, 0, 100.0, ['Nada'] * 38)
+        equipe = Equipe(nome, 0, 0, 0, 0, 0, 0, 0, 0, 100.0, bytearray(rodadas))
         equipes.append(equipe)
     
     return equipes
 
 
-def gera_rodadas(lista: list[Equipe]) -> list[list[Jogo]]:
+def itera_rodadas(lista: list[Equipe], ida_e_volta: bool = True) -> Iterator[list[Jogo]]:
+    '''
+    Gera, uma a uma, as rodadas de um campeonato de pontos corridos para uma *lista* de
+    classes Equipe, de qualquer tamanho, em turno único ou em ida e volta.
+
+    O sistema utiliza o método de emparelhamento circular de *gera_rodadas*. Com um número
+    ímpar de equipes, uma vaga de folga é acrescentada e a equipe emparelhada com ela não
+    joga naquela rodada. Cada rodada só é criada quando é pedida, de forma que a memória
+    usada é proporcional a uma rodada, e não ao campeonato inteiro. *lista* não é alterada.
+
+    Exemplos:
+    >>> equipes = converte_equipe(['A', 'B', 'C'])
+    >>> for rodada in itera_rodadas(equipes, ida_e_volta=False):
+    ...     print([(jogo.mandante.nome, jogo.visitante.nome) for jogo in rodada])
+    [('B', 'C')]
+    [('C', 'A')]
+    [('A', 'B')]
+    >>> sum(1 for _ in itera_rodadas(converte_equipe(['A', 'B', 'C', 'D', 'E'])))
+    10
+    '''
+    ordem: list[Equipe | None] = list(lista)
+    if len(ordem) % 2 == 1:
+        ordem.append(None)
+    turnos = 2 if ida_e_volta else 1
+
+    for turno in range(turnos):
+        for i in range(len(ordem) - 1):
+            rodada = []
+            for j in range(len(ordem) // 2):
+                timeA = ordem[j]
+                timeB = ordem[len(ordem) - 1 - j]
+                if timeA is not None and timeB is not None:
+                    if (i % 2 == 0) == (turno == 0):
+                        rodada.append(Jogo(timeA, None, timeB, None))
+                    else:
+                        rodada.append(Jogo(timeB, None, timeA, None))
+            yield rodada
+
+            ordem.insert(1, ordem.pop())
+
+
+def gera_rodadas(lista: list[Equipe], ida_e_volta: bool = True) -> list[list[Jogo]]:
     '''
     Gera as rodadas de um campeonato para uma *lista* de classes Equipe.
     
     O sistema utiliza um método de emparelhamento circular para garantir que todas as equipes joguem entre si, 
-    com revezamento dos mandos de campo, nos dois turnos.
+    com revezamento dos mandos de campo, nos dois turnos. As rodadas são as de *itera_rodadas*,
+    todas criadas de uma vez.
     
     Exemplos:
     >>> equipes = ['Corinthians', 'Palmeiras', 'Santos', 'São Paulo']
@@ -180,27 +647,7 @@ def gera_rodadas(lista: list[Equipe]) -> list[list[Jogo]]:
     >>> rodadas[1][0].visitante.nome
     'Corinthians'
     '''
-    total_rodadas = len(lista) - 1
-    rodadas_primeiro_turno = []; rodadas_segundo_turno = []
-    
-    for i in range(total_rodadas):
-        rodada_primeiro_turno = []; rodada_segundo_turno = []
-        for j in range(len(lista) // 2):
-            timeA = lista[j]
-            timeB = lista[len(lista) - 1 - j]
-            if i % 2 == 0:
-                rodada_primeiro_turno.append(Jogo(timeA, None, timeB, None))
-                rodada_segundo_turno.append(Jogo(timeB, None, timeA, None))
-            else:
-                rodada_primeiro_turno.append(Jogo(timeB, None, timeA, None))
-                rodada_segundo_turno.append(Jogo(timeA, None, timeB, None))
-        
-        rodadas_primeiro_turno.append(rodada_primeiro_turno)
-        rodadas_segundo_turno.append(rodada_segundo_turno)
-
-        lista.insert(1, lista.pop())
-        
-    return rodadas_primeiro_turno + rodadas_segundo_turno        
+    return list(itera_rodadas(lista, ida_e_volta))
 
 
 def escolhe_rodada(tabela: list[list[Jogo]]) -> Rodada:
@@ -219,7 +666,7 @@ def escolhe_rodada(tabela: list[list[Jogo]]) -> Rodada:
                 raise ValueError 
             return Rodada(tabela[numero - 1], numero)
         except ValueError:
-            print('\nErro: Rodada não válida! Por favor, digite um número entre 1 e 38!')
+            print(f'\nErro: Rodada não válida! Por favor, digite um número entre 1 e {len(tabela)}!')
 
 
 def exibe_rodada(rodada: list[Jogo]):
@@ -246,7 +693,7 @@ def escolhe_jogo(rodada: Rodada) -> Jogo:
     while True:
         try:
             numero_jogo = int(input('\nEscolha o número do jogo: '))
-            if numero_jogo < 1 or numero_jogo > 10:
+            if numero_jogo < 1 or numero_jogo > len(rodada.lista_jogos):
                 raise ValueError
             return rodada.lista_jogos[numero_jogo - 1]  # Retorna um Jogo válido
         except ValueError:
@@ -269,38 +716,42 @@ def exibe_jogo(n: int, jogo: Jogo):
     print (f'{n:2}º {jogo.mandante.nome:<20} {gols_mandante:^3} X {gols_visitante:^3} {jogo.visitante.nome:>20}')
 
 
-def resultado(jogo: Jogo, rodada: int):
+def le_placar(jogo: Jogo) -> tuple[int, int]:
+    '''
+    Solicita ao usuário o placar de *jogo* e o devolve como (gols do mandante, gols do visitante).
+    Levanta ValueError se algum valor não for numérico ou for negativo.
+    '''
+    print(f'\nDigite o Placar de {jogo.mandante.nome} X {jogo.visitante.nome}\n')
+    gols_A = int(input(f'{jogo.mandante.nome}: '))
+    gols_B = int(input(f'{jogo.visitante.nome}: '))
+    if gols_A < 0 or gols_B < 0:
+        raise ValueError('Resultado inválido! Digite valores válidos!')
+    return gols_A, gols_B
+
+
+def registra_placar(jogo: Jogo, rodada: int, gols_mandante: int | None, gols_visitante: int | None,
+                    log: LogResultados | None = None):
+    '''
+    Troca o placar de *jogo* da *rodada*º por meio de *log*, se ele for informado, ou
+    diretamente, caso contrário.
+    '''
+    if log is None:
+        aplica_placar(jogo, rodada, gols_mandante, gols_visitante)
+    else:
+        log.registra(jogo, rodada, gols_mandante, gols_visitante)
+
+
+def resultado(jogo: Jogo, rodada: int, log: LogResultados | None = None):
     '''
     Registra o resultado de *jogo* ocorrido na *rodada*º, a partir de informações inseridas pelo usuário.
-    Não altera jogos já registrados.
+    Não altera jogos já registrados. Se *log* for informado, o resultado é registrado por meio dele.
     '''
     try:
         if jogo.gols_mandante is not None or jogo.gols_visitante is not None:
            raise ValueError("Resultado já registrado!")
         else:
-            print(f'\nDigite o Placar de {jogo.mandante.nome} X {jogo.visitante.nome}\n')
-            gols_A = int(input(f'{jogo.mandante.nome}: '))
-            gols_B = int(input(f'{jogo.visitante.nome}: '))
-            jogo.gols_mandante = gols_A
-            jogo.gols_visitante = gols_B
-            jogo.mandante.jogos += 1
-            jogo.visitante.jogos += 1
-            jogo.mandante.gols_marcados += gols_A
-            jogo.mandante.gols_sofridos += gols_B
-            jogo.visitante.gols_marcados += gols_B
-            jogo.visitante.gols_sofridos += gols_A
-            jogo.mandante.saldo_gols = jogo.mandante.gols_marcados - jogo.mandante.gols_sofridos
-            jogo.visitante.saldo_gols = jogo.visitante.gols_marcados - jogo.visitante.gols_sofridos
-    
-            if gols_A == gols_B: #Empate
-                empate(jogo.mandante, jogo.visitante, rodada)
-            elif gols_A > gols_B: # Vitória do Time A
-                vitoria(jogo.mandante, jogo.visitante, rodada)
-            else: # Derrota do Time A
-                vitoria(jogo.visitante, jogo.mandante, rodada)
-        
-            jogo.mandante.aproveitamento = (jogo.mandante.pontos / (jogo.mandante.jogos * 3)) * 100
-            jogo.visitante.aproveitamento = (jogo.visitante.pontos / (jogo.visitante.jogos * 3)) * 100
+            gols_A, gols_B = le_placar(jogo)
+            registra_placar(jogo, rodada, gols_A, gols_B, log)
         
     except ValueError as e:
         if "invalid literal" in str(e):
@@ -327,16 +778,16 @@ def vitoria(timeA: Equipe, timeB: Equipe, rodada: int):
     1
     >>> timeB.derrotas
     1
-    >>> timeA.desempenho[0]
-    'Vitória'
-    >>> timeB.desempenho[0]
-    'Derrota'
+    >>> timeA.desempenho[0] == VITORIA
+    True
+    >>> timeB.desempenho[0] == DERROTA
+    True
     '''
     timeA.pontos += 3
     timeA.vitorias += 1
     timeB.derrotas += 1
-    timeA.desempenho[rodada - 1] = 'Vitória'
-    timeB.desempenho[rodada - 1] = 'Derrota'
+    timeA.desempenho[rodada - 1] = VITORIA
+    timeB.desempenho[rodada - 1] = DERROTA
         
         
 def empate(timeA: Equipe, timeB: Equipe, rodada: int):
@@ -359,23 +810,135 @@ def empate(timeA: Equipe, timeB: Equipe, rodada: int):
     1
     >>> timeB.empates
     1
-    >>> timeA.desempenho[0]
-    'Empate'
-    >>> timeB.desempenho[0]
-    'Empate'
+    >>> timeA.desempenho[0] == timeB.desempenho[0] == EMPATE
+    True
     '''
     timeA.pontos += 1
     timeB.pontos += 1
     timeA.empates += 1 
     timeB.empates += 1
-    timeA.desempenho[rodada - 1] = 'Empate'
-    timeB.desempenho[rodada - 1] = 'Empate'
+    timeA.desempenho[rodada - 1] = EMPATE
+    timeB.desempenho[rodada - 1] = EMPATE
+
+
+def contabiliza_placar(mandante: Equipe, visitante: Equipe, gols_mandante: int, gols_visitante: int,
+                       rodada: int, sinal: int = 1):
+    '''
+    Soma (*sinal* = 1) ou subtrai (*sinal* = -1) o placar *gols_mandante* X *gols_visitante*,
+    da *rodada*º, das estatísticas de *mandante* e *visitante*. É a única operação que
+    altera as estatísticas a partir de um resultado, usada tanto para registrá-lo quanto
+    para removê-lo.
+
+    Exemplos:
+    >>> equipes = converte_equipe(['Corinthians', 'Flamengo'])
+    >>> contabiliza_placar(equipes[0], equipes[1], 1, 3, 1)
+    >>> equipes[1].pontos, equipes[1].saldo_gols, equipes[0].aproveitamento, converter_para_letras(equipes[0].desempenho)
+    (3, 2, 0.0, 'D-')
+    >>> contabiliza_placar(equipes[0], equipes[1], 1, 3, 1, -1)
+    >>> equipes[1].pontos, equipes[1].vitorias, equipes[0].aproveitamento, converter_para_letras(equipes[0].desempenho)
+    (0, 0, 100.0, '--')
+    '''
+    mandante.jogos += sinal
+    visitante.jogos += sinal
+    mandante.gols_marcados += sinal * gols_mandante
+    mandante.gols_sofridos += sinal * gols_visitante
+    visitante.gols_marcados += sinal * gols_visitante
+    visitante.gols_sofridos += sinal * gols_mandante
+
+    if gols_mandante == gols_visitante: # Empate
+        mandante.pontos += sinal
+        visitante.pontos += sinal
+        mandante.empates += sinal
+        visitante.empates += sinal
+        desempenho_mandante = desempenho_visitante = EMPATE
+    elif gols_mandante > gols_visitante: # Vitória do mandante
+        mandante.pontos += 3 * sinal
+        mandante.vitorias += sinal
+        visitante.derrotas += sinal
+        desempenho_mandante, desempenho_visitante = VITORIA, DERROTA
+    else: # Vitória do visitante
+        visitante.pontos += 3 * sinal
+        visitante.vitorias += sinal
+        mandante.derrotas += sinal
+        desempenho_mandante, desempenho_visitante = DERROTA, VITORIA
+
+    if sinal < 0:
+        desempenho_mandante = desempenho_visitante = NADA
+    mandante.desempenho[rodada - 1] = desempenho_mandante
+    visitante.desempenho[rodada - 1] = desempenho_visitante
+
+    for equipe in (mandante, visitante):
+        equipe.saldo_gols = equipe.gols_marcados - equipe.gols_sofridos
+        if equipe.jogos == 0:
+            equipe.aproveitamento = 100.0
+        else:
+            equipe.aproveitamento = (equipe.pontos / (equipe.jogos * 3)) * 100
+
+
+def aplica_placar(jogo: Jogo, rodada: int, gols_mandante: int | None, gols_visitante: int | None):
+    '''
+    Troca o placar de *jogo*, da *rodada*º, por *gols_mandante* X *gols_visitante*,
+    removendo o placar anterior das estatísticas e somando o novo. Com (None, None),
+    o resultado é apenas apagado.
+    '''
+    if jogo.gols_mandante is not None and jogo.gols_visitante is not None:
+        contabiliza_placar(jogo.mandante, jogo.visitante, jogo.gols_mandante, jogo.gols_visitante, rodada, -1)
+    jogo.gols_mandante = gols_mandante
+    jogo.gols_visitante = gols_visitante
+    if gols_mandante is not None and gols_visitante is not None:
+        contabiliza_placar(jogo.mandante, jogo.visitante, gols_mandante, gols_visitante, rodada)
+
+
+def recalcula_estatisticas(equipes: list[Equipe], rodadas: list[list[Jogo]]):
+    '''
+    Recalcula do zero as estatísticas de todas as *equipes* a partir dos placares
+    registrados em *rodadas*, em uma única passagem pelos jogos. Saldo de gols e
+    aproveitamento são calculados uma única vez por equipe, ao final.
+
+    Exemplos:
+    >>> equipes = converte_equipe(['Corinthians', 'Palmeiras', 'Santos', 'São Paulo'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> rodadas[0][0].gols_mandante, rodadas[0][0].gols_visitante = 2, 1
+    >>> rodadas[1][0].gols_mandante, rodadas[1][0].gols_visitante = 0, 0
+    >>> recalcula_estatisticas(equipes, rodadas)
+    >>> c = equipes[0]
+    >>> c.pontos, c.jogos, c.saldo_gols, round(c.aproveitamento, 1), converter_para_letras(c.desempenho)
+    (4, 2, 1, 66.7, 'VE----')
+    '''
+    for equipe in equipes:
+        equipe.pontos = equipe.jogos = equipe.vitorias = equipe.empates = equipe.derrotas = 0
+        equipe.gols_marcados = equipe.gols_sofridos = 0
+        equipe.desempenho[:] = bytes(len(equipe.desempenho))
+
+    for i in range(len(rodadas)):
+        for jogo in rodadas[i]:
+            if jogo.gols_mandante is not None and jogo.gols_visitante is not None:
+                mandante, visitante = jogo.mandante, jogo.visitante
+                mandante.jogos += 1
+                visitante.jogos += 1
+                mandante.gols_marcados += jogo.gols_mandante
+                mandante.gols_sofridos += jogo.gols_visitante
+                visitante.gols_marcados += jogo.gols_visitante
+                visitante.gols_sofridos += jogo.gols_mandante
+                if jogo.gols_mandante == jogo.gols_visitante:
+                    empate(mandante, visitante, i + 1)
+                elif jogo.gols_mandante > jogo.gols_visitante:
+                    vitoria(mandante, visitante, i + 1)
+                else:
+                    vitoria(visitante, mandante, i + 1)
+
+    for equipe in equipes:
+        equipe.saldo_gols = equipe.gols_marcados - equipe.gols_sofridos
+        if equipe.jogos == 0:
+            equipe.aproveitamento = 100.0
+        else:
+            equipe.aproveitamento = (equipe.pontos / (equipe.jogos * 3)) * 100
     
     
-def jogos_equipe(nomes_equipes: list[str], rodadas: list[list[Jogo]]) -> str:
+def jogos_equipe(registro: RegistroEquipes, indice: IndiceJogos) -> str:
     '''
     Exibe todos os jogos e dados da equipe especificada pelo usuário, a partir da escolha de um time
-    presente em *nomes_equipes* e de *rodadas* que representa todos os jogos do campeonato.
+    presente em *registro* e de *indice*, o índice dos jogos do campeonato.
     
     Se o nome inserido estiver fora dos registrados, um erro é levantado,
     e o usuário é solicitado a inserir um nome válido até que uma entrada correta seja fornecida. 
@@ -385,38 +948,24 @@ def jogos_equipe(nomes_equipes: list[str], rodadas: list[list[Jogo]]) -> str:
     while True:
         try:
             time = input('\nNome do Time: ')
-            if not procura_nome(nomes_equipes, time):
+            if not procura_nome(registro, time):
                 raise ValueError("Esse time não está presente no campeonato! Por favor, digite um time válido!")
             else:
                 n = 1
                 print(f'\n Jogos e Dados da Equipe "{time}":\n')
-                for i in range(len(rodadas)):
-                    encontrado = False
-                    j = 0
-                    while j < len(rodadas[i]) and not encontrado:
-                        if rodadas[i][j].mandante.nome == time or rodadas[i][j].visitante.nome == time:
-                            exibe_jogo(n, rodadas[i][j])
-                            encontrado = True
-                            n += 1
-                        else:
-                            j += 1
+                for _, jogo in indice.calendario(time):
+                    exibe_jogo(n, jogo)
+                    n += 1
             return time
         except ValueError as e:
             print(f'\nErro: {e}')         
 
 
-def dados_equipe(time: str, lista_times: list[Equipe]):
+def dados_equipe(time: str, registro: RegistroEquipes):
     '''
-    Exibe os dados de *time*, que está presente em *lista_times*
+    Exibe os dados de *time*, que está presente em *registro*
     '''
-    i = 0
-    encontrado = False
-    while i < len(lista_times) and not encontrado:
-        if lista_times[i].nome == time:
-            equipe_desejada = lista_times[i]
-            encontrado = True
-        else:
-            i += 1
+    equipe_desejada = registro.equipe(time)
     print('\n  Dados da Equipe escolhida:\n')
     print('Pontos: ', equipe_desejada.pontos)
     print('Jogos: ', equipe_desejada.jogos)
@@ -429,11 +978,13 @@ def dados_equipe(time: str, lista_times: list[Equipe]):
     print(f'Aproveitamento: {equipe_desejada.aproveitamento:.1f}%')
   
   
-def altera_resultado(jogo: Jogo, rodada: int):
+def altera_resultado(jogo: Jogo, rodada: int, log: LogResultados | None = None):
     '''
     Altera o resultado de um *jogo* da *rodada*º ou o apaga, conforme a escolha do usuário. 
     
-    Se nenhum resultado foi registrado em *jogo*, não realiza nenhuma alteração.
+    Se nenhum resultado foi registrado em *jogo*, não realiza nenhuma alteração. A troca do
+    placar é feita de uma só vez, por *aplica_placar*, que desconta o placar anterior das
+    estatísticas; se *log* for informado, ela é registrada por meio dele e pode ser desfeita.
     '''
     try:
         if jogo.gols_mandante is None or jogo.gols_visitante is None:
@@ -442,43 +993,14 @@ def altera_resultado(jogo: Jogo, rodada: int):
             opcao = int(input("\nVocê deseja alterar o resultado ou apagá-lo? Digite 1 para ALTERAR ou 2 para APAGAR.\nEscolha uma opção: "))
             if opcao != 1 and opcao != 2:
                 raise ValueError('Opção inválida!')
+            elif opcao == 1:
+                try:
+                    gols_A, gols_B = le_placar(jogo)
+                except ValueError:
+                    raise ValueError('Resultado inválido! Digite valores válidos!')
+                registra_placar(jogo, rodada, gols_A, gols_B, log)
             else:
-                jogo.mandante.jogos -= 1; jogo.visitante.jogos -= 1
-                jogo.mandante.gols_marcados -= jogo.gols_mandante
-                jogo.mandante.gols_sofridos -= jogo.gols_visitante
-                jogo.visitante.gols_marcados -= jogo.gols_visitante
-                jogo.visitante.gols_sofridos -= jogo.gols_mandante
-                jogo.mandante.saldo_gols = jogo.mandante.gols_marcados - jogo.mandante.gols_sofridos
-                jogo.visitante.saldo_gols = jogo.visitante.gols_marcados - jogo.visitante.gols_sofridos
-                jogo.mandante.desempenho[rodada - 1] = 'Nada'
-                jogo.visitante.desempenho[rodada - 1] = 'Nada'
-                
-                if jogo.gols_mandante == jogo.gols_visitante: # Empate
-                    jogo.mandante.pontos -= 1
-                    jogo.visitante.pontos -= 1
-                    jogo.mandante.empates -= 1
-                    jogo.visitante.empates -= 1
-                elif jogo.gols_mandante > jogo.gols_visitante: # Vitória do Time A
-                    jogo.mandante.pontos -= 3
-                    jogo.mandante.vitorias -= 1
-                    jogo.visitante.derrotas -= 1
-                else: # Derrota do Time A
-                    jogo.visitante.pontos -= 3
-                    jogo.visitante.vitorias -= 1
-                    jogo.mandante.derrotas -= 1
-                    
-                if jogo.mandante.jogos == 0:
-                    jogo.mandante.aproveitamento = 100.0
-                else:
-                    jogo.mandante.aproveitamento = (jogo.mandante.pontos / (jogo.mandante.jogos * 3)) * 100
-                if jogo.visitante.jogos == 0:
-                    jogo.visitante.aproveitamento = 100.0
-                else:
-                    jogo.visitante.aproveitamento = (jogo.visitante.pontos / (jogo.visitante.jogos * 3)) * 100
-                jogo.gols_mandante = None
-                jogo.gols_visitante = None
-                if opcao == 1:
-                    resultado(jogo, rodada)
+                registra_placar(jogo, rodada, None, None, log)
                     
     except ValueError as e:
         if "invalid literal" in str(e):
@@ -487,43 +1009,84 @@ def altera_resultado(jogo: Jogo, rodada: int):
             print(f'\nErro: {e}') 
 
    
-def exibe_tabela(equipes: list[Equipe]):
+def exibe_tabela(equipes: list[Equipe], classificacao: Classificacao | None = None):
     '''
     Exibe a tabela ordenada do campeonato, a partir de *equipes*.
+
+    Se *classificacao* for informada, a ordem mantida por ela é usada diretamente, sem
+    nenhuma ordenação. Caso contrário, *equipes* é ordenada por *ordena_intercalacao*.
     '''
     print()
     print (f'{'CLASSIFICAÇÃO':^24} {'P':^5} {'J':^5} {'V':^5} {'E':^5} {'D':^5} {'GM':^5} {'GS':^5} {'SG':^5} {'%':^7} {'                            DESEMPENHO'}')
     n = 1
-    ordena_intercalacao(equipes)
+    if classificacao is not None:
+        equipes = classificacao.ordem()
+    else:
+        ordena_intercalacao(equipes)
     for equipe in equipes:
-        print (f'{n:2}º {equipe.nome:<20} {equipe.pontos:^5} {equipe.jogos:^5} {equipe.vitorias:^5} {equipe.empates:^5} {equipe.derrotas:^5} {equipe.gols_marcados:^5} {equipe.gols_sofridos:^5} {equipe.saldo_gols:^5} {(f'{equipe.aproveitamento:.1f}%'):^7} {' '.join(converter_para_letras(equipe.desempenho))}') 
+        print (formata_linha(n, equipe))
         n += 1
 
 
-def converter_para_letras(desempenho: list[str]) -> list[str]:
+def formata_linha(n: int, equipe: Equipe) -> str:
+    '''
+    Devolve a linha de *equipe* na tabela do campeonato, na *n*ª colocação.
+
+    Exemplos:
+    >>> formata_linha(1, converte_equipe(['Santos'], 2)[0])
+    ' 1º Santos                 0     0     0     0     0     0     0     0   100.0%  - -'
+    '''
+    return f'{n:2}º {equipe.nome:<20} {equipe.pontos:^5} {equipe.jogos:^5} {equipe.vitorias:^5} {equipe.empates:^5} {equipe.derrotas:^5} {equipe.gols_marcados:^5} {equipe.gols_sofridos:^5} {equipe.saldo_gols:^5} {(f'{equipe.aproveitamento:.1f}%'):^7} {' '.join(converter_para_letras(equipe.desempenho))}'
+
+
+def converter_para_letras(desempenho: bytearray) -> str:
     '''
     Converte os status de *desempenho* dos times em letras representativas.
 
-    A função recebe uma lista de strings, em que cada uma é convertida para uma letra 
-    correspondente: 'Vitória' para 'V', 'Empate' para 'E', 'Derrota' para 'D' e 'Nada' para '-'.
+    Cada byte de *desempenho* é convertido para uma letra correspondente: VITORIA para 'V',
+    EMPATE para 'E', DERROTA para 'D' e NADA para '-'. A conversão é feita de uma só vez
+    por bytearray.translate.
+
+    Exemplos:
+    >>> converter_para_letras(bytearray())
+    ''
+    >>> converter_para_letras(bytearray([VITORIA, EMPATE, DERROTA, NADA]))
+    'VED-'
+    '''
+    return desempenho.translate(LETRAS).decode()
+
+
+def ultimos_resultados(desempenho: bytearray, n: int) -> str:
+    '''
+    Devolve as letras dos *n* últimos jogos disputados registrados em *desempenho*, em
+    ordem de rodada. Rodadas sem resultado são ignoradas.
+
+    Exemplos:
+    >>> ultimos_resultados(bytearray([VITORIA, EMPATE, NADA, DERROTA, NADA]), 2)
+    'ED'
+    >>> ultimos_resultados(bytearray([NADA, VITORIA]), 5)
+    'V'
+    '''
+    return desempenho.translate(LETRAS, bytes([NADA]))[-n:].decode() if n > 0 else ''
+
+
+def sequencia_atual(desempenho: bytearray) -> tuple[str, int]:
+    '''
+    Devolve a letra do último resultado registrado em *desempenho* e quantos jogos
+    seguidos, até ele, tiveram esse mesmo resultado. Rodadas sem resultado são ignoradas.
+    Se nenhum resultado foi registrado, devolve ('-', 0).
 
     Exemplos:
-    >>> converter_para_letras([])
-    []
-    >>> converter_para_letras(['Vitória', 'Empate', 'Derrota', 'Nada'])
-    ['V', 'E', 'D', '-']
-    '''
-    resultado: list[str] = []
-    for status in desempenho:
-        if status == 'Vitória':
-            resultado.append('V')
-        elif status == 'Empate':
-            resultado.append('E')
-        elif status == 'Derrota':
-            resultado.append('D')
-        elif status == 'Nada':
-            resultado.append('-')
-    return resultado
+    >>> sequencia_atual(bytearray([DERROTA, VITORIA, NADA, VITORIA, VITORIA, NADA]))
+    ('V', 3)
+    >>> sequencia_atual(bytearray(3))
+    ('-', 0)
+    '''
+    disputados = desempenho.translate(LETRAS, bytes([NADA]))
+    if not disputados:
+        return ('-', 0)
+    ultimo = disputados[-1:]
+    return (ultimo.decode(), len(disputados) - len(disputados.rstrip(ultimo)))
 
 
 def ordena_intercalacao(lst: list[Equipe]):
@@ -626,23 +1189,115 @@ def exibe_regras():
     print('==========================================')
        
        
+def salva_campeonato(registro: RegistroEquipes, rodadas: list[list[Jogo]]):
+    '''
+    Solicita ao usuário o nome de um arquivo e grava nele o campeonato formado por
+    *registro* e *rodadas*, com os placares já registrados.
+    '''
+    # Importado aqui porque persistencia_campeonato depende deste módulo.
+    from persistencia_campeonato import salva
+
+    caminho = input('\nNome do arquivo: ')
+    try:
+        salva(caminho, registro, rodadas)
+        print(f'\nCampeonato salvo em "{caminho}"!')
+    except (ValueError, OSError) as e:
+        print(f'\nErro: Não foi possível salvar o campeonato! {e}')
+
+
+def carrega_campeonato() -> tuple[RegistroEquipes, list[list[Jogo]]] | None:
+    '''
+    Solicita ao usuário o nome de um arquivo gravado por *salva_campeonato* e devolve o
+    registro de equipes e as rodadas do campeonato, ou None se ele não puder ser lido.
+    '''
+    # Importado aqui porque persistencia_campeonato depende deste módulo.
+    from persistencia_campeonato import carrega
+
+    caminho = input('\nNome do arquivo: ')
+    try:
+        return carrega(caminho)
+    except (ValueError, OSError) as e:
+        print(f'\nErro: Não foi possível carregar o campeonato! {e}')
+        return None
+
+
+def menu_campeonato(registro: RegistroEquipes, rodadas: list[list[Jogo]]):
+    '''
+    Exibe o menu de um campeonato já iniciado, com as equipes de *registro* e as
+    *rodadas*, até que o usuário o finalize.
+    '''
+    # Importado aqui porque historico_classificacao depende deste módulo.
+    from historico_classificacao import HistoricoClassificacao
+
+    sair = False
+    times = registro.equipes
+    indice = IndiceJogos(rodadas)
+    classificacao = Classificacao(times)
+    historico = HistoricoClassificacao(times, rodadas)
+    log = LogResultados()
+    log.ouvintes += [classificacao.atualiza_jogo, historico.atualiza_jogo]
+    while not sair:
+        print("\n1) Exibir uma Rodada")
+        print("2) Inserir Resultado")
+        print("3) Alterar Resultado")
+        print("4) Ver Desempenho de Equipe")
+        print("5) Visualizar Tabela do Campeonato")
+        print("6) Visualizar Tabela após uma Rodada")
+        print("7) Exibir Regras do Campeonato")
+        print("8) Salvar Campeonato")
+        print("9) Sair e Finalizar Campeonato\n")
+        try:
+            opcao = int(input("Escolha uma opção: "))
+            if opcao < 1 or opcao > 9:
+                raise ValueError
+            elif opcao == 1:
+                exibe_rodada(escolhe_rodada(rodadas).lista_jogos)
+            elif opcao == 2: 
+                rodada = escolhe_rodada(rodadas)
+                exibe_rodada(rodada.lista_jogos)
+                resultado(escolhe_jogo(rodada), rodada.numero, log)
+            elif opcao == 3:
+                rodada = escolhe_rodada(rodadas)
+                exibe_rodada(rodada.lista_jogos)
+                altera_resultado(escolhe_jogo(rodada), rodada.numero, log)
+            elif opcao == 4:
+                dados_equipe(jogos_equipe(registro, indice), registro)
+            elif opcao == 5:
+                exibe_tabela(times, classificacao)
+            elif opcao == 6:
+                rodada = escolhe_rodada(rodadas)
+                print(f'\nTabela após a {rodada.numero}ª rodada:')
+                exibe_tabela(historico.tabela(rodada.numero))
+            elif opcao == 7:
+                exibe_regras()
+            elif opcao == 8:
+                salva_campeonato(registro, rodadas)
+            elif opcao == 9:
+                sair = True
+                exibe_tabela(times, classificacao)
+                print('\nCampeonato Finalizado!')
+        except ValueError:
+            print("\nErro: Opção inválida! Digite um número válido!")  # Caso de entrada não numérica
+
+
 def menu_principal():
     '''
     Exibe o menu principal do programa com todas as operações disponíveis.
     '''
     sair = False
-    equipes = []
+    equipes = RegistroEquipes()
     while not sair:
         print("\nSeja Bem-Vindo ao Simulador de Campeonato Brasileiro:\n")
         print("1) Registrar uma Equipe")
         print("2) Visualizar Equipes")
         print("3) Alterar uma Equipe")
         print("4) Iniciar Simulação do Campeonato")
-        print("5) Exibir Regras do Campeonato")
-        print("6) Sair\n")
+        print("5) Carregar Campeonato Salvo")
+        print("6) Exibir Regras do Campeonato")
+        print("7) Sair\n")
         try:
             opcao = int(input("Escolha uma opção: "))
-            if opcao < 1 or opcao > 6:
+            if opcao < 1 or opcao > 7:
                 raise ValueError('Opção inválida!')
             elif opcao == 1:
                 registra_equipe(equipes)
@@ -651,49 +1306,18 @@ def menu_principal():
             elif opcao == 3:
                 altera_equipe(equipes)
             elif opcao == 4:
-                if len(equipes) != 20:
-                    raise ValueError("São necessárias 20 equipes para o campeonato começar!")
+                if len(equipes) != NUMERO_EQUIPES:
+                    raise ValueError(f"São necessárias {NUMERO_EQUIPES} equipes para o campeonato começar!")
                 else:
-                    sair_2 = False
-                    times = converte_equipe(equipes)
-                    rodadas = gera_rodadas(times)
-                    while not sair_2:
-                        print("\n1) Exibir uma Rodada")
-                        print("2) Inserir Resultado")
-                        print("3) Alterar Resultado")
-                        print("4) Ver Desempenho de Equipe")
-                        print("5) Visualizar Tabela do Campeonato")
-                        print("6) Exibir Regras do Campeonato")
-                        print("7) Sair e Finalizar Campeonato\n")
-                        try:
-                            opcao2 = int(input("Escolha uma opção: "))
-                            if opcao2 < 1 or opcao2 > 7:
-                                raise ValueError
-                            elif opcao2 == 1:
-                                exibe_rodada(escolhe_rodada(rodadas).lista_jogos)
-                            elif opcao2 == 2: 
-                                rodada = escolhe_rodada(rodadas)
-                                exibe_rodada(rodada.lista_jogos)
-                                resultado(escolhe_jogo(rodada), rodada.numero)
-                            elif opcao2 == 3:
-                                rodada = escolhe_rodada(rodadas)
-                                exibe_rodada(rodada.lista_jogos)
-                                altera_resultado(escolhe_jogo(rodada), rodada.numero)
-                            elif opcao2 == 4:
-                                dados_equipe(jogos_equipe(equipes, rodadas), times)
-                            elif opcao2 == 5:
-                                exibe_tabela(times)
-                            elif opcao2 == 6:
-                                exibe_regras()
-                            elif opcao2 == 7:
-                                sair_2 = True
-                                exibe_tabela(times)
-                                print('\nCampeonato Finalizado!')
-                        except ValueError:
-                            print("\nErro: Opção inválida! Digite um número válido!")  # Caso de entrada não numérica
+                    menu_campeonato(equipes, gera_rodadas(equipes.inicia_equipes()))
             elif opcao == 5:
-                exibe_regras()
+                campeonato = carrega_campeonato()
+                if campeonato is not None:
+                    equipes = campeonato[0]
+                    menu_campeonato(*campeonato)
             elif opcao == 6:
+                exibe_regras()
+            elif opcao == 7:
                 sair = True
                 print ('\nFim da Sessão!')
                 print()
@@ -708,4 +1332,5 @@ def main():
     menu_principal()
     
     
-main()
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+# Tabela Vetorizada - Campeonato Brasileiro
+# Autor: Matheus Henrique Borsato
+#
+# Requer NumPy.
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from simulador_campeonato_brasileiro import Equipe, Jogo
+
+# Para que um lote de jogos custe apenas duas somas espalhadas, os contadores são
+# empacotados em um único valor por equipe e por jogo: vitórias e empates em um, gols
+# marcados e sofridos em outro. Os limites abaixo garantem que as somas continuem
+# exatas em ponto flutuante de 64 bits, usado por np.bincount.
+DESLOCAMENTO_EMPATES = 20
+DESLOCAMENTO_GOLS_SOFRIDOS = 26
+
+
+@dataclass
+class TabelaVetorizada:
+    '''
+    Guarda as estatísticas de todas as equipes de um campeonato em colunas NumPy, uma
+    coluna por estatística. Cada coluna tem formato (temporadas, equipes): a linha *s*
+    é o estado da *s*-ésima temporada simulada e a coluna *i* corresponde a *nomes[i]*.
+
+    Saldo de gols e aproveitamento não são guardados, e sim calculados sob demanda por
+    *saldo_gols* e *aproveitamento*.
+    '''
+    nomes: list[str]
+    pontos: np.ndarray
+    jogos: np.ndarray
+    vitorias: np.ndarray
+    empates: np.ndarray
+    derrotas: np.ndarray
+    gols_marcados: np.ndarray
+    gols_sofridos: np.ndarray
+
+
+def cria_tabela(equipes: list[Equipe], temporadas: int = 1) -> TabelaVetorizada:
+    '''
+    Cria uma tabela com *temporadas* cópias do estado atual de *equipes*.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe
+    >>> tabela = cria_tabela(converte_equipe(['A', 'B', 'C']), 4)
+    >>> tabela.pontos.shape
+    (4, 3)
+    '''
+    def coluna(valores: list[int]) -> np.ndarray:
+        return np.tile(np.array(valores, dtype=np.int64), (temporadas, 1))
+
+    return TabelaVetorizada(
+        [equipe.nome for equipe in equipes],
+        coluna([equipe.pontos for equipe in equipes]),
+        coluna([equipe.jogos for equipe in equipes]),
+        coluna([equipe.vitorias for equipe in equipes]),
+        coluna([equipe.empates for equipe in equipes]),
+        coluna([equipe.derrotas for equipe in equipes]),
+        coluna([equipe.gols_marcados for equipe in equipes]),
+        coluna([equipe.gols_sofridos for equipe in equipes]),
+    )
+
+
+def indices_jogos(jogos: list[Jogo], nomes: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    '''
+    Devolve os índices, em *nomes*, dos mandantes e dos visitantes de *jogos*. Para
+    converter uma temporada inteira, basta concatenar as rodadas.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe, gera_rodadas
+    >>> equipes = converte_equipe(['A', 'B', 'C', 'D'])
+    >>> rodadas = gera_rodadas(equipes)
+    >>> indices_jogos(rodadas[0], ['A', 'B', 'C', 'D'])
+    (array([0, 1]), array([3, 2]))
+    '''
+    posicao = {nome: i for i, nome in enumerate(nomes)}
+    mandantes = np.array([posicao[jogo.mandante.nome] for jogo in jogos], dtype=np.intp)
+    visitantes = np.array([posicao[jogo.visitante.nome] for jogo in jogos], dtype=np.intp)
+    return mandantes, visitantes
+
+
+def soma_espalhada(equipes: np.ndarray, valores: np.ndarray, n: int) -> np.ndarray:
+    '''
+    Soma cada elemento de *valores* (formato (temporadas, jogos)) à equipe de índice
+    correspondente em *equipes* (formato (jogos,)), para todas as temporadas em uma
+    única chamada a np.bincount. Devolve um arranjo de formato (temporadas, *n*).
+
+    Exemplos:
+    >>> soma_espalhada(np.array([0, 1, 0]), np.array([[1, 2, 3], [4, 5, 6]]), 3)
+    array([[ 4,  2,  0],
+           [10,  5,  0]])
+    '''
+    temporadas = valores.shape[0]
+    deslocamentos = (np.arange(temporadas, dtype=np.intp) * n)[:, None]
+    indices = (deslocamentos + equipes[None, :]).ravel()
+    somas = np.bincount(indices, weights=valores.ravel(), minlength=temporadas * n)
+    return somas.astype(np.int64).reshape(temporadas, n)
+
+
+def aplica_jogos(tabela: TabelaVetorizada, mandantes: np.ndarray, visitantes: np.ndarray,
+                 gols_mandante: np.ndarray, gols_visitante: np.ndarray):
+    '''
+    Aplica em *tabela* os placares de um conjunto de jogos, que pode ser uma rodada,
+    uma temporada inteira ou qualquer lista de partidas.
+
+    *mandantes* e *visitantes* têm formato (jogos,). *gols_mandante* e *gols_visitante*
+    têm formato (jogos,), e nesse caso o mesmo placar é aplicado a todas as temporadas,
+    ou (temporadas, jogos), com um placar por temporada simulada.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe
+    >>> tabela = cria_tabela(converte_equipe(['A', 'B', 'C', 'D']), 2)
+    >>> mandantes, visitantes = np.array([0, 2]), np.array([1, 3])
+    >>> aplica_jogos(tabela, mandantes, visitantes, np.array([[2, 1], [0, 0]]), np.array([[1, 1], [3, 0]]))
+    >>> tabela.pontos
+    array([[3, 0, 1, 1],
+           [0, 3, 1, 1]])
+    >>> saldo_gols(tabela)
+    array([[ 1, -1,  0,  0],
+           [-3,  3,  0,  0]])
+    '''
+    temporadas, n = tabela.pontos.shape
+    gols_m = np.broadcast_to(np.asarray(gols_mandante, dtype=np.int64), (temporadas, len(mandantes)))
+    gols_v = np.broadcast_to(np.asarray(gols_visitante, dtype=np.int64), (temporadas, len(visitantes)))
+    empate = (gols_m == gols_v) << DESLOCAMENTO_EMPATES
+
+    equipes = np.concatenate((mandantes, visitantes))
+    resultados = np.concatenate(((gols_m > gols_v) | empate, (gols_v > gols_m) | empate), axis=1)
+    gols = np.concatenate((gols_m + (gols_v << DESLOCAMENTO_GOLS_SOFRIDOS),
+                           gols_v + (gols_m << DESLOCAMENTO_GOLS_SOFRIDOS)), axis=1)
+    resultados = soma_espalhada(equipes, resultados, n)
+    gols = soma_espalhada(equipes, gols, n)
+
+    jogos = np.bincount(equipes, minlength=n)
+    vitorias = resultados & ((1 << DESLOCAMENTO_EMPATES) - 1)
+    empates = resultados >> DESLOCAMENTO_EMPATES
+    tabela.jogos += jogos
+    tabela.vitorias += vitorias
+    tabela.empates += empates
+    tabela.derrotas += jogos - vitorias - empates
+    tabela.pontos += 3 * vitorias + empates
+    tabela.gols_marcados += gols & ((1 << DESLOCAMENTO_GOLS_SOFRIDOS) - 1)
+    tabela.gols_sofridos += gols >> DESLOCAMENTO_GOLS_SOFRIDOS
+
+
+def saldo_gols(tabela: TabelaVetorizada) -> np.ndarray:
+    '''
+    Devolve o saldo de gols de cada equipe em cada temporada de *tabela*.
+    '''
+    return tabela.gols_marcados - tabela.gols_sofridos
+
+
+def aproveitamento(tabela: TabelaVetorizada) -> np.ndarray:
+    '''
+    Devolve o aproveitamento de cada equipe em cada temporada de *tabela*. Assim como
+    em *converte_equipe*, equipes sem jogos têm aproveitamento de 100.0.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe
+    >>> tabela = cria_tabela(converte_equipe(['A', 'B']))
+    >>> aplica_jogos(tabela, np.array([0]), np.array([1]), np.array([1]), np.array([1]))
+    >>> aproveitamento(tabela).round(1)
+    array([[33.3, 33.3]])
+    '''
+    jogos = np.maximum(tabela.jogos, 1)
+    return np.where(tabela.jogos == 0, 100.0, tabela.pontos / (jogos * 3) * 100)
+
+
+def classificacao(tabela: TabelaVetorizada) -> np.ndarray:
+    '''
+    Devolve, para cada temporada de *tabela*, os índices das equipes em ordem de
+    classificação, com os mesmos critérios de *intercala*: pontos, vitórias, saldo de
+    gols e ordem alfabética.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe
+    >>> tabela = cria_tabela(converte_equipe(['C', 'B', 'A']), 2)
+    >>> aplica_jogos(tabela, np.array([0]), np.array([1]), np.array([[1], [0]]), np.array([[0], [0]]))
+    >>> classificacao(tabela)
+    array([[0, 2, 1],
+           [1, 0, 2]])
+    '''
+    ordem_nome = np.argsort(np.argsort(np.array(tabela.nomes)))
+    nomes = np.broadcast_to(ordem_nome, tabela.pontos.shape)
+    return np.lexsort((nomes, -saldo_gols(tabela), -tabela.vitorias, -tabela.pontos), axis=-1)
+
+
+def posicoes(tabela: TabelaVetorizada) -> np.ndarray:
+    '''
+    Devolve a colocação (começando em 1) de cada equipe em cada temporada de *tabela*.
+
+    Exemplos:
+    >>> from simulador_campeonato_brasileiro import converte_equipe
+    >>> tabela = cria_tabela(converte_equipe(['C', 'B', 'A']))
+    >>> aplica_jogos(tabela, np.array([0]), np.array([1]), np.array([1]), np.array([0]))
+    >>> posicoes(tabela)
+    array([[1, 3, 2]])
+    '''
+    ordem = classificacao(tabela)
+    resultado = np.empty_like(ordem)
+    np.put_along_axis(resultado, ordem, np.arange(1, ordem.shape[1] + 1)[None, :], axis=1)
+    return resultado
+
+
+def atualiza_equipes(tabela: TabelaVetorizada, equipes: list[Equipe], temporada: int = 0):
+    '''
+    Copia para *equipes* as estatísticas da *temporada* de *tabela*, inclusive saldo de
+    gols e aproveitamento. *equipes* deve estar na mesma ordem de *tabela.nomes*.
+    '''
+    saldos = saldo_gols(tabela)[temporada]
+    aproveitamentos = aproveitamento(tabela)[temporada]
+    for i, equipe in enumerate(equipes):
+        equipe.pontos = int(tabela.pontos[temporada, i])
+        equipe.jogos = int(tabela.jogos[temporada, i])
+        equipe.vitorias = int(tabela.vitorias[temporada, i])
+        equipe.empates = int(tabela.empates[temporada, i])
+        equipe.derrotas = int(tabela.derrotas[temporada, i])
+        equipe.gols_marcados = int(tabela.gols_marcados[temporada, i])
+        equipe.gols_sofridos = int(tabela.gols_sofridos[temporada, i])
+        equipe.saldo_gols = int(saldos[i])
+        equipe.aproveitamento = float(aproveitamentos[i])